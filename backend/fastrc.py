@@ -1,40 +1,71 @@
 import asyncio
-import base64
+import contextlib
 import json
 import os
 import pathlib
-from typing import AsyncGenerator, Literal
+import secrets
+import time
+from typing import AsyncGenerator, Literal, get_args
 
 import gradio as gr
 import numpy as np
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastrtc import (
     AsyncStreamHandler,
     Stream,
+    get_current_context,
     get_twilio_turn_credentials,
-    wait_for_item,
-)
-from google import genai
-from google.genai.types import (
-    LiveConnectConfig,
-    PrebuiltVoiceConfig,
-    SpeechConfig,
-    VoiceConfig,
 )
 from gradio.utils import get_space
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
+from voice_audio import (
+    PLAYBACK_LEAD_MS,
+    PLAYBACK_MAX_MS,
+    UPLINK_MAX_FRAMES,
+    UPLINK_MAX_MS,
+    AudioQueue,
+    FrameBatcher,
+    JitterBuffer,
+    PlaybackClock,
+    encode_pcm,
+    pcm_frame,
+)
+from voice_formats import (
+    MODEL_OUTPUT_RATE,
+    Resampler,
+    frame_size,
+    negotiate,
+    uplink_mime,
+)
+from voice_metrics import CallMetrics, telemetry
+from voice_registry import SECRET_ENV, WORKER_ID, open_registry
+from voice_sessions import end_audio_stream, live_sessions
+from voice_vad import END_OF_SPEECH, VoiceGate
+
 current_dir = pathlib.Path(__file__).parent
 
 load_dotenv()
 
+# Rates the handler is built with; each connection renegotiates its own in start_up
+CLIENT = "phone" if os.getenv("MODE") == "PHONE" else "browser"
+INPUT_RATE, OUTPUT_RATE = negotiate(CLIENT)
 
-def encode_audio(data: np.ndarray) -> str:
-    """Encode Audio data to send to the server"""
-    return base64.b64encode(data.tobytes()).decode("UTF-8")
+# One process unless VOICE_WORKERS asks for more (e.g. one per core); workers track calls in a
+# registry every worker can read, and /voice/metrics answers for whichever worker serves it
+WORKERS = int(os.getenv("VOICE_WORKERS", "1"))
+REGISTRY_URL = os.getenv(
+    "VOICE_REGISTRY",
+    "memory://" if WORKERS == 1 else f"sqlite:///{current_dir / 'voice_sessions.db'}",
+)
+WORKER_SESSIONS = os.getenv("VOICE_WORKER_SESSIONS")  # Calls one worker accepts; unset means no cap
+if __name__ == "__main__":  # The workers uvicorn starts inherit it, so each can read the args another stored
+    os.environ.setdefault(SECRET_ENV, secrets.token_hex(32))
+registry = open_registry(REGISTRY_URL)
+Voice = Literal["Puck", "Charon", "Kore", "Fenrir", "Aoede"]
 
 
 class GeminiHandler(AsyncStreamHandler):
@@ -43,77 +74,183 @@ class GeminiHandler(AsyncStreamHandler):
     def __init__(
         self,
         expected_layout: Literal["mono"] = "mono",
-        output_sample_rate: int = 24000,
-        output_frame_size: int = 480,
+        output_sample_rate: int = OUTPUT_RATE,
+        output_frame_size: int = frame_size(OUTPUT_RATE),
+        input_sample_rate: int = INPUT_RATE,
     ) -> None:
         super().__init__(
             expected_layout,
             output_sample_rate,
             output_frame_size,
-            input_sample_rate=16000,
+            input_sample_rate=input_sample_rate,
         )
-        self.input_queue: asyncio.Queue = asyncio.Queue()
-        self.output_queue: asyncio.Queue = asyncio.Queue()
         self.quit: asyncio.Event = asyncio.Event()
+        self.webrtc_id: str | None = None
+        self.metrics = CallMetrics(self.gauges)
+        self.configure(input_sample_rate, output_sample_rate)
+
+    def configure(self, input_sample_rate: int, output_sample_rate: int) -> None:
+        """Builds the audio stages for the rates this connection uses."""
+        self.input_sample_rate = input_sample_rate
+        self.output_sample_rate = output_sample_rate
+        self.output_frame_size = frame_size(output_sample_rate)
+        # Bounded so a stalled model or client costs dropped audio, not memory and lag
+        self.input_queue = AudioQueue(
+            input_sample_rate, UPLINK_MAX_MS, UPLINK_MAX_FRAMES, "coalesce"
+        )
+        self.output_queue = AudioQueue(output_sample_rate, PLAYBACK_MAX_MS)
+        self.gate = VoiceGate(input_sample_rate)
+        self.uplink = FrameBatcher(input_sample_rate)
+        self.playback = JitterBuffer(output_sample_rate)
+        self.clock = PlaybackClock(output_sample_rate)
+        self.downlink = Resampler(MODEL_OUTPUT_RATE, output_sample_rate)
+
+    def negotiate_rates(self) -> None:
+        """Switches to the rates for how this call connected, before any audio flows."""
+        if self.phone_mode:
+            client = "phone"
+        elif get_current_context().websocket is not None:
+            client = "websocket"  # fastrtc's websocket transport labels frames with our rates as-is
+        else:
+            client = "browser"
+        rates = negotiate(client)
+        if rates != (self.input_sample_rate, self.output_sample_rate):
+            self.configure(*rates)
 
     def copy(self) -> "GeminiHandler":
         return GeminiHandler(
             expected_layout="mono",
             output_sample_rate=self.output_sample_rate,
             output_frame_size=self.output_frame_size,
+            input_sample_rate=self.input_sample_rate,
         )
 
     async def start_up(self):
+        self.negotiate_rates()
+        if not self.phone_mode:
+            self.webrtc_id = get_current_context().webrtc_id
+            registry.claim(self.webrtc_id)
+        telemetry.open(self.webrtc_id or f"phone-{id(self):x}", self.metrics)
         if not self.phone_mode:
-            await self.wait_for_args()
-            api_key, voice_name = self.latest_args[1:]
+            api_key, voice_name = await self.call_args()
         else:
             api_key, voice_name = None, "Puck"
 
-        client = genai.Client(
-            api_key=api_key or os.getenv("GOOGLE_API_KEY"),
-            http_options={"api_version": "v1alpha"},
-        )
-
-        config = LiveConnectConfig(
-            response_modalities=["AUDIO"],  # type: ignore
-            speech_config=SpeechConfig(
-                voice_config=VoiceConfig(
-                    prebuilt_voice_config=PrebuiltVoiceConfig(
-                        voice_name=voice_name,
-                    )
-                )
-            ),
-        )
-        async with client.aio.live.connect(
-            model="gemini-2.0-flash-exp", config=config
-        ) as session:
+        # Usually a session pre-warmed when this key's previous call ended, so audio flows at once
+        async with live_sessions.session(api_key, voice_name) as session:
+            self.metrics.connected()
             async for audio in session.start_stream(
-                stream=self.stream(), mime_type="audio/pcm"
+                stream=self.stream(session), mime_type=uplink_mime(self.input_sample_rate)
             ):
+                content = audio.server_content
+                if content and content.interrupted:
+                    self.interrupt()
                 if audio.data:
-                    array = np.frombuffer(audio.data, dtype=np.int16)
-                    self.output_queue.put_nowait((self.output_sample_rate, array))
-
-    async def stream(self) -> AsyncGenerator[bytes, None]:
+                    self.metrics.audio_received(len(audio.data))
+                    array = self.downlink(np.frombuffer(audio.data, dtype=np.int16))
+                    playing = not self.output_queue.empty() or self.clock.playing()
+                    self.play(self.playback.push(array, playing))
+                if content and content.turn_complete:
+                    self.metrics.turn_complete()
+                    self.play(self.playback.end_turn())
+
+    async def call_args(self) -> list:
+        """The browser's ``[api_key, voice_name]``, from this worker's /input_hook or another's."""
+        local = asyncio.ensure_future(self.wait_for_args())
+        shared = asyncio.ensure_future(registry.wait_for_args(self.webrtc_id))
+        done, pending = await asyncio.wait(
+            {local, shared}, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        return self.latest_args[1:] if local in done else shared.result()
+
+    def interrupt(self) -> None:
+        """Stops playback the user has talked over, including what fastrtc has buffered."""
+        self.playback.clear()
+        self.output_queue.clear()
+        if self._clear_queue is not None:
+            self.clear_queue()
+        self.clock.reset()
+
+    def play(self, array: np.ndarray | None) -> None:
+        if array is not None:
+            self.output_queue.put_nowait((self.output_sample_rate, array))
+
+    async def stream(self, session) -> AsyncGenerator[str, None]:
+        batcher = self.uplink
         while not self.quit.is_set():
+            # An idle session just waits on the queue; a timer runs only while a partial chunk is pending
+            linger = batcher.linger if len(batcher) else None
+            ending = False
             try:
-                audio = await asyncio.wait_for(self.input_queue.get(), 0.1)
-                yield audio
+                frame = await asyncio.wait_for(self.input_queue.get(), linger)
             except (asyncio.TimeoutError, TimeoutError):
                 pass
+            else:
+                if frame is None:  # Put there by shutdown()
+                    return
+                ending = frame is END_OF_SPEECH
+                if ending and not len(batcher):
+                    await end_audio_stream(session)
+                    continue
+                if not ending:
+                    if not len(batcher):
+                        first_queued = self.input_queue.last_enqueued
+                    batcher.add(frame)
+                    if not batcher.ready(self.input_queue.qsize()):
+                        continue
+            # Encoded here, once, straight from the batch buffer; the SDK sends str data as-is
+            chunk = batcher.take()
+            self.metrics.chunk_sent(chunk.nbytes, first_queued)
+            sent = time.perf_counter()
+            yield encode_pcm(chunk)
+            batcher.observe(time.perf_counter() - sent)
+            if ending:  # After the utterance's last chunk, which the SDK has sent by the time we resume
+                await end_audio_stream(session)
 
     async def receive(self, frame: tuple[int, np.ndarray]) -> None:
         _, array = frame
-        array = array.squeeze()
-        audio_message = encode_audio(array)
-        self.input_queue.put_nowait(audio_message)
+        self.metrics.frame_received()
+        # Silence is dropped here, before it costs a queue slot, a send or model time
+        for speech in self.gate.admit(pcm_frame(array)):
+            self.input_queue.put_nowait(speech)
 
     async def emit(self) -> tuple[int, np.ndarray] | None:
-        return await wait_for_item(self.output_queue)
+        if self.quit.is_set():
+            return None
+        # fastrtc buffers whatever it is given, so stay only a little ahead of the listener; the
+        # rest waits here, where the playback bound applies and an interruption can drop it
+        lead = self.clock.ahead() - PLAYBACK_LEAD_MS / 1000
+        if lead > 0:
+            await asyncio.sleep(lead)
+        # Woken by audio or by the None shutdown() puts on the queue, never by a timeout
+        item = await self.output_queue.get()
+        if item is not None:
+            self.metrics.audio_played(self.output_queue.last_enqueued)
+            self.clock.emitted(item[1].size)
+        return item
+
+    def gauges(self) -> dict:
+        """Point-in-time readings for this call's metrics snapshot."""
+        return {
+            "uplink_queue": self.input_queue.stats(),
+            "playback_queue": self.output_queue.stats(),
+            "vad_passed": self.gate.passed,
+            "vad_dropped": self.gate.dropped,
+            "batch_target_ms": self.uplink.target * 1000 / self.input_sample_rate,
+            "send_rtt_ms": self.uplink.rtt * 1000,
+            "jitter_target_ms": self.playback.target * 1000 / self.output_sample_rate,
+            "playback_ahead_ms": self.clock.ahead() * 1000,
+        }
 
     def shutdown(self) -> None:
         self.quit.set()
+        self.input_queue.put_nowait(None)
+        self.output_queue.put_nowait(None)
+        if self.webrtc_id is not None:
+            registry.release(self.webrtc_id)
+        telemetry.close(self.metrics)
 
 
 stream = Stream(
@@ -121,7 +258,7 @@ stream = Stream(
     mode="send-receive",
     handler=GeminiHandler(),
     rtc_configuration=get_twilio_turn_credentials() if get_space() else None,
-    concurrency_limit=5 if get_space() else None,
+    concurrency_limit=5 if get_space() else WORKER_SESSIONS and int(WORKER_SESSIONS),
     time_limit=90 if get_space() else None,
     additional_inputs=[
         gr.Textbox(
@@ -131,13 +268,7 @@ stream = Stream(
         ),
         gr.Dropdown(
             label="Voice",
-            choices=[
-                "Puck",
-                "Charon",
-                "Kore",
-                "Fenrir",
-                "Aoede",
-            ],
+            choices=list(get_args(Voice)),
             value="Puck",
         ),
     ],
@@ -146,11 +277,18 @@ stream = Stream(
 
 class InputData(BaseModel):
     webrtc_id: str
-    voice_name: str
+    voice_name: Voice
     api_key: str
 
 
-app = FastAPI()
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await live_sessions.close()
+    registry.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -164,10 +302,40 @@ app.add_middleware(
 stream.mount(app)
 
 
+@app.middleware("http")
+async def worker_hint(request: Request, call_next):
+    # Lets a proxy pin a call's later requests to the worker that owns it
+    response = await call_next(request)
+    response.headers["X-Voice-Worker"] = WORKER_ID
+    return response
+
+
 @app.post("/input_hook")
 async def _(body: InputData):
-    stream.set_input(body.webrtc_id, body.api_key, body.voice_name)
-    return {"status": "ok"}
+    owner = registry.owner(body.webrtc_id)
+    # Only a call this worker is running gets its inputs here; a call that has not
+    # started yet, or runs elsewhere, takes its args from the registry, which drops
+    # them if no call does within a few seconds
+    if owner == WORKER_ID:
+        stream.set_input(body.webrtc_id, body.api_key, body.voice_name)
+    else:
+        registry.set_args(body.webrtc_id, [body.api_key, body.voice_name])
+    return {"status": "ok", "worker": owner}
+
+
+@app.get("/voice/metrics")
+async def metrics():
+    """This worker's call counters and latency percentiles, totals and per live call.
+
+    With several workers each answers for itself; the ``worker`` field says which.
+    """
+    return {"worker": WORKER_ID, **telemetry.report()}
+
+
+@app.get("/voice/workers")
+async def workers():
+    """Calls per worker and where a new call should go, for a load balancer."""
+    return {"load": registry.load(), "least_loaded": registry.least_loaded([WORKER_ID])}
 
 
 @app.get("/")
@@ -188,4 +356,7 @@ if __name__ == "__main__":
     else:
         import uvicorn
 
-        uvicorn.run(app, host="localhost", port=8000)
+        if WORKERS > 1:
+            uvicorn.run("fastrc:app", host="localhost", port=8000, workers=WORKERS)
+        else:
+            uvicorn.run(app, host="localhost", port=8000)
@@ -0,0 +1,210 @@
+"""Population analytics over simulated game outcomes for "you beat X% of players" lookups."""
+import argparse
+import json
+import math
+import random
+from collections import Counter
+
+from game_economy import available_regimes
+from game_engine import DEFAULT_REGIME, get_branching_scenarios
+from game_simulator import POLICIES, ScriptedPolicy, map_chunks, play_game
+
+RELATIVE_ACCURACY = 0.01  # Bucket width as a fraction of the value (DDSketch-style)
+LOG_GAMMA = math.log((1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY))
+METRICS = ("net_worth", "financial_health")
+
+# --- Quantile Sketch ---
+
+class QuantileSketch:
+    """Mergeable log-bucketed quantile sketch with bounded relative error.
+
+    Values are counted in buckets whose width grows with magnitude, so any
+    range of net worths fits in a few thousand buckets. ``freeze`` turns the
+    counts into a dense cumulative table that answers ``fraction_below`` with
+    one bucket computation and one array index.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = Counter(counts or {})
+        self.total = sum(self.counts.values())
+        self._min_key = 0
+        self._cumulative = None
+
+    @staticmethod
+    def bucket(value):
+        """Maps a value to an ordered bucket key; magnitudes below 1 share key 0."""
+        magnitude = abs(value)
+        if magnitude < 1:
+            return 0
+        key = math.ceil(math.log(magnitude) / LOG_GAMMA)
+        return key if value > 0 else -key
+
+    def add(self, value, count=1):
+        self.counts[self.bucket(value)] += count
+        self.total += count
+        self._cumulative = None
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self._cumulative = None
+        return self
+
+    def freeze(self):
+        """Precomputes the cumulative table used by ``fraction_below``."""
+        if not self.counts:
+            self._min_key, self._cumulative = 0, [0, 0]
+            return self
+        self._min_key = min(self.counts)
+        running, cumulative = 0, [0]
+        for key in range(self._min_key, max(self.counts) + 1):
+            running += self.counts.get(key, 0)
+            cumulative.append(running)
+        self._cumulative = cumulative
+        return self
+
+    def fraction_below(self, value):
+        """Share of recorded values below ``value``, counting its own bucket as half."""
+        if self._cumulative is None:
+            self.freeze()
+        if not self.total:
+            return 0.0
+        index = self.bucket(value) - self._min_key
+        if index < 0:
+            return 0.0
+        if index >= len(self._cumulative) - 1:
+            return 1.0
+        below, through = self._cumulative[index], self._cumulative[index + 1]
+        return (below + (through - below) / 2) / self.total
+
+    def quantile(self, q):
+        """Approximate value at quantile ``q`` (0..1)."""
+        if not self.total:
+            return None
+        target, running = q * self.total, 0
+        for key in sorted(self.counts):
+            running += self.counts[key]
+            if running >= target:
+                if key == 0:
+                    return 0.0
+                value = 2 * math.exp(abs(key) * LOG_GAMMA) / (1 + math.exp(LOG_GAMMA))
+                return value if key > 0 else -value
+        return None
+
+# --- Outcome Analytics ---
+
+def _scopes(outcome):
+    yield "all"
+    for node, choice_id in zip(outcome["nodes"], outcome["path"]):
+        yield f"node:{node}"
+        yield f"choice:{node}:{choice_id}"
+
+class OutcomeAnalytics:
+    """Net-worth and health sketches per economic regime: for all its players, per scenario node and per choice.
+
+    Games played under different regimes end in different places, so a player
+    is only ranked against players of the regime they played.
+    """
+
+    def __init__(self):
+        self.sketches = {}
+
+    def _sketch(self, regime, scope, metric):
+        key = (regime, scope, metric)
+        if key not in self.sketches:
+            self.sketches[key] = QuantileSketch()
+        return self.sketches[key]
+
+    def record(self, outcome, regime=DEFAULT_REGIME):
+        for scope in _scopes(outcome):
+            for metric in METRICS:
+                self._sketch(regime, scope, metric).add(outcome[metric])
+
+    def merge(self, other):
+        for (regime, scope, metric), sketch in other.sketches.items():
+            self._sketch(regime, scope, metric).merge(sketch)
+        return self
+
+    def regimes(self):
+        return sorted({regime for regime, _, _ in self.sketches})
+
+    def freeze(self):
+        for sketch in self.sketches.values():
+            sketch.freeze()
+        return self
+
+    def percentile(self, metric, value, node=None, choice_id=None, regime=DEFAULT_REGIME):
+        """Returns the percentage of the regime's players in the scope who ended below ``value``, or None without data."""
+        if node is None:
+            scope = "all"
+        elif choice_id is None:
+            scope = f"node:{node}"
+        else:
+            scope = f"choice:{node}:{choice_id}"
+        sketch = self.sketches.get((regime, scope, metric))
+        if sketch is None or not sketch.total:
+            return None
+        return 100 * sketch.fraction_below(value)
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": RELATIVE_ACCURACY,
+            "sketches": [
+                {"regime": regime, "scope": scope, "metric": metric,
+                 "counts": {str(k): v for k, v in sketch.counts.items()}}
+                for (regime, scope, metric), sketch in self.sketches.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        analytics = cls()
+        for entry in data["sketches"]:
+            counts = {int(k): v for k, v in entry["counts"].items()}
+            regime = entry.get("regime", DEFAULT_REGIME)  # Files from before regimes were recorded
+            analytics.sketches[(regime, entry["scope"], entry["metric"])] = QuantileSketch(counts)
+        return analytics.freeze()
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+# --- Collection ---
+
+def _analyze_chunk(policy, games, seed, regime):
+    rng = random.Random(seed)
+    scenarios = get_branching_scenarios()
+    analytics = OutcomeAnalytics()
+    for _ in range(games):
+        analytics.record(play_game(policy, rng, scenarios, regime), regime)
+    return analytics
+
+def collect_analytics(games, policy=None, seed=0, max_workers=None, chunk_size=10000, regimes=(DEFAULT_REGIME,)):
+    """Simulates ``games`` games per regime with the batch engine and returns frozen population analytics."""
+    total = OutcomeAnalytics()
+    chunks = map_chunks(_analyze_chunk, games, policy or POLICIES["random"], seed, max_workers, chunk_size, regimes)
+    for _, chunk in chunks:
+        total.merge(chunk)
+    return total.freeze()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build population outcome analytics from simulated games.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--policy", default="random", help=f"One of {sorted(POLICIES)} or a comma-separated list of choice ids")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", default="game_analytics.json")
+    parser.add_argument("--regime", action="append", dest="regimes",
+                        help="Regime to simulate; repeat for several (default: every available regime)")
+    args = parser.parse_args()
+
+    policy = POLICIES.get(args.policy) or ScriptedPolicy(args.policy.split(","))
+    regimes = args.regimes or available_regimes()
+    collect_analytics(args.games, policy, args.seed, args.workers, args.chunk_size, regimes).save(args.out)
+    print(f"Wrote analytics for {args.games} games in each of {', '.join(regimes)} to {args.out}")
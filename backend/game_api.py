@@ -0,0 +1,191 @@
+"""Async HTTP/JSON API over the game engine for the React frontend and other clients.
+
+Run with ``python game_api.py`` (or ``uvicorn game_api:app``). Live games are
+kept in process and every decision is persisted through the same session
+store the Streamlit app uses, so a game started in one can be resumed in the
+other.
+"""
+import asyncio
+import contextlib
+import os
+import pathlib
+import uuid
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+
+from game_economy import available_regimes
+from game_engine import (
+    DEFAULT_REGIME,
+    LOG_CAPACITY,
+    LOG_PAGE_SIZE,
+    create_new_game,
+    log_length,
+    process_decision_and_advance,
+    read_log_page,
+)
+from game_replay import append_recording
+from game_sessions import open_session_store, record_decision
+from game_solver import preview_choices
+
+SESSION_STORE_URL = os.getenv(
+    "GAME_SESSION_STORE", f"sqlite:///{pathlib.Path(__file__).parent / 'game_sessions.db'}"
+)
+RECORDINGS_PATH = os.getenv("GAME_RECORDINGS_PATH", str(pathlib.Path(__file__).parent / "game_recordings.jsonl"))
+LOG_ARCHIVE_DIR = pathlib.Path(os.getenv("GAME_LOG_ARCHIVE_DIR", pathlib.Path(__file__).parent / "game_logs"))
+API_HOST = os.getenv("GAME_API_HOST", "localhost")
+API_PORT = int(os.getenv("GAME_API_PORT", "8001"))
+KEEP_ALIVE_SECONDS = int(os.getenv("GAME_API_KEEP_ALIVE", "30"))  # Idle time before a client connection is closed
+MAX_LIVE_GAMES = 10000  # Games held in memory; older ones are reloaded from the store on demand
+
+# --- Live Games ---
+
+class LiveGames:
+    """In-process cache of ``session_id -> (state, seq)`` backed by the session store.
+
+    Each game has its own lock so concurrent requests for one game apply in
+    order while different games never wait on each other.
+    """
+
+    def __init__(self, store, capacity=MAX_LIVE_GAMES):
+        self.store = store
+        self.capacity = capacity
+        self._games = {}
+        self._locks = {}
+
+    def lock(self, session_id):
+        if session_id not in self._locks:
+            self._locks[session_id] = asyncio.Lock()
+        return self._locks[session_id]
+
+    def get(self, session_id):
+        """Returns ``(state, seq)`` from memory or the store, or None for an unknown game."""
+        entry = self._games.pop(session_id, None)
+        if entry is None:
+            entry = self.store.load(session_id)
+            if entry is None:
+                return None
+        self.put(session_id, *entry)
+        return entry
+
+    def put(self, session_id, state, seq):
+        self._games.pop(session_id, None)
+        self._games[session_id] = (state, seq)  # Dicts keep insertion order, so the first key is least recent
+        while len(self._games) > self.capacity:
+            evicted = next(iter(self._games))
+            del self._games[evicted]
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+
+# --- Views ---
+
+def game_view(session_id, state):
+    """JSON body describing a game: the current event, its choices with previews and a finance summary."""
+    finances = state["finances"]
+    event = state.get("current_event") or {}
+    previews = {} if state["game_over"] else preview_choices(state)
+    return {
+        "session_id": session_id,
+        "scenario_key": state["scenario_key"],
+        "age": state["profile"]["age"],
+        "game_over": state["game_over"],
+        "narrative": event.get("narrative"),
+        "choices": [] if state["game_over"] else [
+            {"id": choice["id"], "text": choice["text"], "preview": previews.get(choice["id"])}
+            for choice in event.get("choices", [])
+        ],
+        "last_decision_impact": state.get("last_decision_impact"),
+        "financial_health": state["financial_health"],
+        "finances": {
+            "cash": finances["cash"],
+            "income": finances["income"],
+            "expenses": finances["expenses"],
+            "net_worth": finances["net_worth"],
+            "investments": finances["investments"],
+            "loans": finances["loans"],
+        },
+        "economy": state.get("economy", DEFAULT_REGIME),
+        "log_length": log_length(state),
+    }
+
+# --- App ---
+
+class NewGame(BaseModel):
+    regime: str = DEFAULT_REGIME
+    seed: int | None = None
+    life_events: bool = True
+
+class Choice(BaseModel):
+    choice_id: str
+
+games = LiveGames(open_session_store(SESSION_STORE_URL))
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    games.store.close()
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],  # React app URL
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+def _require(session_id):
+    entry = games.get(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown game: {session_id}")
+    return entry
+
+@app.post("/games", status_code=201)
+async def start_game(body: NewGame):
+    if body.regime not in available_regimes():
+        raise HTTPException(status_code=400, detail=f"Unknown economic regime: {body.regime}")
+    session_id = uuid.uuid4().hex
+    state = create_new_game(body.regime, seed=body.seed, life_events=body.life_events)
+    state["log_archive"] = str(LOG_ARCHIVE_DIR / session_id)
+    games.store.save_snapshot(session_id, state, 0)
+    games.put(session_id, state, 0)
+    return game_view(session_id, state)
+
+@app.get("/games/{session_id}")
+async def get_game(session_id: str):
+    state, _ = _require(session_id)
+    return game_view(session_id, state)
+
+@app.post("/games/{session_id}/choices")
+async def choose(session_id: str, body: Choice):
+    async with games.lock(session_id):
+        state, seq = _require(session_id)
+        if state["game_over"]:
+            raise HTTPException(status_code=409, detail="Game is over")
+        choice = next((c for c in state["current_event"]["choices"] if c["id"] == body.choice_id), None)
+        if choice is None:
+            raise HTTPException(status_code=400, detail=f"Unknown choice: {body.choice_id}")
+        # One decision is well under a millisecond of engine work, so it runs inline rather than in a thread
+        new_state = process_decision_and_advance(state, choice["text"])
+        seq = record_decision(games.store, session_id, seq, state["scenario_key"], new_state, choice["text"])
+        games.put(session_id, new_state, seq)
+    if new_state["game_over"] and RECORDINGS_PATH:
+        append_recording(RECORDINGS_PATH, new_state)
+    return game_view(session_id, new_state)
+
+@app.get("/games/{session_id}/log")
+async def get_log(
+    session_id: str,
+    page: int = Query(0, ge=0),
+    page_size: int = Query(LOG_PAGE_SIZE, ge=1, le=LOG_CAPACITY),
+):
+    state, _ = _require(session_id)
+    return {"page": page, "entries": read_log_page(state, page, page_size), "total": log_length(state)}
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=API_HOST, port=API_PORT, timeout_keep_alive=KEEP_ALIVE_SECONDS)
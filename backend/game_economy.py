@@ -0,0 +1,67 @@
+"""Named economic regimes and their cached growth-factor tables.
+
+A regime gives annual inflation, income growth and per-asset returns, each
+either a constant or a per-year series that repeats when the game outlasts it.
+Regimes other than the built-in baseline live as JSON files in ``regimes/``.
+"""
+import json
+import pathlib
+from functools import lru_cache
+
+import numpy as np
+
+REGIMES_DIR = pathlib.Path(__file__).parent / "regimes"
+
+_BUILTIN_REGIMES = {}
+
+def register_regime(regime):
+    """Adds an in-code regime (used for the engine's baseline constants)."""
+    _BUILTIN_REGIMES[regime["name"]] = regime
+    _load_regime.cache_clear()
+    regime_tables.cache_clear()
+
+def available_regimes():
+    """Returns the names of every built-in and on-disk regime."""
+    return sorted(set(_BUILTIN_REGIMES) | {path.stem for path in REGIMES_DIR.glob("*.json")})
+
+@lru_cache(maxsize=None)
+def _load_regime(name):
+    if name in _BUILTIN_REGIMES:
+        return _BUILTIN_REGIMES[name]
+    path = REGIMES_DIR / f"{name}.json"
+    if not path.exists():
+        raise KeyError(f"Unknown economic regime: {name}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def get_regime(name):
+    """Returns a regime definition by name."""
+    return _load_regime(name)
+
+def _annual_rates(rate, start_year, years):
+    series = np.atleast_1d(np.asarray(rate, dtype=float))
+    return series[(start_year + np.arange(years)) % len(series)]
+
+@lru_cache(maxsize=4096)
+def regime_tables(name, start_year, years, assets):
+    """Monthly growth-factor tables for ``years`` years starting ``start_year`` years into the game.
+
+    Returns ``income_factor`` and ``expense_factor`` of shape (M,), the
+    cumulative factor applied in each month when growth lands at the start of
+    every year, and ``invest_factor`` of shape (len(assets), M + 1), the
+    cumulative monthly-compounded value of one rupee in each asset. Tables are
+    cached and read-only, so switching regimes or replaying the same span is a
+    dictionary lookup.
+    """
+    regime = get_regime(name)
+    months = years * 12
+    month_year = np.arange(months) // 12
+    income_factor = np.cumprod(1 + _annual_rates(regime["income_growth"], start_year, years))[month_year]
+    expense_factor = np.cumprod(1 + _annual_rates(regime["inflation"], start_year, years))[month_year]
+    invest_factor = np.ones((len(assets), months + 1))
+    for row, asset in enumerate(assets):
+        monthly = (1 + _annual_rates(regime["returns"].get(asset, 0.0), start_year, years)) ** (1 / 12)
+        invest_factor[row, 1:] = np.cumprod(monthly[month_year])
+    tables = {"income_factor": income_factor, "expense_factor": expense_factor, "invest_factor": invest_factor}
+    for table in tables.values():
+        table.flags.writeable = False
+    return tables
@@ -0,0 +1,727 @@
+"""Streamlit-free financial journey engine shared by the UI and tooling."""
+import heapq
+import os
+import random
+import json
+
+import numpy as np
+
+from game_economy import register_regime, regime_tables
+from game_events import INCOME_RESTORED, push_event, schedule_for_player
+from game_ledger import PAYOFF_EPSILON, build_ledger, concat_ledgers, slice_tables
+from game_loans import advance_loan, schedule_window
+from game_portfolio import REBALANCE_MONTHS, portfolio_arrays
+from game_profiling import profiled
+
+# --- Game Constants ---
+STARTING_AGE = 12
+RETIREMENT_AGE = 65
+INFLATION_RATE = 0.03  # More realistic annual inflation (3%)
+INVESTMENT_RETURN_LOW_RISK = 0.06  # e.g., Fixed Deposits (6%)
+INVESTMENT_RETURN_MED_RISK = 0.10  # e.g., Mutual Funds (10%)
+INVESTMENT_RETURNS = {
+    "fixed_deposit": INVESTMENT_RETURN_LOW_RISK,
+    "mutual_funds": INVESTMENT_RETURN_MED_RISK,
+    "ppf": 0.071,  # Public Provident Fund, government-set rate
+    "nps": 0.09,  # National Pension System, balanced equity/debt mix
+    "equity_index": 0.11,  # Nifty 50 index fund
+    "gold": 0.08,
+}
+INCOME_GROWTH_RATE = 0.025  # Annual salary growth
+EMI_INCOME_CAP = 0.4  # EMIs are capped at 40% of income
+DEFAULT_REGIME = "baseline"  # Economic regime built from the constants above; others live in regimes/
+MAX_LOANS = 2  # Realistic cap on simultaneous loans
+LOAN_CAP_MULTIPLIER = 3  # Max loan amount = 3x annual income
+DEBUG_AGGREGATES = os.getenv("GAME_DEBUG_AGGREGATES") == "1"  # Cross-check running totals on every read
+AGGREGATE_TOLERANCE = 1e-6  # Relative drift allowed between running totals and a full recompute
+LOG_CAPACITY = 100  # Log entries kept in the state; older ones move to the archive
+LOG_EVICT_CHUNK = 25  # Entries evicted (and archived as one file) when the log overflows
+LOG_PAGE_SIZE = 20  # Entries per page when browsing the log
+CASH_EVENT_EFFECTS = ("cash_from_income", "cash_from_expenses")  # Life events booked as one-off ledger cash flows
+
+register_regime({
+    "name": DEFAULT_REGIME,
+    "description": "Steady 3% inflation, 2.5% salary growth, 6% deposits, 7.1% PPF and 10-11% equity.",
+    "inflation": INFLATION_RATE,
+    "income_growth": INCOME_GROWTH_RATE,
+    "returns": INVESTMENT_RETURNS,
+})
+
+# --- Helper Functions ---
+
+def initialize_game_state(regime=DEFAULT_REGIME, seed=None, life_events=True):
+    """Creates the initial state dictionary for the game."""
+    return {
+        "profile": {
+            "name": "Player",
+            "age": STARTING_AGE,
+        },
+        "finances": {
+            "cash": 500,
+            "income": 0,
+            "expenses": 0,
+            "investments": {"fixed_deposit": 0, "mutual_funds": 0},
+            "loans": {},
+            "net_worth": 500,
+            "income_paused_months": 0,  # Months of salary left to skip after a job loss
+            "aggregates": {"investments": 0, "loan_principal": 0, "loan_emi": 0},
+        },
+        "financial_health": 50,
+        "game_log": [f"🚀 Game Started! Age: {STARTING_AGE}, Cash: ₹500"],
+        "log_offset": 0,  # Absolute index of game_log[0]; everything before it is archived or dropped
+        "log_archive": None,  # Optional directory receiving evicted log chunks
+        "current_event": None,
+        "last_decision_impact": "",
+        "game_over": False,
+        "scenario_key": "initial",
+        "economy": regime,
+        "rng_seed": random.SystemRandom().getrandbits(63) if seed is None else seed,
+        "decision_log": [],  # Index of each choice taken, in order; with the seed this reproduces the game
+        "life_events": life_events,  # Draw random life events during fast-forwards
+    }
+
+def session_rng(state, purpose):
+    """Returns a random stream derived only from the session seed, the decision count and ``purpose``.
+
+    Streams are re-derived rather than stored, so a game replays bit-for-bit
+    from its seed and decision log alone.
+    """
+    return random.Random(f"{state['rng_seed']}:{len(state['decision_log'])}:{purpose}")
+
+# --- Game Log ---
+
+def log_event(state, message):
+    """Appends to the bounded game log, evicting the oldest chunk when it overflows.
+
+    Evicted entries are written to ``state["log_archive"]`` when one is set and
+    dropped otherwise, so the log in the state never exceeds ``LOG_CAPACITY``.
+    """
+    log = state["game_log"]
+    log.append(message)
+    if len(log) > LOG_CAPACITY:
+        offset = state.get("log_offset", 0)
+        evicted = log[:LOG_EVICT_CHUNK]
+        del log[:LOG_EVICT_CHUNK]
+        if state.get("log_archive"):
+            archive_log_chunk(state["log_archive"], offset // LOG_EVICT_CHUNK, evicted)
+        state["log_offset"] = offset + len(evicted)
+
+def archive_log_chunk(archive_dir, chunk_index, entries):
+    """Writes one evicted chunk of log entries to the archive directory."""
+    os.makedirs(archive_dir, exist_ok=True)
+    with open(os.path.join(archive_dir, f"{chunk_index:08d}.json"), "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False)
+
+def _load_log_chunk(archive_dir, chunk_index):
+    try:
+        with open(os.path.join(archive_dir, f"{chunk_index:08d}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def log_length(state):
+    """Returns how many log entries can be browsed, counting archived ones."""
+    offset = state.get("log_offset", 0)
+    return offset + len(state["game_log"]) if state.get("log_archive") else len(state["game_log"])
+
+def read_log_page(state, page, page_size=LOG_PAGE_SIZE):
+    """Returns one page of log entries, newest first, reading archived chunks only when the page reaches them.
+
+    Pages before the first or past the last, and page sizes below one, are empty.
+    """
+    if page < 0 or page_size < 1:
+        return []
+    offset = state.get("log_offset", 0)
+    total = offset + len(state["game_log"])
+    first = max(total - log_length(state), 0)
+    newest = total - 1 - page * page_size
+    oldest = max(newest - page_size + 1, first)
+    entries, chunks = [], {}
+    for index in range(newest, oldest - 1, -1):
+        if index >= offset:
+            entries.append(state["game_log"][index - offset])
+            continue
+        chunk_index = index // LOG_EVICT_CHUNK
+        if chunk_index not in chunks:
+            chunks[chunk_index] = _load_log_chunk(state["log_archive"], chunk_index)
+        if chunks[chunk_index] is not None:
+            entries.append(chunks[chunk_index][index % LOG_EVICT_CHUNK])
+    return entries
+
+# --- Aggregate Bookkeeping ---
+
+def adjust_investment(state, kind, amount):
+    """Adds ``amount`` (negative to withdraw) to an investment and the running total."""
+    investments = state["finances"]["investments"]
+    investments[kind] = investments.get(kind, 0) + amount
+    state["finances"]["aggregates"]["investments"] += amount
+
+def set_holdings(state, asset_names, values):
+    """Replaces every holding with ``values`` (an array in ``asset_names`` order) and moves the running total."""
+    investments = state["finances"]["investments"]
+    previous = np.fromiter(investments.values(), float, len(investments))
+    state["finances"]["investments"] = dict(zip(asset_names, values.tolist()))
+    state["finances"]["aggregates"]["investments"] += float(values.sum() - previous.sum())
+
+def add_loan(state, loan_name, principal, interest_rate, emi):
+    """Registers a loan, replacing any existing loan with the same name."""
+    if loan_name in state["finances"]["loans"]:
+        remove_loan(state, loan_name)
+    state["finances"]["loans"][loan_name] = {
+        "principal": principal, "interest_rate": interest_rate, "emi": emi, "origin": principal, "months_paid": 0,
+    }
+    aggregates = state["finances"]["aggregates"]
+    aggregates["loan_principal"] += principal
+    aggregates["loan_emi"] += emi
+
+def repay_principal(state, loan_name, amount):
+    """Reduces a loan's outstanding principal and the running total."""
+    state["finances"]["loans"][loan_name]["principal"] -= amount
+    state["finances"]["aggregates"]["loan_principal"] -= amount
+
+def remove_loan(state, loan_name):
+    """Drops a loan and subtracts whatever it still contributed to the running totals."""
+    loan = state["finances"]["loans"].pop(loan_name)
+    aggregates = state["finances"]["aggregates"]
+    aggregates["loan_principal"] -= loan["principal"]
+    aggregates["loan_emi"] -= loan["emi"]
+    return loan
+
+def recompute_aggregates(state):
+    """Returns the running totals rebuilt from scratch."""
+    loans = state["finances"]["loans"].values()
+    return {
+        "investments": sum(state["finances"]["investments"].values()),
+        "loan_principal": sum(loan.get('principal', 0) for loan in loans),
+        "loan_emi": sum(loan.get('emi', 0) for loan in loans),
+    }
+
+def check_aggregates(state):
+    """Raises AssertionError if the running totals have drifted from the underlying dicts."""
+    expected = recompute_aggregates(state)
+    actual = state["finances"]["aggregates"]
+    for key, value in expected.items():
+        if abs(actual[key] - value) > AGGREGATE_TOLERANCE * max(1, abs(value)):
+            raise AssertionError(f"Aggregate '{key}' drifted: running {actual[key]!r}, recomputed {value!r}")
+
+@profiled("calculate_financial_health")
+def calculate_financial_health(state):
+    """Calculates a more realistic financial health score."""
+    score = 50  # Base score
+    income = state["finances"]["income"]
+    expenses = state["finances"]["expenses"]
+    cash = state["finances"]["cash"]
+    if DEBUG_AGGREGATES: check_aggregates(state)
+    aggregates = state["finances"]["aggregates"]
+    investments = aggregates["investments"]
+    loans_total = aggregates["loan_principal"]
+    net_worth = state["finances"]["net_worth"]
+
+    # Debt-to-Income Ratio (DTI): Lower is better
+    dti = (expenses + aggregates["loan_emi"]) / income if income > 0 else 1
+    if dti < 0.3: score += 20  # Healthy DTI
+    elif dti < 0.5: score += 5
+    elif dti > 0.8: score -= 20  # High DTI penalty
+
+    # Emergency Fund: 6 months of expenses
+    emergency_fund_target = expenses * 6
+    if cash >= emergency_fund_target: score += 15
+    elif cash >= expenses * 3: score += 5
+    elif cash < 0: score -= 30  # Severe penalty for negative cash
+
+    # Investment Ratio: Investments vs. Net Worth
+    if investments > net_worth * 0.5 and net_worth > 0: score += 10
+    elif investments > net_worth * 0.2: score += 5
+
+    # Net Worth Milestones
+    if net_worth > 1000000: score += 15
+    elif net_worth > 100000: score += 5
+    elif net_worth < 0: score -= 20
+
+    # Loan Burden
+    if len(state["finances"]["loans"]) > MAX_LOANS: score -= 20
+    elif loans_total > income * 12 * LOAN_CAP_MULTIPLIER: score -= 15  # Exceeds 3x annual income
+
+    return max(0, min(100, score))
+
+@profiled("update_net_worth")
+def update_net_worth(state):
+    """Recalculates net worth."""
+    if DEBUG_AGGREGATES: check_aggregates(state)
+    aggregates = state["finances"]["aggregates"]
+    state["finances"]["net_worth"] = state["finances"]["cash"] + aggregates["investments"] - aggregates["loan_principal"]
+    return state
+
+def _cash_event_flows(state, tables, cash_events):
+    """Turns cash-only life events into one-off monthly amounts for the ledger, logging each that lands."""
+    finances = state["finances"]
+    salary_paused = finances.get("income_paused_months", 0) > 0
+    flows = np.zeros(len(tables["income_factor"]))
+    for offset, month, event in cash_events:
+        effect = event["effect"]
+        if effect["type"] == "cash_from_income":
+            if salary_paused:
+                continue
+            amount = finances["income"] * tables["income_factor"][offset] * effect["months"]
+        else:
+            amount = finances["expenses"] * tables["expense_factor"][offset] * effect["months"]
+        if amount == 0:
+            continue
+        flows[offset] += amount
+        log_event(state, event["message"].format(age=state["profile"]["age"] + month // 12, amount=abs(amount)))
+    return flows[None, :]
+
+def _run_ledger_segment(state, tables, cash_events=(), start_month=0):
+    """Runs the monthly ledger over ``tables`` and applies its closing balances to ``state``.
+
+    ``cash_events`` holds ``(offset, month, event)`` for cash-only life events
+    inside the segment; they ride along as one-off cash flows rather than
+    splitting the segment. ``start_month`` is the segment's offset into the
+    fast-forward, which keeps yearly rebalancing on year boundaries.
+    """
+    finances = state["finances"]
+    loan_names = list(finances["loans"])
+    asset_names = list(finances["investments"])
+    loans = [finances["loans"][name] for name in loan_names]
+    months = len(tables["income_factor"])
+    salary_paused = finances.get("income_paused_months", 0) > 0
+    # Full EMIs every month means each loan simply walks its cached schedule
+    on_schedule = not salary_paused and all(
+        loan["emi"] <= EMI_INCOME_CAP * finances["income"] * tables["income_factor"].min() for loan in loans
+    )
+    contributions = target_weights = None
+    if finances.get("portfolio"):
+        contributions, target_weights = portfolio_arrays(finances, asset_names)
+        if salary_paused:
+            contributions = None  # Contributions come out of salary
+    ledger = build_ledger(
+        [0.0 if salary_paused else finances["income"]], [finances["expenses"]], [finances["cash"]],
+        [[loan["principal"] for loan in loans]],
+        [[loan["interest_rate"] for loan in loans]],
+        [[loan["emi"] for loan in loans]],
+        np.fromiter(finances["investments"].values(), float, len(asset_names))[None, :],
+        tables, EMI_INCOME_CAP,
+        _cash_event_flows(state, tables, cash_events) if cash_events else None,
+        schedule_window(loans, months) if loans and on_schedule else None,
+        None if contributions is None else contributions[None, :],
+        None if target_weights is None else target_weights[None, :],
+        -start_month % REBALANCE_MONTHS,
+    )
+
+    # Income and expenses grow with the regime; paid-off EMIs already leave expenses in the ledger
+    finances["income"] *= float(tables["income_factor"][-1])
+    finances["expenses"] = float(ledger["expenses_end"][0])
+    finances["cash"] = float(ledger["cash"][0, -1])
+    if salary_paused:
+        finances["income_paused_months"] = max(0, finances["income_paused_months"] - months)
+
+    for index, loan_name in enumerate(loan_names):
+        balance = float(ledger["loan_balance"][0, index])
+        if balance <= PAYOFF_EPSILON:
+            remove_loan(state, loan_name)
+            log_event(state, f"🎉 Paid off {loan_name.replace('_', ' ').title()}!")
+        else:
+            repay_principal(state, loan_name, finances["loans"][loan_name]["principal"] - balance)
+            advance_loan(finances["loans"][loan_name], months, balance, on_schedule)
+
+    set_holdings(state, asset_names, ledger["invest_value"][0])
+    return ledger
+
+def apply_life_event(state, event, month, queue):
+    """Applies one balance-changing life event at the start of ``month`` of the current fast-forward.
+
+    Cash-only events (``CASH_EVENT_EFFECTS``) never reach here; the ledger
+    books them inside the segment they fall in.
+    """
+    finances = state["finances"]
+    effect = event["effect"]
+    age = state["profile"]["age"] + month // 12
+    details = {"age": age}
+    if effect["type"] == "income_pause":
+        if finances.get("income_paused_months", 0) > 0 or finances["income"] <= 0:
+            return
+        finances["income_paused_months"] = effect["months"]
+        details["months"] = effect["months"]
+        push_event(queue, month + effect["months"], INCOME_RESTORED)
+    elif effect["type"] == "income_resume":
+        if finances.get("income_paused_months", 0) > 0:
+            return  # A later job loss extended the gap
+    elif effect["type"] == "investment_shock":
+        losses = [(asset, change) for asset, change in effect["returns"].items() if finances["investments"].get(asset, 0) > 0]
+        if not losses:
+            return
+        for asset, change in losses:
+            adjust_investment(state, asset, finances["investments"][asset] * change)
+        details["loss"] = -min(change for _, change in losses)
+    else:
+        raise ValueError(f"Unknown life event effect: {effect['type']}")
+    log_event(state, event["message"].format(**details))
+
+@profiled("advance_year")
+def advance_year_with_ledger(state, years=1):
+    """Simulates the passing of years month by month; returns the new state and its monthly ledger.
+
+    Random life events are drawn up front from the session RNG and processed
+    in month order: the ledger runs up to each balance-changing event, the
+    event is applied, and accrual resumes from the new balances. Cash-only
+    events are booked as one-off flows inside the segment they fall in.
+    """
+    if state["game_over"]: return state, None
+    new_state = state.copy()
+    start_age = new_state["profile"]["age"]
+    months = years * 12
+    tables = regime_tables(new_state.get("economy", DEFAULT_REGIME), start_age - STARTING_AGE, years,
+                           tuple(new_state["finances"]["investments"]))
+
+    queue = []
+    if new_state.get("life_events", True):
+        queue = schedule_for_player(session_rng(new_state, f"life_events:{start_age}"), start_age, months)
+    paused = new_state["finances"].get("income_paused_months", 0)
+    if 0 < paused < months:
+        push_event(queue, paused, INCOME_RESTORED)
+
+    ledgers, month = [], 0
+    while month < months:
+        deferred = []
+        while queue and queue[0][0] == month:
+            item = heapq.heappop(queue)
+            if item[2]["effect"]["type"] in CASH_EVENT_EFFECTS:
+                deferred.append(item)
+            else:
+                apply_life_event(new_state, item[2], month, queue)
+        for item in deferred:
+            heapq.heappush(queue, item)
+
+        # Cash-only events ride along in this segment; the next balance-changing event ends it.
+        cash_events = []
+        while queue and queue[0][0] < months and queue[0][2]["effect"]["type"] in CASH_EVENT_EFFECTS:
+            event_month, _, event = heapq.heappop(queue)
+            cash_events.append((event_month - month, event_month, event))
+        next_month = min(queue[0][0], months) if queue else months
+        for _, event_month, event in cash_events:
+            if event_month >= next_month:
+                push_event(queue, event_month, event)  # Shares its month with the next balance-changing event
+        cash_events = [item for item in cash_events if item[1] < next_month]
+        ledgers.append(_run_ledger_segment(new_state, slice_tables(tables, month, next_month), cash_events, month))
+        month = next_month
+
+    new_state["profile"]["age"] += years
+    log_event(new_state, f"--- Age {new_state['profile']['age']} ---")
+    new_state = update_net_worth(new_state)
+    new_state["financial_health"] = calculate_financial_health(new_state)
+    return new_state, concat_ledgers(ledgers)
+
+def advance_year(state, years=1):
+    """Simulates the passing of years with realistic constraints."""
+    return advance_year_with_ledger(state, years)[0]
+
+def get_branching_scenarios():
+    """Returns a complete dictionary of branching scenarios."""
+    return {
+        "initial": {
+            "narrative": "At age 12, your uncle gives you ₹2,000 as a birthday gift. What do you do with it?",
+            "choices": [
+                {"id": "choice_1", "text": "Spend it on a new video game (Cost: ₹2,000)", "next_key": "spend_12"},
+                {"id": "choice_2", "text": "Save it in a piggy bank (Savings: +₹2,000)", "next_key": "save_12"},
+                {"id": "choice_3", "text": "Invest it in a fixed deposit (Savings: +₹2,000 + 6% interest)", "next_key": "invest_12"}
+            ],
+            "reasoning": {
+                "choice_1": "Spending reduces cash, missing growth opportunities—poor start.",
+                "choice_2": "Saving builds a small buffer—better for safety.",
+                "choice_3": "Investing grows money over time—best for future wealth."
+            }
+        },
+        # Branch: Spend at 12
+        "spend_12": {
+            "narrative": "At 25, with little savings, you want a ₹20,000 smartphone. What now?",
+            "choices": [
+                {"id": "choice_1", "text": "Take a loan with 10% interest, repay in 12 months (EMI: ₹1,750/month)", "next_key": "loan_25_spend"},
+                {"id": "choice_2", "text": "Save ₹5,000/month for 4 months, then buy", "next_key": "save_25_spend"}
+            ],
+            "reasoning": {
+                "choice_1": "A loan adds debt early—risky with low cash.",
+                "choice_2": "Saving avoids debt—smarter for stability."
+            }
+        },
+        "loan_25_spend": {
+            "narrative": "At 40, with a phone loan, you need a ₹5,00,000 car. How do you finance it?",
+            "choices": [
+                {"id": "choice_1", "text": "Take a loan at 8% over 5 years (EMI: ₹10,000/month)", "next_key": "loan_40_loan"},
+                {"id": "choice_2", "text": "Save ₹15,000/month for 3 years", "next_key": "save_40_loan"}
+            ],
+            "reasoning": {
+                "choice_1": "More debt increases burden—bad if income is tight.",
+                "choice_2": "Saving delays purchase but avoids debt—better long-term."
+            }
+        },
+        "save_25_spend": {
+            "narrative": "At 40, debt-free, you need a ₹5,00,000 car. What’s your move?",
+            "choices": [
+                {"id": "choice_1", "text": "Pay ₹2,00,000 cash, loan ₹3,00,000 at 8% over 3 years (EMI: ₹9,400/month)", "next_key": "mix_40_save"},
+                {"id": "choice_2", "text": "Save ₹15,000/month for 3 years", "next_key": "save_40_save"}
+            ],
+            "reasoning": {
+                "choice_1": "Mixing cash and loan balances cost and liquidity—practical choice.",
+                "choice_2": "Saving fully avoids debt—best if you can wait."
+            }
+        },
+        "loan_40_loan": {
+            "narrative": "At 65, with loans, a ₹3,00,000 medical emergency hits. How do you cope?",
+            "choices": [
+                {"id": "choice_1", "text": "Take a loan at 9% over 3 years (EMI: ₹9,500/month)", "next_key": "end_loan_loan"},
+                {"id": "choice_2", "text": "Use cash (Savings: -₹3,00,000)", "next_key": "end_cash_loan"}
+            ],
+            "reasoning": {
+                "choice_1": "More debt in retirement strains pension—poor choice.",
+                "choice_2": "Cash preserves health if you have enough—better option."
+            }
+        },
+        "save_40_loan": {
+            "narrative": "At 65, after saving, a ₹3,00,000 medical emergency arises. What’s your plan?",
+            "choices": [
+                {"id": "choice_1", "text": "Use cash (Savings: -₹3,00,000)", "next_key": "end_cash_save"},
+                {"id": "choice_2", "text": "Take a loan at 9% over 3 years (EMI: ₹9,500/month)", "next_key": "end_loan_save"}
+            ],
+            "reasoning": {
+                "choice_1": "Cash keeps you debt-free—best with savings.",
+                "choice_2": "A loan adds burden—avoid unless necessary."
+            }
+        },
+        "mix_40_save": {
+            "narrative": "At 65, with a car loan, a ₹3,00,000 medical emergency occurs. What now?",
+            "choices": [
+                {"id": "choice_1", "text": "Use cash (Savings: -₹3,00,000)", "next_key": "end_cash_mix"},
+                {"id": "choice_2", "text": "Take a loan at 9% over 3 years (EMI: ₹9,500/month)", "next_key": "end_loan_mix"}
+            ],
+            "reasoning": {
+                "choice_1": "Cash reduces debt load—better if affordable.",
+                "choice_2": "A loan adds expenses—risky in retirement."
+            }
+        },
+        "save_40_save": {
+            "narrative": "At 65, with no debt, a ₹3,00,000 medical emergency strikes. What’s your choice?",
+            "choices": [
+                {"id": "choice_1", "text": "Use cash (Savings: -₹3,00,000)", "next_key": "end_cash_full_save"},
+                {"id": "choice_2", "text": "Investments cover ₹1,50,000, cash ₹1,50,000", "next_key": "end_invest_save"}
+            ],
+            "reasoning": {
+                "choice_1": "Cash use keeps you debt-free—solid option.",
+                "choice_2": "Using investments preserves cash—best for liquidity."
+            }
+        },
+        # Branch: Save at 12
+        "save_12": {
+            "narrative": "At 25, with ₹2,500 saved, you want a ₹20,000 smartphone. How do you proceed?",
+            "choices": [
+                {"id": "choice_1", "text": "Use savings, loan ₹17,500 at 10% (EMI: ₹1,500/month)", "next_key": "loan_25_save"},
+                {"id": "choice_2", "text": "Save ₹5,000/month for 4 months", "next_key": "save_25_save"}
+            ],
+            "reasoning": {
+                "choice_1": "A loan adds debt—okay if manageable.",
+                "choice_2": "Saving avoids debt—best for health."
+            }
+        },
+        "loan_25_save": {
+            "narrative": "At 40, with a phone loan, you need a ₹5,00,000 car. What do you do?",
+            "choices": [
+                {"id": "choice_1", "text": "Take a loan at 8% over 5 years (EMI: ₹10,000/month)", "next_key": "loan_40_loan_save"},
+                {"id": "choice_2", "text": "Save ₹15,000/month for 3 years", "next_key": "save_40_loan_save"}
+            ],
+            "reasoning": {
+                "choice_1": "More debt increases risk—bad if overextended.",
+                "choice_2": "Saving reduces debt—better for stability."
+            }
+        },
+        "save_25_save": {
+            "narrative": "At 40, debt-free, you need a ₹5,00,000 car. How do you buy it?",
+            "choices": [
+                {"id": "choice_1", "text": "Pay ₹2,00,000 cash, loan ₹3,00,000 at 8% over 3 years (EMI: ₹9,400/month)", "next_key": "mix_40_full_save"},
+                {"id": "choice_2", "text": "Invest ₹1,00,000, save ₹12,000/month for 3 years", "next_key": "invest_40_save"}
+            ],
+            "reasoning": {
+                "choice_1": "Mixing cash and loan is practical—good balance.",
+                "choice_2": "Investing grows wealth—best if you can delay."
+            }
+        },
+        # Branch: Invest at 12
+        "invest_12": {
+            "narrative": "At 25, your ₹2,000 grew to ₹4,000. You want a ₹20,000 smartphone. What’s your plan?",
+            "choices": [
+                {"id": "choice_1", "text": "Sell investment, loan ₹16,000 at 10% (EMI: ₹1,400/month)", "next_key": "loan_25_invest"},
+                {"id": "choice_2", "text": "Keep investment, save ₹5,000/month for 4 months", "next_key": "save_25_invest"}
+            ],
+            "reasoning": {
+                "choice_1": "Selling stops growth, adds debt—okay but not great.",
+                "choice_2": "Keeping investment grows wealth—best choice."
+            }
+        },
+        "loan_25_invest": {
+            "narrative": "At 40, with a phone loan, you need a ₹5,00,000 car. What’s your strategy?",
+            "choices": [
+                {"id": "choice_1", "text": "Take a loan at 8% over 5 years (EMI: ₹10,000/month)", "next_key": "loan_40_loan_invest"},
+                {"id": "choice_2", "text": "Save ₹15,000/month for 3 years", "next_key": "save_40_loan_invest"}
+            ],
+            "reasoning": {
+                "choice_1": "More debt adds pressure—bad if cash is low.",
+                "choice_2": "Saving avoids debt—better for health."
+            }
+        },
+        "save_25_invest": {
+            "narrative": "At 40, with investments at ₹50,000, you need a ₹5,00,000 car. What now?",
+            "choices": [
+                {"id": "choice_1", "text": "Sell investments (₹50,000), loan ₹4,50,000 at 8% over 5 years (EMI: ₹9,000/month)", "next_key": "mix_40_invest"},
+                {"id": "choice_2", "text": "Keep investments, save ₹15,000/month for 3 years", "next_key": "save_40_invest"}
+            ],
+            "reasoning": {
+                "choice_1": "Selling uses gains, adds debt—practical but costly.",
+                "choice_2": "Saving preserves investments—best for wealth."
+            }
+        },
+        # Simplified endgames for brevity (expand as needed)
+        "end_loan_loan": {"narrative": "Game Over - Retired with heavy debt!", "choices": []},
+        "end_cash_loan": {"narrative": "Game Over - Retired with low savings!", "choices": []},
+        "end_cash_save": {"narrative": "Game Over - Retired comfortably!", "choices": []},
+        "end_loan_save": {"narrative": "Game Over - Retired with some debt!", "choices": []},
+        "end_cash_mix": {"narrative": "Game Over - Retired with stable savings!", "choices": []},
+        "end_loan_mix": {"narrative": "Game Over - Retired with moderate debt!", "choices": []},
+        "end_cash_full_save": {"narrative": "Game Over - Retired with good savings!", "choices": []},
+        "end_invest_save": {"narrative": "Game Over - Retired with strong wealth!", "choices": []}
+    }
+
+SCENARIOS = get_branching_scenarios()  # Built once for the engine's hot path; treat as read-only
+
+def create_new_game(regime=DEFAULT_REGIME, seed=None, life_events=True):
+    """Returns a fresh game state positioned at the initial scenario."""
+    state = initialize_game_state(regime, seed, life_events)
+    state["current_event"] = SCENARIOS["initial"]
+    log_event(state, f"\n✨ EVENT: {state['current_event']['narrative']}")
+    return state
+
+@profiled("process_decision_and_advance")
+def process_decision_and_advance(state, choice_text):
+    """Processes the choice with realistic constraints."""
+    if state["game_over"]: return state
+    new_state = state.copy()
+    scenarios = SCENARIOS
+    current_event = scenarios[new_state["scenario_key"]]
+    choice_index, choice = next((i, c) for i, c in enumerate(current_event["choices"]) if c["text"] == choice_text)
+    choice_id = choice["id"]
+    reasoning = current_event["reasoning"][choice_id]
+    impact_message = f"You chose: '{choice_text}'. {reasoning}"
+
+    annual_income = new_state["finances"]["income"] * 12
+    loan_cap = annual_income * LOAN_CAP_MULTIPLIER
+
+    if new_state["scenario_key"] == "initial":
+        if "Spend it" in choice_text:
+            new_state["finances"]["cash"] -= 2000
+        elif "Save it" in choice_text:
+            new_state["finances"]["cash"] += 2000
+        elif "Invest it" in choice_text:
+            adjust_investment(new_state, "fixed_deposit", 2000)
+            new_state["finances"]["cash"] += 120  # 6% interest
+        new_state = advance_year(new_state, years=13)
+        new_state["finances"]["income"] = 25000  # Realistic starting salary
+        new_state["finances"]["expenses"] = 15000
+
+    elif "25" in new_state["scenario_key"]:
+        if "loan" in choice_text and "₹1,750" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 21000 <= loan_cap:
+                add_loan(new_state, "phone_loan", 21000, 0.10, 1750)
+                new_state["finances"]["expenses"] += 1750
+                new_state["finances"]["cash"] -= 21000
+            else:
+                log_event(new_state, "⚠ Loan denied: Exceeds capacity!")
+                new_state["finances"]["cash"] -= 20000  # Forced cash spend
+        elif "Save ₹5,000" in choice_text:
+            new_state["finances"]["cash"] += 20000 - 20000
+        elif "loan ₹17,500" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 17500 <= loan_cap:
+                add_loan(new_state, "phone_loan", 17500, 0.10, 1500)
+                new_state["finances"]["expenses"] += 1500
+                new_state["finances"]["cash"] -= 2500
+            else:
+                new_state["finances"]["cash"] -= 20000
+        elif "loan ₹16,000" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 16000 <= loan_cap:
+                add_loan(new_state, "phone_loan", 16000, 0.10, 1400)
+                new_state["finances"]["expenses"] += 1400
+                new_state["finances"]["cash"] += 4000 - 20000
+            else:
+                new_state["finances"]["cash"] -= 16000
+        new_state = advance_year(new_state, years=15)
+        new_state["finances"]["income"] = 60000  # Mid-career salary
+        new_state["finances"]["expenses"] = 35000 if not new_state["finances"]["loans"] else new_state["finances"]["expenses"]
+
+    elif "40" in new_state["scenario_key"]:
+        if "loan" in choice_text and "5 years" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 500000 <= loan_cap:
+                add_loan(new_state, "car_loan", 500000, 0.08, 10000)
+                new_state["finances"]["expenses"] += 10000
+            else:
+                log_event(new_state, "⚠ Loan denied: Exceeds capacity!")
+                new_state["finances"]["cash"] -= 500000
+        elif "Save ₹15,000" in choice_text:
+            new_state["finances"]["cash"] += 540000  # 15,000 * 36 months
+        elif "loan ₹3,00,000" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 300000 <= loan_cap:
+                add_loan(new_state, "car_loan", 300000, 0.08, 9400)
+                new_state["finances"]["expenses"] += 9400
+                new_state["finances"]["cash"] -= 200000
+            else:
+                new_state["finances"]["cash"] -= 500000
+        elif "Invest ₹1,00,000" in choice_text:
+            adjust_investment(new_state, "mutual_funds", 100000)
+            new_state["finances"]["cash"] += 432000 - 500000  # 12,000 * 36 - car cost
+        elif "loan ₹4,50,000" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 450000 <= loan_cap:
+                add_loan(new_state, "car_loan", 450000, 0.08, 9000)
+                new_state["finances"]["expenses"] += 9000
+                adjust_investment(new_state, "fixed_deposit", -50000)
+                new_state["finances"]["cash"] += 50000
+            else:
+                new_state["finances"]["cash"] -= 450000
+        new_state = advance_year(new_state, years=25)
+        new_state["finances"]["income"] = 30000  # Pension
+        new_state["finances"]["expenses"] = 25000 if not new_state["finances"]["loans"] else new_state["finances"]["expenses"]
+
+    elif "65" in new_state["scenario_key"]:
+        if "Take a loan" in choice_text:
+            if len(new_state["finances"]["loans"]) < MAX_LOANS and 300000 <= loan_cap:
+                add_loan(new_state, "medical_loan", 300000, 0.09, 9500)
+                new_state["finances"]["expenses"] += 9500
+            else:
+                new_state["finances"]["cash"] -= 300000
+        elif "Use cash" in choice_text:
+            new_state["finances"]["cash"] -= 300000
+        elif "Investments cover" in choice_text:
+            adjust_investment(new_state, "mutual_funds", -150000)
+            new_state["finances"]["cash"] -= 150000
+        new_state["game_over"] = True
+
+    # Prevent negative cash without loans
+    if new_state["finances"]["cash"] < 0 and not new_state["finances"]["loans"]:
+        new_state["finances"]["cash"] = 0
+        log_event(new_state, "⚠ Cash hit zero—adjusted to prevent bankruptcy!")
+
+    new_state["decision_log"] = new_state["decision_log"] + [choice_index]
+    new_state["last_decision_impact"] = impact_message
+    log_event(new_state, impact_message)
+    new_state = update_net_worth(new_state)
+    new_state["financial_health"] = calculate_financial_health(new_state)
+
+    next_key = choice["next_key"]
+    if next_key in scenarios:
+        if next_key.startswith("end"):
+            new_state["game_over"] = True
+            new_state["current_event"] = scenarios[next_key]
+        else:
+            new_state["scenario_key"] = next_key
+            new_state["current_event"] = scenarios[next_key]
+            log_event(new_state, f"\n✨ EVENT: {new_state['current_event']['narrative']}")
+    else:
+        new_state["game_over"] = True
+        new_state["current_event"] = {"narrative": "Game Over - Unexpected End!", "choices": []}
+
+    return new_state
+
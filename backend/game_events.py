@@ -0,0 +1,55 @@
+"""Random life events declared in ``life_events.json`` and scheduled by month during fast-forwards."""
+import heapq
+import itertools
+import json
+import math
+import pathlib
+from functools import lru_cache
+
+import numpy as np
+
+LIFE_EVENTS_PATH = pathlib.Path(__file__).parent / "life_events.json"
+INCOME_RESTORED = {"name": "income_restored", "effect": {"type": "income_resume"}, "message": "💼 Back at work at {age}."}
+
+_follow_up_sequence = itertools.count(1_000_000)  # Sorts follow-ups after sampled events in the same month
+
+@lru_cache(maxsize=None)
+def load_life_events(path=LIFE_EVENTS_PATH):
+    """Returns the event definitions as a tuple, in file order."""
+    return tuple(json.loads(pathlib.Path(path).read_text(encoding="utf-8")))
+
+@lru_cache(maxsize=None)
+def _event_arrays(path):
+    events = load_life_events(path)
+    hazard = 1 - (1 - np.array([event["annual_probability"] for event in events])) ** (1 / 12)
+    hazard.flags.writeable = False
+    min_age = np.array([event.get("min_age", 0) for event in events])
+    max_age = np.array([event.get("max_age", 200) for event in events])
+    return hazard, min_age, max_age
+
+def schedule_for_player(rng, start_age, months, path=LIFE_EVENTS_PATH):
+    """Returns a month-keyed heap of ``(month, sequence, event)`` for one player.
+
+    Each event fires in a month with its monthly hazard while the player's
+    age is inside its window. Draws come from a ``random.Random``, jumping
+    between firings with geometric gaps so a quiet decade costs one draw per
+    event type instead of one per month.
+    """
+    hazard, min_age, max_age = _event_arrays(path)
+    queue = []
+    for index, event in enumerate(load_life_events(path)):
+        first = max(0, math.ceil((min_age[index] - start_age) * 12))
+        stop = min(months, math.ceil((max_age[index] - start_age) * 12))
+        log_miss = math.log1p(-hazard[index])
+        month = first - 1
+        while True:
+            month += 1 + int(math.log(1 - rng.random()) / log_miss)
+            if month >= stop:
+                break
+            queue.append((month, len(queue), event))
+    heapq.heapify(queue)
+    return queue
+
+def push_event(queue, month, event):
+    """Adds a follow-up event; the sequence number keeps same-month events in insertion order."""
+    heapq.heappush(queue, (month, next(_follow_up_sequence), event))
@@ -0,0 +1,150 @@
+"""Monthly cash-flow ledger for the game engine, vectorized over players and months.
+
+Every input has a leading player axis so a whole batch of players is simulated
+with one set of array operations. Loans are amortized in closed form:
+``B_t = g^t * (B_0 - sum_{s<=t} pay_s * g^-s)`` with ``g = 1 + rate / 12``, so
+no Python-level loop runs per month. Callers holding cached schedules (see
+``game_loans``) can pass the loan flows in directly.
+"""
+import numpy as np
+
+from game_portfolio import portfolio_path
+
+LEDGER_COLUMNS = ("income", "expenses", "emi", "interest", "principal", "investment_accrual", "cash")
+PAYOFF_EPSILON = 0.005  # Balances below half a paisa count as paid off
+
+def amortize(loan_principal, loan_rate, loan_emi, monthly_income, emi_income_cap):
+    """Closed-form amortization of (P, L) loans against (P, M) incomes, masked once each loan is paid off.
+
+    Returns ``(payment, interest, alive, still_open, closing_balance)``: three
+    (P, L, M) flows and masks per month plus the (P, L) balance left at the end.
+    """
+    months = monthly_income.shape[-1]
+    growth = (1 + loan_rate / 12)[..., None]
+    growth_powers = growth ** np.arange(1, months + 1)
+    scheduled = np.minimum(loan_emi[..., None], emi_income_cap * monthly_income[:, None, :])
+    raw_balance = growth_powers * (loan_principal[..., None] - np.cumsum(scheduled / growth_powers, axis=-1))
+    opening = np.concatenate([loan_principal[..., None], raw_balance[..., :-1]], axis=-1)
+    alive = np.minimum.accumulate(opening > PAYOFF_EPSILON, axis=-1)
+    grown = opening * growth
+    payment = np.minimum(scheduled, grown) * alive
+    interest = (grown - opening) * alive
+    still_open = alive & (raw_balance > PAYOFF_EPSILON)
+    closing_balance = np.where(still_open[..., -1], raw_balance[..., -1], 0.0) if months else loan_principal
+    return payment, interest, alive, still_open, closing_balance
+
+def build_ledger(income, expenses, cash, loan_principal, loan_rate, loan_emi, invest_value, tables,
+                 emi_income_cap=0.4, cash_flows=None, loan_schedule=None, contributions=None,
+                 target_weights=None, first_rebalance=0):
+    """Simulates a batch of players over the span covered by ``tables``.
+
+    ``income``, ``expenses`` and ``cash`` have shape (P,); ``loan_*`` have shape
+    (P, L) and ``invest_value`` shape (P, A), zero-padded for players with fewer
+    loans or assets. Loan rates are annual. ``tables`` holds the monthly growth
+    factors from ``game_economy.regime_tables``. Returns a dict with one (P, M)
+    array per name in ``LEDGER_COLUMNS`` plus the closing ``loan_balance``
+    (P, L), ``payoff_month`` (P, L; -1 when still open), ``invest_value``
+    (P, A) and ``expenses_end`` (P,). ``cash_flows`` optionally adds one-off
+    (P, M) amounts to cash at the start of each month. ``loan_schedule``
+    optionally supplies precomputed loan flows in ``amortize``'s format.
+    ``contributions`` (P, A) move cash into assets every month and
+    ``target_weights`` (P, A) rebalance holdings every year from month
+    ``first_rebalance`` (see ``game_portfolio.portfolio_path``).
+    """
+    income = np.asarray(income, dtype=float)
+    expenses = np.asarray(expenses, dtype=float)
+    cash = np.asarray(cash, dtype=float)
+    loan_principal = np.asarray(loan_principal, dtype=float)
+    loan_rate = np.asarray(loan_rate, dtype=float)
+    loan_emi = np.asarray(loan_emi, dtype=float)
+    invest_value = np.asarray(invest_value, dtype=float)
+    if contributions is not None:
+        contributions = np.asarray(contributions, dtype=float)
+    if target_weights is not None:
+        target_weights = np.asarray(target_weights, dtype=float)
+
+    income_factor = tables["income_factor"]
+    expense_factor = tables["expense_factor"]
+    months = len(income_factor)
+    monthly_income = income[:, None] * income_factor
+
+    if loan_schedule is None:
+        payment, interest, alive, still_open, closing_balance = amortize(
+            loan_principal, loan_rate, loan_emi, monthly_income, emi_income_cap)
+    else:
+        payment, interest, alive, still_open, closing_balance = loan_schedule
+
+    # A paid-off loan's EMI leaves expenses from the following month, inflating from its payoff year.
+    months_alive = alive.sum(axis=-1)
+    paid_off = (loan_principal > PAYOFF_EPSILON) & (months_alive < months)
+    payoff_month = np.where(paid_off, months_alive - 1, -1)
+    relief_weight = np.where(paid_off, loan_emi / expense_factor[np.clip(payoff_month, 0, None)], 0.0)
+    after_payoff = np.arange(months) > payoff_month[..., None]
+    relief = np.einsum("pl,plm->pm", relief_weight, after_payoff.astype(float)) * expense_factor
+    monthly_expenses = expenses[:, None] * expense_factor - relief
+
+    # Investments compound monthly at the rate equivalent to each year's annual return.
+    if contributions is None and target_weights is None:
+        invest_path = invest_value[..., None] * tables["invest_factor"]
+        accrual = np.diff(invest_path, axis=-1).sum(axis=1)
+    else:
+        invest_path = portfolio_path(invest_value, tables["invest_factor"], contributions, target_weights, first_rebalance)
+        contributed = np.zeros(len(invest_value)) if contributions is None else contributions.sum(axis=-1)
+        accrual = np.diff(invest_path, axis=-1).sum(axis=1) - contributed[:, None]
+
+    # Cash never goes negative while no loan is open: reflect the running balance at zero in those months.
+    emi = payment.sum(axis=1)
+    flows = monthly_income - monthly_expenses - emi
+    if contributions is not None:
+        flows = flows - contributions.sum(axis=-1)[:, None]
+    if cash_flows is not None:
+        flows = flows + cash_flows
+    running = cash[:, None] + np.cumsum(flows, axis=-1)
+    debt_free = ~still_open.any(axis=1)
+    floor = np.maximum.accumulate(-running * debt_free, axis=-1)
+    monthly_cash = running + np.maximum(floor, 0.0)
+
+    return {
+        "income": monthly_income,
+        "expenses": monthly_expenses,
+        "emi": emi,
+        "interest": interest.sum(axis=1),
+        "principal": (payment - interest).sum(axis=1),
+        "investment_accrual": accrual,
+        "cash": monthly_cash,
+        "loan_balance": closing_balance,
+        "payoff_month": payoff_month,
+        "invest_value": invest_path[..., -1],
+        "expenses_end": monthly_expenses[:, -1] if months else expenses,
+    }
+
+def yearly_view(ledger):
+    """Aggregates a monthly ledger to (P, years): flows are summed, cash is the year-end balance."""
+    view = {}
+    for column in LEDGER_COLUMNS:
+        values = ledger[column]
+        by_year = values.reshape(values.shape[0], -1, 12)
+        view[column] = by_year[..., -1] if column == "cash" else by_year.sum(axis=-1)
+    return view
+
+def slice_tables(tables, start, stop):
+    """Rebases growth tables to the months ``[start, stop)`` so a span can be simulated in segments."""
+    if start == 0 and stop == len(tables["income_factor"]):
+        return tables
+    income_base = tables["income_factor"][start - 1] if start else 1.0
+    expense_base = tables["expense_factor"][start - 1] if start else 1.0
+    invest = tables["invest_factor"]
+    return {
+        "income_factor": tables["income_factor"][start:stop] / income_base,
+        "expense_factor": tables["expense_factor"][start:stop] / expense_base,
+        "invest_factor": invest[:, start:stop + 1] / invest[:, start:start + 1],
+    }
+
+def concat_ledgers(ledgers):
+    """Joins consecutive segment ledgers along the month axis; closing balances come from the last one."""
+    if len(ledgers) == 1:
+        return ledgers[0]
+    joined = dict(ledgers[-1])
+    for column in LEDGER_COLUMNS:
+        joined[column] = np.concatenate([ledger[column] for ledger in ledgers], axis=-1)
+    return joined
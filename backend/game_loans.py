@@ -0,0 +1,111 @@
+"""Loan amortization schedules, computed once per loan and shared by every fast-forward.
+
+A loan dict is ``{principal, interest_rate, emi, origin, months_paid}``: the
+schedule is keyed by the balance it started from (``origin``), the rate and
+the EMI, and ``months_paid`` indexes into it. Balance and payoff queries are
+array lookups; the ledger slices payments and interest straight out of the
+schedule whenever the EMI income cap cannot bind.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from game_ledger import PAYOFF_EPSILON
+
+MAX_SCHEDULE_MONTHS = 1200  # Horizon for loans whose EMI never covers the interest
+
+# --- Schedules ---
+
+@lru_cache(maxsize=1024)
+def amortization_schedule(principal, annual_rate, emi):
+    """Month-by-month schedule for a loan paying a fixed ``emi``.
+
+    Returns read-only ``balance`` (N + 1,), the balance at the start of each
+    month, ``payment`` and ``interest`` (N,), plus ``payoff_month``, the
+    number of payments until the loan closes (None if it never does). The
+    last payment only clears what is left.
+    """
+    growth = 1 + annual_rate / 12
+    monthly_rate = growth - 1
+    if principal <= PAYOFF_EPSILON:
+        months = 0
+    elif emi <= principal * monthly_rate:
+        months = MAX_SCHEDULE_MONTHS
+    elif monthly_rate == 0:
+        months = math.ceil(principal / emi) + 1
+    else:
+        # Closed-form n for B_n = 0, plus a month of slack for rounding
+        months = math.ceil(-math.log(1 - principal * monthly_rate / emi) / math.log(growth)) + 1
+    months = min(months, MAX_SCHEDULE_MONTHS)
+
+    growth_powers = growth ** np.arange(1, months + 1)
+    raw_balance = growth_powers * (principal - np.cumsum(emi / growth_powers))
+    opening = np.concatenate([[principal], raw_balance[:-1]])[:months]
+    alive = np.minimum.accumulate(opening > PAYOFF_EPSILON)
+    grown = opening * growth
+    payment = np.minimum(emi, grown) * alive
+    interest = (grown - opening) * alive
+    balance = np.concatenate([[principal], np.where(alive & (raw_balance > PAYOFF_EPSILON), raw_balance, 0.0)])
+
+    paid_off = np.flatnonzero(balance <= PAYOFF_EPSILON)
+    schedule = {
+        "balance": balance,
+        "payment": payment,
+        "interest": interest,
+        "payoff_month": int(paid_off[0]) if len(paid_off) else None,
+    }
+    for key in ("balance", "payment", "interest"):
+        schedule[key].flags.writeable = False
+    return schedule
+
+def loan_schedule(loan):
+    """The cached schedule a loan is currently following."""
+    return amortization_schedule(loan.get("origin", loan["principal"]), loan["interest_rate"], loan["emi"])
+
+# --- Queries ---
+
+def loan_balance(loan, months_ahead=0):
+    """Balance ``months_ahead`` months from now if every EMI is paid in full."""
+    balance = loan_schedule(loan)["balance"]
+    index = loan.get("months_paid", 0) + months_ahead
+    return float(balance[index]) if index < len(balance) else 0.0
+
+def months_to_payoff(loan):
+    """Remaining full-EMI payments before the loan closes, or None if it never amortizes."""
+    payoff_month = loan_schedule(loan)["payoff_month"]
+    if payoff_month is None:
+        return None
+    return max(payoff_month - loan.get("months_paid", 0), 0)
+
+def schedule_window(loans, months):
+    """Returns ``(payment, interest, alive, still_open, closing_balance)`` for the next ``months`` months.
+
+    Arrays have the ledger's (1, L, M) shape (closing balance (1, L)) and are
+    sliced from each loan's cached schedule, zero-padded past payoff.
+    """
+    payment = np.zeros((1, len(loans), months))
+    interest = np.zeros((1, len(loans), months))
+    balance_after = np.zeros((1, len(loans), months))
+    opening = np.zeros((1, len(loans), months))
+    for row, loan in enumerate(loans):
+        schedule = loan_schedule(loan)
+        start = loan.get("months_paid", 0)
+        stop = min(start + months, len(schedule["payment"]))
+        span = max(stop - start, 0)
+        payment[0, row, :span] = schedule["payment"][start:stop]
+        interest[0, row, :span] = schedule["interest"][start:stop]
+        opening[0, row, :span] = schedule["balance"][start:stop]
+        balance_after[0, row, :span] = schedule["balance"][start + 1:stop + 1]
+    alive = opening > PAYOFF_EPSILON
+    still_open = balance_after > PAYOFF_EPSILON
+    closing = balance_after[..., -1] if months else np.array([[loan["principal"] for loan in loans]])
+    return payment, interest, alive, still_open, closing
+
+def advance_loan(loan, months, balance, on_schedule):
+    """Moves a loan ``months`` along; a loan that left its schedule (capped EMIs) starts a new one from ``balance``."""
+    if on_schedule:
+        loan["months_paid"] = loan.get("months_paid", 0) + months
+    else:
+        loan["origin"] = balance
+        loan["months_paid"] = 0
@@ -0,0 +1,117 @@
+"""Multi-asset portfolios: Indian asset classes, monthly contributions and periodic rebalancing.
+
+Holdings live in ``finances["investments"]`` (asset -> value) as before. A game
+that invests regularly also carries ``finances["portfolio"]`` with monthly
+``contributions`` and optional ``target_weights`` (both asset -> number). The
+ledger turns these into (P, A) arrays once per segment and ``portfolio_path``
+grows, funds and rebalances every asset for every month in a handful of
+array operations, so more asset classes mean wider arrays, not more loops.
+"""
+import numpy as np
+
+# Asset classes the engine knows about, with their display names
+ASSET_CLASSES = {
+    "fixed_deposit": "Fixed Deposit",
+    "ppf": "PPF",
+    "nps": "NPS",
+    "mutual_funds": "Mutual Funds",
+    "equity_index": "Equity Index Fund",
+    "gold": "Gold",
+}
+REBALANCE_MONTHS = 12  # Portfolios with target weights are rebalanced at the start of every year
+
+# --- State Helpers ---
+
+def _portfolio(state):
+    finances = state["finances"]
+    if "portfolio" not in finances:
+        finances["portfolio"] = {"contributions": {}, "target_weights": None}
+    return finances["portfolio"]
+
+def _hold(state, assets):
+    investments = state["finances"]["investments"]
+    for asset in assets:
+        if asset not in ASSET_CLASSES:
+            raise KeyError(f"Unknown asset class: {asset}")
+        investments.setdefault(asset, 0)
+
+def set_contribution(state, asset, monthly):
+    """Starts (or, with 0, stops) a monthly contribution from cash into ``asset``."""
+    _hold(state, [asset])
+    contributions = dict(_portfolio(state)["contributions"])
+    if monthly:
+        contributions[asset] = monthly
+    else:
+        contributions.pop(asset, None)
+    state["finances"]["portfolio"]["contributions"] = contributions
+
+def set_target_weights(state, weights):
+    """Sets the allocation restored at every rebalance; weights are normalized, None turns rebalancing off."""
+    if weights is None:
+        _portfolio(state)["target_weights"] = None
+        return
+    _hold(state, weights)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Target weights must sum to a positive number")
+    _portfolio(state)["target_weights"] = {asset: weight / total for asset, weight in weights.items()}
+
+def portfolio_arrays(finances, asset_names):
+    """Returns ``(contributions, target_weights)`` as (A,) arrays in ``asset_names`` order (weights may be None)."""
+    portfolio = finances.get("portfolio") or {}
+    contributions = portfolio.get("contributions") or {}
+    weights = portfolio.get("target_weights")
+    contribution_array = np.array([contributions.get(name, 0.0) for name in asset_names], dtype=float)
+    weight_array = None if weights is None else np.array([weights.get(name, 0.0) for name in asset_names], dtype=float)
+    return contribution_array, weight_array
+
+# --- Vectorized Growth ---
+
+def portfolio_path(values, factors, contributions=None, weights=None, first_rebalance=0, period=REBALANCE_MONTHS):
+    """Month-by-month holdings for a batch of portfolios.
+
+    ``values`` (P, A) are the opening holdings and ``factors`` (A, M + 1) the
+    cumulative growth of one rupee per asset (``regime_tables``'
+    ``invest_factor``). ``contributions`` (P, A) are added at the start of
+    every month. With ``weights`` (P, A), holdings are reset to those weights
+    at months ``first_rebalance + k * period``. Returns (P, A, M + 1) holdings,
+    post-rebalance at rebalance months.
+
+    Between rebalances every asset grows independently, so each block is
+    closed-form; the block-start totals follow ``T_k = g_k T_(k-1) + h_k`` and
+    are solved with one cumulative product and sum over blocks.
+    """
+    values = np.asarray(values, dtype=float)
+    players, months = len(values), factors.shape[-1] - 1
+    if contributions is None:
+        contributions = np.zeros_like(values)
+    rebalanced_first = weights is not None and first_rebalance == 0
+    if weights is None or first_rebalance >= months:
+        starts = np.array([0])
+    else:
+        starts = np.unique(np.concatenate([[0], np.arange(first_rebalance, months, period)]))
+    ends = np.append(starts[1:], months)
+    block = np.searchsorted(starts, np.arange(months + 1), side="right") - 1  # (M + 1,) block of each month
+    block_start = starts[block]
+
+    # A contribution made at the start of month s is worth c * F(t) / F(s) at month t.
+    funded = np.concatenate([np.zeros((len(factors), 1)), np.cumsum(1 / factors[:, :-1], axis=-1)], axis=-1)
+    growth_in_block = factors / factors[:, block_start]  # (A, M + 1)
+    contributed_in_block = contributions[..., None] * factors * (funded - funded[:, block_start])  # (P, A, M + 1)
+
+    # Opening holdings of each block (P, K, A): the first block starts from ``values``, later ones from
+    # the target weights times the previous block's closing total.
+    openings = np.repeat(values[:, None, :], len(starts), axis=1)
+    if rebalanced_first:
+        openings[:, 0, :] = weights * values.sum(axis=-1, keepdims=True)
+    if len(starts) > 1:
+        block_growth = factors[:, ends] / factors[:, starts]  # (A, K)
+        block_funding = contributions @ (factors[:, ends] * (funded[:, ends] - funded[:, starts]))  # (P, K)
+        first_total = (openings[:, 0, :] * block_growth[:, 0]).sum(axis=-1) + block_funding[:, 0]
+        rates = weights @ block_growth[:, 1:-1]  # (P, K - 2)
+        compounded = np.concatenate([np.ones((players, 1)), np.cumprod(rates, axis=-1)], axis=-1)  # (P, K - 1)
+        discounted_funding = np.cumsum(block_funding[:, 1:-1] / compounded[:, 1:], axis=-1)
+        totals = compounded * (first_total[:, None] + np.concatenate([np.zeros((players, 1)), discounted_funding], axis=-1))
+        openings[:, 1:, :] = weights[:, None, :] * totals[..., None]
+
+    return openings[:, block, :].transpose(0, 2, 1) * growth_in_block + contributed_in_block
@@ -0,0 +1,96 @@
+"""Opt-in per-call timing and allocation instrumentation for game hot paths.
+
+Enable with ``GAME_PROFILE=1``. Add ``GAME_PROFILE_ALLOC=1`` to also trace
+each call's peak memory above what was live when it started, which counts
+memory a call allocates and frees again. tracemalloc's peak is process-wide,
+so allocation numbers are only meaningful with a single session running:
+Streamlit runs each session's script on its own thread, and concurrent
+sessions add their allocations to each other's peaks. When disabled,
+``profiled`` returns functions unchanged, so the hooks cost nothing in
+normal runs.
+"""
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILING_ENABLED = os.getenv("GAME_PROFILE") == "1"
+ALLOCATION_TRACING = PROFILING_ENABLED and os.getenv("GAME_PROFILE_ALLOC") == "1"
+
+_stats = {}
+_lock = threading.Lock()
+_open_calls = threading.local()  # Per thread: [start bytes, peak bytes] of each profiled call in progress
+
+def _record(name, elapsed_ns, peak_bytes):
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {"calls": 0, "total_ns": 0, "min_ns": None, "max_ns": 0, "peak_bytes": 0,
+                                    "max_peak_bytes": 0}
+        entry["calls"] += 1
+        entry["total_ns"] += elapsed_ns
+        entry["min_ns"] = elapsed_ns if entry["min_ns"] is None else min(entry["min_ns"], elapsed_ns)
+        entry["max_ns"] = max(entry["max_ns"], elapsed_ns)
+        entry["peak_bytes"] += peak_bytes
+        entry["max_peak_bytes"] = max(entry["max_peak_bytes"], peak_bytes)
+
+def _enter_traced_call():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    stack = _open_calls.__dict__.setdefault("stack", [])
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:  # Keep the enclosing call's peak before resetting the shared one
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    stack.append([current, current])
+
+def _exit_traced_call():
+    """Returns the call's peak traced memory above where it started, folding it into any enclosing call."""
+    stack = _open_calls.stack
+    started, peak = stack.pop()
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    return peak - started
+
+def profiled(name):
+    """Decorator recording wall time (and, optionally, peak memory) for every call to ``name``."""
+    def decorate(func):
+        if not PROFILING_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if ALLOCATION_TRACING:
+                _enter_traced_call()
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                _record(name, elapsed, _exit_traced_call() if ALLOCATION_TRACING else 0)
+        return wrapper
+    return decorate
+
+def profile_report():
+    """Returns one row per instrumented function, slowest total first."""
+    with _lock:
+        rows = [
+            {
+                "name": name,
+                "calls": entry["calls"],
+                "total_ms": entry["total_ns"] / 1e6,
+                "mean_us": entry["total_ns"] / entry["calls"] / 1e3,
+                "min_us": entry["min_ns"] / 1e3,
+                "max_us": entry["max_ns"] / 1e3,
+                "mean_peak_bytes": entry["peak_bytes"] / entry["calls"],
+                "max_peak_bytes": entry["max_peak_bytes"],
+            }
+            for name, entry in _stats.items()
+        ]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+def reset_profile():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,108 @@
+"""Compact replay records that reproduce a game bit-for-bit from its seed and choices."""
+import argparse
+import hashlib
+import json
+import random
+import time
+
+from game_engine import DEFAULT_REGIME, create_new_game, get_branching_scenarios, process_decision_and_advance
+
+REPLAY_VERSION = 2  # v1 records predate life events and replay with them disabled
+CHOICE_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"  # One character per decision
+
+# --- Records ---
+
+def state_fingerprint(state, version=REPLAY_VERSION):
+    """Hashes everything that defines a game's outcome; equal fingerprints mean identical games."""
+    finances = state["finances"]
+    if version == 1:
+        finances = {key: value for key, value in finances.items() if key != "income_paused_months"}
+    payload = json.dumps(
+        [state["profile"]["age"], state["scenario_key"], state["game_over"], state["financial_health"], finances],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def export_replay(state):
+    """Returns the compact replay record for a game, e.g. ``{"v": 2, "seed": ..., "choices": "021", ...}``."""
+    record = {
+        "v": REPLAY_VERSION,
+        "regime": state.get("economy", DEFAULT_REGIME),
+        "seed": state["rng_seed"],
+        "choices": "".join(CHOICE_DIGITS[index] for index in state["decision_log"]),
+        "fingerprint": state_fingerprint(state),
+    }
+    if not state.get("life_events", True):
+        record["life_events"] = False
+    return record
+
+def replay(record, scenarios=None):
+    """Re-plays a record from a fresh game and returns the final state.
+
+    The replayed game has no log archive, so it runs at full engine speed.
+    """
+    if record.get("v") not in (1, REPLAY_VERSION):
+        raise ValueError(f"Unsupported replay version: {record.get('v')}")
+    if scenarios is None:
+        scenarios = get_branching_scenarios()
+    state = create_new_game(record.get("regime", DEFAULT_REGIME), seed=record["seed"],
+                            life_events=record.get("life_events", record["v"] != 1))
+    for digit in record["choices"]:
+        choice = scenarios[state["scenario_key"]]["choices"][CHOICE_DIGITS.index(digit)]
+        state = process_decision_and_advance(state, choice["text"])
+    return state
+
+def verify_replay(record, scenarios=None):
+    """Returns True when replaying ``record`` lands on the fingerprint it was recorded with."""
+    return state_fingerprint(replay(record, scenarios), record["v"]) == record["fingerprint"]
+
+# --- Recording Files ---
+
+def append_recording(path, state):
+    """Appends a finished game's replay record to a JSONL file."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(export_replay(state)) + "\n")
+
+def read_recordings(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def record_random_games(path, games, seed=0, regime=DEFAULT_REGIME):
+    """Writes ``games`` random-policy games to ``path``, for seeding a regression corpus."""
+    from game_simulator import play_game, random_policy
+
+    rng = random.Random(seed)
+    scenarios = get_branching_scenarios()
+    for _ in range(games):
+        append_recording(path, play_game(random_policy, rng, scenarios, regime)["state"])
+
+def verify_recordings(path):
+    """Replays every record in ``path`` and returns ``(total, mismatched_records, seconds)``."""
+    records = read_recordings(path)
+    scenarios = get_branching_scenarios()
+    started = time.perf_counter()
+    mismatched = [record for record in records if not verify_replay(record, scenarios)]
+    return len(records), mismatched, time.perf_counter() - started
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or verify deterministic game replays.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Append random-policy games to a recordings file")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--games", type=int, default=1000)
+    record_parser.add_argument("--seed", type=int, default=0)
+    record_parser.add_argument("--regime", default=DEFAULT_REGIME)
+    verify_parser = subparsers.add_parser("verify", help="Replay a recordings file and report mismatches")
+    verify_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_random_games(args.path, args.games, args.seed, args.regime)
+        print(f"Recorded {args.games} games to {args.path}")
+    else:
+        total, mismatched, elapsed = verify_recordings(args.path)
+        rate = total / elapsed if elapsed > 0 else float("inf")
+        print(f"Replayed {total} games in {elapsed:.2f}s ({rate:,.0f} games/s); {len(mismatched)} mismatched")
+        for record in mismatched[:10]:
+            print(f"  mismatch: {json.dumps(record)}")
+        raise SystemExit(1 if mismatched else 0)
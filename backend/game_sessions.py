@@ -0,0 +1,251 @@
+"""Persistent game session storage so games survive Streamlit worker restarts."""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from game_engine import process_decision_and_advance
+
+SNAPSHOT_EVERY = 4  # Decisions between full snapshots; the log in between is replayed on load
+DEFAULT_BATCH_SIZE = 64  # Buffered writes that force an immediate flush
+DEFAULT_FLUSH_INTERVAL = 0.5  # Seconds a buffered write may wait before hitting disk
+DEFAULT_COMPACT_EVERY = 200  # Flushes between compaction passes
+
+# --- Snapshot Encoding ---
+
+def encode_snapshot(state):
+    """Serializes a game state into a compact compressed blob."""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+def decode_snapshot(blob):
+    """Inverse of ``encode_snapshot``."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+def replay_decisions(state, decisions):
+    """Re-applies logged decisions on top of a snapshot."""
+    for decision in decisions:
+        state = process_decision_and_advance(state, decision["choice_text"])
+    return state
+
+# --- Store Interface ---
+
+class SessionStore:
+    """Interface for game session backends.
+
+    A session is a snapshot of the game state plus an append-only log of the
+    decisions made since. ``load`` returns the snapshot with the log replayed.
+    """
+
+    def save_snapshot(self, session_id, state, last_seq):
+        raise NotImplementedError
+
+    def append_decision(self, session_id, seq, decision):
+        raise NotImplementedError
+
+    def load_raw(self, session_id):
+        """Returns ``(snapshot_state, last_seq, decisions_after_snapshot)`` or None."""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def compact(self, max_idle_seconds=None):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def load(self, session_id):
+        """Returns ``(state, seq)`` for a session, or None when it does not exist."""
+        raw = self.load_raw(session_id)
+        if raw is None:
+            return None
+        state, last_seq, decisions = raw
+        return replay_decisions(state, decisions), last_seq + len(decisions)
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store for development and single-worker runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._decisions = {}
+
+    def save_snapshot(self, session_id, state, last_seq):
+        with self._lock:
+            self._snapshots[session_id] = (encode_snapshot(state), last_seq, time.time())
+            self._decisions[session_id] = [d for d in self._decisions.get(session_id, []) if d[0] > last_seq]
+
+    def append_decision(self, session_id, seq, decision):
+        with self._lock:
+            self._decisions.setdefault(session_id, []).append((seq, decision))
+
+    def load_raw(self, session_id):
+        with self._lock:
+            if session_id not in self._snapshots:
+                return None
+            blob, last_seq, _ = self._snapshots[session_id]
+            decisions = [d for seq, d in sorted(self._decisions.get(session_id, [])) if seq > last_seq]
+        return decode_snapshot(blob), last_seq, decisions
+
+    def delete(self, session_id):
+        with self._lock:
+            self._snapshots.pop(session_id, None)
+            self._decisions.pop(session_id, None)
+
+    def compact(self, max_idle_seconds=None):
+        if max_idle_seconds is None:
+            return
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            for session_id in [s for s, (_, _, updated) in self._snapshots.items() if updated < cutoff]:
+                self._snapshots.pop(session_id, None)
+                self._decisions.pop(session_id, None)
+
+class SQLiteSessionStore(SessionStore):
+    """Embedded SQLite store with batched writes and periodic compaction.
+
+    Writes are buffered and committed in one transaction per batch, either when
+    ``batch_size`` writes are pending or after ``flush_interval`` seconds. The
+    database runs in WAL mode so several Streamlit workers on one host can share
+    the file.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 compact_every=DEFAULT_COMPACT_EVERY, max_idle_seconds=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.max_idle_seconds = max_idle_seconds
+        self._lock = threading.RLock()
+        self._pending_snapshots = {}
+        self._pending_decisions = []
+        self._flushes = 0
+        self._closed = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                session_id TEXT PRIMARY KEY,
+                last_seq INTEGER NOT NULL,
+                state BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS decisions (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                decision TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            );
+        """)
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-store-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _pending_count(self):
+        return len(self._pending_snapshots) + len(self._pending_decisions)
+
+    def save_snapshot(self, session_id, state, last_seq):
+        with self._lock:
+            self._pending_snapshots[session_id] = (last_seq, encode_snapshot(state), time.time())
+            if self._pending_count() >= self.batch_size:
+                self.flush()
+
+    def append_decision(self, session_id, seq, decision):
+        with self._lock:
+            self._pending_decisions.append((session_id, seq, json.dumps(decision, ensure_ascii=False)))
+            if self._pending_count() >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending_count():
+                return
+            snapshots, self._pending_snapshots = self._pending_snapshots, {}
+            decisions, self._pending_decisions = self._pending_decisions, []
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO decisions (session_id, seq, decision) VALUES (?, ?, ?)", decisions)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO snapshots (session_id, last_seq, state, updated_at) VALUES (?, ?, ?, ?)",
+                    [(sid, seq, blob, updated) for sid, (seq, blob, updated) in snapshots.items()])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._flushes += 1
+            if self._flushes % self.compact_every == 0:
+                self.compact(self.max_idle_seconds)
+
+    def load_raw(self, session_id):
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                "SELECT last_seq, state FROM snapshots WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            last_seq, blob = row
+            decisions = [json.loads(d) for (d,) in self._conn.execute(
+                "SELECT decision FROM decisions WHERE session_id = ? AND seq > ? ORDER BY seq",
+                (session_id, last_seq))]
+        return decode_snapshot(blob), last_seq, decisions
+
+    def delete(self, session_id):
+        with self._lock:
+            self.flush()
+            self._conn.execute("DELETE FROM decisions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM snapshots WHERE session_id = ?", (session_id,))
+
+    def compact(self, max_idle_seconds=None):
+        """Drops log entries already covered by a snapshot, and optionally sessions idle for too long."""
+        with self._lock:
+            if max_idle_seconds is not None:
+                cutoff = time.time() - max_idle_seconds
+                self._conn.execute(
+                    "DELETE FROM decisions WHERE session_id IN "
+                    "(SELECT session_id FROM snapshots WHERE updated_at < ?)", (cutoff,))
+                self._conn.execute("DELETE FROM snapshots WHERE updated_at < ?", (cutoff,))
+            self._conn.execute(
+                "DELETE FROM decisions WHERE seq <= "
+                "(SELECT last_seq FROM snapshots WHERE snapshots.session_id = decisions.session_id)")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        self._conn.close()
+
+def open_session_store(url):
+    """Builds a store from a URL such as ``sqlite:///games.db`` or ``memory://``."""
+    if url.startswith("memory://"):
+        return InMemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported session store URL: {url}")
+
+# --- Session Helpers ---
+
+def record_decision(store, session_id, seq, scenario_key, new_state, choice_text):
+    """Logs a decision and writes a fresh snapshot every ``SNAPSHOT_EVERY`` decisions or at game end.
+
+    Returns the new sequence number for the session.
+    """
+    seq += 1
+    store.append_decision(session_id, seq, {"scenario_key": scenario_key, "choice_text": choice_text})
+    if seq % SNAPSHOT_EVERY == 0 or new_state["game_over"]:
+        store.save_snapshot(session_id, new_state, seq)
+    return seq
@@ -0,0 +1,183 @@
+"""Headless batch runner that plays bot policies through the game engine."""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import DEFAULT_REGIME, create_new_game, get_branching_scenarios, process_decision_and_advance
+
+HEALTH_BUCKET_SIZE = 10  # Histogram buckets: 0-9, 10-19, ..., 90-99, 100
+
+# --- Policies ---
+
+def random_policy(state, choices, rng):
+    """Picks any available choice uniformly at random."""
+    return rng.choice(choices)
+
+def first_choice_policy(state, choices, rng):
+    """Always picks the first listed choice."""
+    return choices[0]
+
+class ScriptedPolicy:
+    """Plays a fixed sequence of choice ids, falling back to the first choice when the script runs out."""
+
+    def __init__(self, choice_ids):
+        self.choice_ids = list(choice_ids)
+
+    def __call__(self, state, choices, rng):
+        step = len(state["decision_log"])
+        if step < len(self.choice_ids):
+            for choice in choices:
+                if choice["id"] == self.choice_ids[step]:
+                    return choice
+        return choices[0]
+
+POLICIES = {
+    "random": random_policy,
+    "first": first_choice_policy,
+}
+
+# --- Game Loop ---
+
+def play_game(policy, rng, scenarios=None, regime=DEFAULT_REGIME):
+    """Plays one game to completion and returns its outcome summary."""
+    if scenarios is None:
+        scenarios = get_branching_scenarios()
+    state = create_new_game(regime, seed=rng.getrandbits(63))
+    nodes, path = [], []
+    while not state["game_over"]:
+        nodes.append(state["scenario_key"])
+        choices = scenarios[state["scenario_key"]]["choices"]
+        choice = policy(state, choices, rng)
+        state = process_decision_and_advance(state, choice["text"])
+        path.append(choice["id"])
+    return {
+        "ending": state["current_event"]["narrative"],
+        "net_worth": state["finances"]["net_worth"],
+        "financial_health": state["financial_health"],
+        "path": path,
+        "nodes": nodes,
+        "state": state,
+    }
+
+def empty_stats():
+    """Returns an empty aggregate that chunks and batches merge into."""
+    return {
+        "games": 0,
+        "endings": Counter(),
+        "health_histogram": [0] * (100 // HEALTH_BUCKET_SIZE + 1),
+        "net_worth_sum": 0.0,
+        "net_worth_min": None,
+        "net_worth_max": None,
+    }
+
+def record_outcome(stats, outcome):
+    """Adds a single game outcome to an aggregate."""
+    stats["games"] += 1
+    stats["endings"][outcome["ending"]] += 1
+    stats["health_histogram"][int(outcome["financial_health"]) // HEALTH_BUCKET_SIZE] += 1
+    net_worth = outcome["net_worth"]
+    stats["net_worth_sum"] += net_worth
+    if stats["net_worth_min"] is None or net_worth < stats["net_worth_min"]:
+        stats["net_worth_min"] = net_worth
+    if stats["net_worth_max"] is None or net_worth > stats["net_worth_max"]:
+        stats["net_worth_max"] = net_worth
+    return stats
+
+def merge_stats(total, chunk):
+    """Folds one chunk's aggregate into a running total."""
+    total["games"] += chunk["games"]
+    total["endings"].update(chunk["endings"])
+    total["health_histogram"] = [a + b for a, b in zip(total["health_histogram"], chunk["health_histogram"])]
+    total["net_worth_sum"] += chunk["net_worth_sum"]
+    for key, pick in (("net_worth_min", min), ("net_worth_max", max)):
+        if chunk[key] is not None:
+            total[key] = chunk[key] if total[key] is None else pick(total[key], chunk[key])
+    return total
+
+def _play_chunk(policy, games, seed, regime):
+    rng = random.Random(seed)
+    scenarios = get_branching_scenarios()
+    stats = empty_stats()
+    for _ in range(games):
+        record_outcome(stats, play_game(policy, rng, scenarios, regime))
+    return stats
+
+# --- Batch Runner ---
+
+def map_chunks(chunk_fn, games, policy=random_policy, seed=0, max_workers=None, chunk_size=10000,
+               regimes=(DEFAULT_REGIME,)):
+    """Runs ``chunk_fn(policy, games_in_chunk, chunk_seed, regime)`` over a process pool for every regime.
+
+    Yields ``(regime, result)`` in submission order, so results are merged in
+    the same order on every run. Each chunk gets its own seed derived from
+    ``seed`` so runs are repeatable, and every regime reuses the same seeds so
+    sweeps compare regimes on identical policy draws.
+    """
+    chunks = [min(chunk_size, games - start) for start in range(0, games, chunk_size)]
+    jobs = [(regime, size, seed * 1_000_003 + index) for regime in regimes for index, size in enumerate(chunks)]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(chunk_fn, [policy] * len(jobs), [job[1] for job in jobs], [job[2] for job in jobs],
+                           [job[0] for job in jobs])
+        for (regime, _, _), result in zip(jobs, results):
+            yield regime, result
+
+def sweep_regimes(regimes, games, policy=random_policy, seed=0, max_workers=None, chunk_size=10000, out_path=None):
+    """Plays ``games`` games under each regime in one shared process pool and returns aggregates by regime.
+
+    When ``out_path`` is set, the running aggregate of a regime is appended
+    there as a JSON line after each of its chunks finishes.
+    """
+    totals = {regime: empty_stats() for regime in regimes}
+    started = time.perf_counter()
+    out_file = open(out_path, "a", encoding="utf-8") if out_path else None
+    try:
+        for regime, chunk_stats in map_chunks(_play_chunk, games, policy, seed, max_workers, chunk_size, regimes):
+            merge_stats(totals[regime], chunk_stats)
+            if out_file:
+                line = {"regime": regime, **summarize(totals[regime], time.perf_counter() - started)}
+                out_file.write(json.dumps(line, ensure_ascii=False) + "\n")
+                out_file.flush()
+    finally:
+        if out_file:
+            out_file.close()
+    return totals
+
+def run_batch(games, policy=random_policy, seed=0, max_workers=None, chunk_size=10000, out_path=None,
+              regime=DEFAULT_REGIME):
+    """Plays ``games`` games across a process pool and returns the merged aggregate."""
+    return sweep_regimes([regime], games, policy, seed, max_workers, chunk_size, out_path)[regime]
+
+def summarize(stats, elapsed=None):
+    """Returns a JSON-serializable view of an aggregate."""
+    summary = {
+        "games": stats["games"],
+        "endings": dict(stats["endings"].most_common()),
+        "health_histogram": stats["health_histogram"],
+        "net_worth_mean": stats["net_worth_sum"] / stats["games"] if stats["games"] else 0,
+        "net_worth_min": stats["net_worth_min"],
+        "net_worth_max": stats["net_worth_max"],
+    }
+    if elapsed is not None:
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["games_per_second"] = round(stats["games"] / elapsed) if elapsed > 0 else None
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless games and aggregate the outcomes.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--policy", default="random", help=f"One of {sorted(POLICIES)} or a comma-separated list of choice ids")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", default=None, help="Append running aggregates to this JSONL file")
+    parser.add_argument("--regimes", default=DEFAULT_REGIME, help="Comma-separated economic regimes to sweep")
+    args = parser.parse_args()
+
+    policy = POLICIES.get(args.policy) or ScriptedPolicy(args.policy.split(","))
+    started = time.perf_counter()
+    totals = sweep_regimes(args.regimes.split(","), args.games, policy, args.seed, args.workers, args.chunk_size, args.out)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({regime: summarize(stats, elapsed) for regime, stats in totals.items()}, indent=2, ensure_ascii=False))
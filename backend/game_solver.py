@@ -0,0 +1,205 @@
+"""Exhaustive solver for the branching scenarios in ``game_engine``."""
+import copy
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import (
+    SCENARIOS,
+    create_new_game,
+    get_branching_scenarios,
+    process_decision_and_advance,
+)
+
+OUTCOME_MEMO_SIZE = 16384  # Solved nodes kept for UI lookups; a fresh game's whole tree is a few dozen
+PREVIEW_MEMO_SIZE = 4096  # Nodes whose choice previews are kept; the oldest are dropped first
+
+# Process-wide memo shared by UI lookups: canonical state -> solved node.
+_OUTCOME_MEMO = {}
+_PREVIEW_MEMO = {}
+
+# --- State Helpers ---
+
+def canonical_state(state):
+    """Returns a hashable key covering everything that affects future outcomes.
+
+    The seed and decision count only matter when life events are drawn, so
+    games with events off share keys whatever their seed.
+    """
+    seeded = state.get("life_events", True)
+    return json.dumps(
+        [state["scenario_key"], state["profile"]["age"], state["game_over"], state.get("economy"),
+         state.get("rng_seed") if seeded else None, len(state.get("decision_log", [])) if seeded else None,
+         state["finances"]],
+        sort_keys=True,
+    )
+
+def fork_state(state):
+    """Copies a state so the engine's in-place updates cannot leak between branches.
+
+    The game log is dropped and detached from any archive: it never affects
+    outcomes and would otherwise be copied once per explored path.
+    """
+    forked = {key: value for key, value in state.items() if key not in ("profile", "finances", "game_log")}
+    forked["profile"] = dict(state["profile"])
+    forked["finances"] = copy.deepcopy(state["finances"])
+    forked["game_log"] = []
+    forked["log_offset"] = 0
+    forked["log_archive"] = None
+    return forked
+
+def without_life_events(state):
+    """Forks a state that plays on with life events off, so only the choices decide its outcomes."""
+    forked = fork_state(state)
+    forked["life_events"] = False
+    return forked
+
+def available_choices(state, scenarios):
+    """Returns the choices open to the player, or an empty list at an ending."""
+    if state["game_over"]:
+        return []
+    return scenarios.get(state["scenario_key"], {}).get("choices", [])
+
+# --- Solver ---
+
+def _outcome(state):
+    return {
+        "net_worth": state["finances"]["net_worth"],
+        "financial_health": state["financial_health"],
+        "ending": (state.get("current_event") or {}).get("narrative", ""),
+        "path": [],
+    }
+
+def _extend(choice_id, outcome):
+    return {**outcome, "path": [choice_id] + outcome["path"]}
+
+def _rank(outcome):
+    return (outcome["net_worth"], outcome["financial_health"])
+
+def solve_state(state, memo=None, scenarios=None):
+    """Returns the best/worst reachable outcomes from ``state`` and for each of its choices.
+
+    Results are memoized on the canonical state, so nodes reached through
+    different paths with identical finances are only solved once.
+    """
+    if memo is None:
+        memo = {}
+    if scenarios is None:
+        scenarios = get_branching_scenarios()
+    key = canonical_state(state)
+    if key in memo:
+        return memo[key]
+
+    choices = available_choices(state, scenarios)
+    if not choices:
+        leaf = _outcome(state)
+        result = {"best": leaf, "worst": leaf, "paths": 1, "choices": {}}
+    else:
+        per_choice = {}
+        for choice in choices:
+            child_state = process_decision_and_advance(fork_state(state), choice["text"])
+            child = solve_state(child_state, memo, scenarios)
+            per_choice[choice["id"]] = {
+                "best": _extend(choice["id"], child["best"]),
+                "worst": _extend(choice["id"], child["worst"]),
+                "paths": child["paths"],
+            }
+        result = {
+            "best": max((c["best"] for c in per_choice.values()), key=_rank),
+            "worst": min((c["worst"] for c in per_choice.values()), key=_rank),
+            "paths": sum(c["paths"] for c in per_choice.values()),
+            "choices": per_choice,
+        }
+    memo[key] = result
+    return result
+
+def _expand_frontier(state, depth, scenarios):
+    """Plays every choice ``depth`` levels deep and returns the distinct non-ending states."""
+    frontier = {canonical_state(state): state}
+    for _ in range(depth):
+        next_frontier = {}
+        for node in frontier.values():
+            for choice in available_choices(node, scenarios):
+                child = process_decision_and_advance(fork_state(node), choice["text"])
+                if available_choices(child, scenarios):
+                    next_frontier.setdefault(canonical_state(child), child)
+        frontier = next_frontier
+    return frontier
+
+def _solve_subtree(state):
+    memo = {}
+    solve_state(state, memo)
+    return memo
+
+def solve_parallel(state=None, memo=None, max_workers=None, split_depth=1):
+    """Solves the tree from ``state``, farming the subtrees ``split_depth`` levels down out to worker processes.
+
+    Worker memos are merged back into ``memo`` so later lookups for any node
+    in the tree are instant.
+    """
+    if state is None:
+        state = create_new_game()
+    if memo is None:
+        memo = {}
+    scenarios = get_branching_scenarios()
+    if max_workers != 1:
+        frontier = _expand_frontier(state, split_depth, scenarios)
+        pending = [node for key, node in frontier.items() if key not in memo]
+        if len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                for subtree_memo in pool.map(_solve_subtree, pending):
+                    memo.update(subtree_memo)
+    return solve_state(state, memo, scenarios)
+
+# --- Lookups ---
+
+def precompute_outcomes(max_workers=None, split_depth=1):
+    """Solves the whole tree from a new game, with life events off, into the shared memo."""
+    return solve_parallel(create_new_game(life_events=False), _OUTCOME_MEMO, max_workers, split_depth)
+
+def choice_outcomes(state):
+    """Returns best/worst reachable outcomes keyed by choice id for the current state.
+
+    Outcomes are solved with life events off, so every game shares one table
+    rather than solving its own seeded tree. A game whose finances an event
+    has moved off that table solves just its remaining subtree.
+    """
+    choices = solve_state(without_life_events(state), _OUTCOME_MEMO)["choices"]
+    while len(_OUTCOME_MEMO) > OUTCOME_MEMO_SIZE:
+        del _OUTCOME_MEMO[next(iter(_OUTCOME_MEMO))]
+    return choices
+
+def _projection(state):
+    return {
+        "net_worth": state["finances"]["net_worth"],
+        "cash": state["finances"]["cash"],
+        "financial_health": state["financial_health"],
+        "age": state["profile"]["age"],
+        "game_over": state["game_over"],
+    }
+
+def preview_choices(state, scenarios=None):
+    """Returns the immediate result of every available choice, keyed by choice id.
+
+    All choices are played in one pass from forks of the same snapshot and
+    the result is memoized on the node and canonical state, so re-rendering
+    the same decision is a dictionary lookup. Life events come from the
+    seeded session RNG, so a preview is exactly what the choice will do.
+    """
+    key = canonical_state(state)
+    previews = _PREVIEW_MEMO.get(key)
+    if previews is None:
+        previews = {
+            choice["id"]: _projection(process_decision_and_advance(fork_state(state), choice["text"]))
+            for choice in available_choices(state, scenarios or SCENARIOS)
+        }
+        if len(_PREVIEW_MEMO) >= PREVIEW_MEMO_SIZE:
+            del _PREVIEW_MEMO[next(iter(_PREVIEW_MEMO))]
+        _PREVIEW_MEMO[key] = previews
+    return previews
+
+if __name__ == "__main__":
+    root = precompute_outcomes()
+    print(f"Solved {root['paths']} paths over {len(_OUTCOME_MEMO)} distinct states")
+    for choice_id, summary in root["choices"].items():
+        print(f"{choice_id}: best ₹{summary['best']['net_worth']:,.0f} ({summary['best']['ending']}), "
+              f"worst ₹{summary['worst']['net_worth']:,.0f} ({summary['worst']['ending']})")
@@ -0,0 +1,5 @@
+"""Puts ``backend`` on the import path; its modules import each other as top-level modules."""
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
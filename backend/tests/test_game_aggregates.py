@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_engine import (
+    add_loan,
+    adjust_investment,
+    advance_year,
+    check_aggregates,
+    create_new_game,
+    get_branching_scenarios,
+    process_decision_and_advance,
+    recompute_aggregates,
+    remove_loan,
+    repay_principal,
+    set_holdings,
+)
+from game_solver import available_choices, fork_state
+
+
+def test_helpers_keep_running_totals_in_step():
+    state = create_new_game(seed=3)
+    adjust_investment(state, "mutual_funds", 25000)
+    adjust_investment(state, "gold", 4000)
+    adjust_investment(state, "mutual_funds", -5000)
+    add_loan(state, "car_loan", 300000, 0.09, 7000)
+    add_loan(state, "phone_loan", 20000, 0.12, 1500)
+    add_loan(state, "car_loan", 250000, 0.08, 6000)  # Replaces the first car loan
+    repay_principal(state, "phone_loan", 5000)
+    remove_loan(state, "phone_loan")
+    names = list(state["finances"]["investments"])
+    set_holdings(state, names, np.arange(1, len(names) + 1) * 1000.0)
+    check_aggregates(state)
+    assert state["finances"]["aggregates"] == pytest.approx(recompute_aggregates(state))
+
+
+def test_random_games_never_drift():
+    scenarios = get_branching_scenarios()
+    rng = random.Random(21)
+    for _ in range(30):
+        state = create_new_game(seed=rng.randrange(1 << 30))
+        while choices := available_choices(state, scenarios):
+            state = process_decision_and_advance(state, rng.choice(choices)["text"])
+            check_aggregates(state)
+        check_aggregates(advance_year(fork_state(state), 10))
+
+
+def test_edits_that_bypass_the_helpers_are_caught():
+    state = create_new_game(seed=3)
+    add_loan(state, "car_loan", 300000, 0.09, 7000)
+    state["finances"]["loans"]["car_loan"]["principal"] -= 1000
+    with pytest.raises(AssertionError, match="loan_principal"):
+        check_aggregates(state)
+
+    state = create_new_game(seed=3)
+    state["finances"]["investments"]["gold"] = 5000
+    with pytest.raises(AssertionError, match="investments"):
+        check_aggregates(state)
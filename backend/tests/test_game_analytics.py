@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from game_analytics import RELATIVE_ACCURACY, OutcomeAnalytics, QuantileSketch
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = np.random.default_rng(3)
+    wealthy = rng.lognormal(13, 1.5, 20000)  # Net worths from thousands to crores
+    indebted = -rng.lognormal(11, 1.0, 5000)
+    return np.concatenate([wealthy, indebted, np.zeros(100)])
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(float(value))
+    return sketch
+
+
+def test_quantiles_stay_within_the_relative_accuracy(values):
+    sketch = sketch_of(values)
+    for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+        exact = np.quantile(values, q, method="inverted_cdf")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=RELATIVE_ACCURACY, abs=1)
+
+
+def test_fraction_below_matches_the_empirical_rank(values):
+    sketch = sketch_of(values).freeze()
+    ordered = np.sort(values)
+    for probe in (-5e5, -1e4, 0.5, 1e4, 4e5, 1e6, 5e7):
+        exact = np.searchsorted(ordered, probe) / len(values)
+        # Only the probe's own bucket is uncertain, and it is counted as half
+        bucket_share = np.mean([QuantileSketch.bucket(v) == QuantileSketch.bucket(probe) for v in values])
+        assert abs(sketch.fraction_below(probe) - exact) <= bucket_share / 2 + 1e-12
+    assert sketch.fraction_below(-1e12) == 0.0 and sketch.fraction_below(1e12) == 1.0
+
+
+def test_merged_sketches_equal_one_sketch_of_everything(values):
+    halves = sketch_of(values[::2]).merge(sketch_of(values[1::2]))
+    whole = sketch_of(values)
+    assert halves.counts == whole.counts and halves.total == whole.total
+
+
+def test_empty_sketch_answers_without_data():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.fraction_below(10) == 0.0
+
+
+def test_analytics_rank_within_the_players_regime(tmp_path):
+    analytics = OutcomeAnalytics()
+    for net_worth in range(100):
+        outcome = {"net_worth": net_worth * 1000.0, "financial_health": 50, "nodes": ["initial"], "path": ["a"]}
+        analytics.record(outcome, "baseline")
+        analytics.record({**outcome, "net_worth": net_worth * 10.0}, "bear_market")
+    analytics.freeze()
+    assert analytics.percentile("net_worth", 50000, regime="baseline") == pytest.approx(50, abs=2)
+    assert analytics.percentile("net_worth", 500, regime="bear_market") == pytest.approx(50, abs=2)
+    assert analytics.percentile("net_worth", 50000, node="initial", choice_id="a", regime="baseline") is not None
+    assert analytics.percentile("net_worth", 50000, regime="high_inflation") is None
+
+    analytics.save(tmp_path / "analytics.json")
+    loaded = OutcomeAnalytics.load(tmp_path / "analytics.json")
+    assert loaded.regimes() == ["baseline", "bear_market"]
+    assert loaded.percentile("net_worth", 500, regime="bear_market") == analytics.percentile(
+        "net_worth", 500, regime="bear_market")
@@ -0,0 +1,88 @@
+"""Micro-benchmarks for the game engine hot paths on canned states.
+
+Run ``python -m pytest tests/test_game_bench.py --benchmark-only`` for a
+table, ``--benchmark-autosave`` to save a run and ``--benchmark-compare
+--benchmark-compare-fail=median:10%`` to fail on benchmarks that got slower
+than the last saved run.
+"""
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from game_engine import (
+    add_loan,
+    adjust_investment,
+    advance_year,
+    calculate_financial_health,
+    create_new_game,
+    get_branching_scenarios,
+    process_decision_and_advance,
+    update_net_worth,
+)
+from game_portfolio import set_contribution, set_target_weights
+from game_replay import export_replay, replay
+from game_simulator import play_game, random_policy
+from game_solver import fork_state
+
+
+@pytest.fixture(scope="module")
+def scenarios():
+    return get_branching_scenarios()
+
+
+@pytest.fixture(scope="module")
+def states(scenarios):
+    """Reproducible states covering the start, early career, a loaded mid-career and a six-asset portfolio."""
+    new_game = create_new_game(seed=1)
+    early_career = process_decision_and_advance(fork_state(new_game), scenarios["initial"]["choices"][2]["text"])
+
+    mid_career = fork_state(early_career)
+    mid_career["profile"]["age"] = 40
+    mid_career["finances"].update({"income": 60000, "expenses": 35000, "cash": 250000})
+    add_loan(mid_career, "phone_loan", 15000, 0.10, 1500)
+    add_loan(mid_career, "car_loan", 450000, 0.08, 9000)
+    adjust_investment(mid_career, "mutual_funds", 150000)
+    mid_career = update_net_worth(mid_career)
+
+    diversified = fork_state(mid_career)
+    for asset, amount in (("ppf", 80000), ("nps", 60000), ("equity_index", 120000), ("gold", 40000)):
+        adjust_investment(diversified, asset, amount)
+        set_contribution(diversified, asset, 2500)
+    set_target_weights(diversified, {"fixed_deposit": 1, "ppf": 2, "nps": 2, "mutual_funds": 2, "equity_index": 3, "gold": 1})
+    return {"new_game": new_game, "early_career": early_career, "mid_career": mid_career, "diversified": diversified}
+
+
+def test_calculate_financial_health(benchmark, states):
+    benchmark(calculate_financial_health, states["mid_career"])
+
+
+def test_update_net_worth(benchmark, states):
+    benchmark(update_net_worth, states["mid_career"])
+
+
+def test_fork_state(benchmark, states):
+    benchmark(fork_state, states["mid_career"])
+
+
+@pytest.mark.parametrize("state, years", [("mid_career", 1), ("mid_career", 25), ("diversified", 25)])
+def test_advance_year(benchmark, states, state, years):
+    # Every round works on a fresh fork, so the canned state never drifts
+    benchmark.pedantic(advance_year, setup=lambda: ((fork_state(states[state]), years), {}), rounds=200)
+
+
+def test_process_decision_and_advance(benchmark, states, scenarios):
+    first_choice = scenarios["initial"]["choices"][0]["text"]
+    benchmark.pedantic(process_decision_and_advance, setup=lambda: ((fork_state(states["new_game"]), first_choice), {}),
+                       rounds=200)
+
+
+def test_play_game(benchmark, scenarios):
+    rng = random.Random(0)
+    benchmark(play_game, random_policy, rng, scenarios)
+
+
+def test_replay(benchmark, scenarios):
+    record = export_replay(play_game(random_policy, random.Random(7), scenarios)["state"])
+    benchmark(replay, record, scenarios)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import game_economy
+from game_economy import available_regimes, get_regime, register_regime, regime_tables
+from game_engine import DEFAULT_REGIME
+from game_ledger import slice_tables
+
+ASSETS = ("fixed_deposit", "mutual_funds", "gold")
+
+
+def test_constant_rates_compound_once_a_year():
+    regime = get_regime(DEFAULT_REGIME)
+    tables = regime_tables(DEFAULT_REGIME, 0, 3, ASSETS)
+    years = np.arange(36) // 12 + 1  # Growth lands at the start of every year, the first included
+    np.testing.assert_allclose(tables["income_factor"], (1 + regime["income_growth"]) ** years)
+    np.testing.assert_allclose(tables["expense_factor"], (1 + regime["inflation"]) ** years)
+    for row, asset in enumerate(ASSETS):
+        yearly = tables["invest_factor"][row, ::12]
+        np.testing.assert_allclose(yearly, (1 + regime["returns"][asset]) ** np.arange(4))
+
+
+def test_series_rates_apply_year_by_year_and_wrap():
+    series = get_regime("bear_market")["returns"]["mutual_funds"]
+    tables = regime_tables("bear_market", 0, len(series) + 2, ("mutual_funds",))
+    year_ends = tables["invest_factor"][0, ::12]
+    np.testing.assert_allclose(year_ends[1:] / year_ends[:-1], 1 + np.array(series + series[:2]))
+    # A span starting later in the game picks the series up where that year falls
+    later = regime_tables("bear_market", len(series) + 1, 1, ("mutual_funds",))
+    assert later["invest_factor"][0, -1] == pytest.approx(1 + series[1])
+
+
+@pytest.mark.parametrize("name", ["india_historic", "bear_market"])
+def test_sliced_tables_match_tables_built_for_the_span(name):
+    whole = regime_tables(name, 0, 10, ASSETS)
+    sliced = slice_tables(whole, 24, 60)
+    direct = regime_tables(name, 2, 3, ASSETS)
+    for key in ("income_factor", "expense_factor", "invest_factor"):
+        np.testing.assert_allclose(sliced[key], direct[key], rtol=1e-12, err_msg=key)
+
+
+def test_tables_are_cached_and_read_only():
+    tables = regime_tables("india_historic", 0, 5, ASSETS)
+    assert regime_tables("india_historic", 0, 5, ASSETS) is tables
+    with pytest.raises(ValueError):
+        tables["income_factor"][0] = 2.0
+
+
+def test_unknown_assets_grow_at_zero_and_unknown_regimes_fail():
+    tables = regime_tables(DEFAULT_REGIME, 0, 2, ("not_an_asset",))
+    np.testing.assert_array_equal(tables["invest_factor"], 1.0)
+    with pytest.raises(KeyError):
+        regime_tables("no_such_regime", 0, 1, ASSETS)
+
+
+def test_registering_a_regime_replaces_cached_tables(monkeypatch):
+    monkeypatch.setattr(game_economy, "_BUILTIN_REGIMES", dict(game_economy._BUILTIN_REGIMES))
+    name = "test_flat"
+    register_regime({"name": name, "inflation": 0.0, "income_growth": 0.0, "returns": {}})
+    assert name in available_regimes()
+    np.testing.assert_array_equal(regime_tables(name, 0, 1, ASSETS)["expense_factor"], 1.0)
+    register_regime({"name": name, "inflation": 0.1, "income_growth": 0.0, "returns": {}})
+    np.testing.assert_allclose(regime_tables(name, 0, 1, ASSETS)["expense_factor"], 1.1)
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from game_economy import regime_tables
+from game_ledger import (
+    LEDGER_COLUMNS,
+    PAYOFF_EPSILON,
+    amortize,
+    build_ledger,
+    concat_ledgers,
+    slice_tables,
+    yearly_view,
+)
+from game_loans import loan_balance, months_to_payoff, schedule_window
+
+ASSETS = ("fixed_deposit", "equity_index")
+YEARS = 6
+
+
+def loop_ledger(income, expenses, cash, loan_principal, loan_rate, loan_emi, invest_value, tables,
+                emi_income_cap=0.4, cash_flows=None):
+    """One player, one month at a time: the ledger the closed form has to reproduce."""
+    income_factor, expense_factor = tables["income_factor"], tables["expense_factor"]
+    months = len(income_factor)
+    balances = list(loan_principal)
+    open_loans = [principal > PAYOFF_EPSILON for principal in loan_principal]
+    payoff_month = [-1] * len(balances)
+    rows = {column: np.zeros(months) for column in LEDGER_COLUMNS}
+    for month in range(months):
+        monthly_income = income * income_factor[month]
+        emi = interest = 0.0
+        for loan, rate in enumerate(loan_rate):
+            if not open_loans[loan]:
+                continue
+            grown = balances[loan] * (1 + rate / 12)
+            payment = min(loan_emi[loan], emi_income_cap * monthly_income, grown)
+            emi += payment
+            interest += grown - balances[loan]
+            balances[loan] = grown - payment
+            if balances[loan] <= PAYOFF_EPSILON:
+                open_loans[loan], balances[loan], payoff_month[loan] = False, 0.0, month
+        relief = sum(
+            loan_emi[loan] * expense_factor[month] / expense_factor[paid]
+            for loan, paid in enumerate(payoff_month) if 0 <= paid < month
+        )
+        monthly_expenses = expenses * expense_factor[month] - relief
+        cash += monthly_income - monthly_expenses - emi
+        if cash_flows is not None:
+            cash += cash_flows[month]
+        if not any(open_loans):
+            cash = max(cash, 0.0)
+        rows["income"][month] = monthly_income
+        rows["expenses"][month] = monthly_expenses
+        rows["emi"][month] = emi
+        rows["interest"][month] = interest
+        rows["principal"][month] = emi - interest
+        rows["cash"][month] = cash
+        rows["investment_accrual"][month] = sum(
+            value * (tables["invest_factor"][asset, month + 1] - tables["invest_factor"][asset, month])
+            for asset, value in enumerate(invest_value)
+        )
+    return rows, balances, payoff_month
+
+
+@pytest.fixture
+def tables():
+    return regime_tables("india_historic", 0, YEARS, ASSETS)
+
+
+@pytest.fixture
+def players():
+    # A salaried player, one whose EMI is capped by income, one overdrawn without debt and one with no loans.
+    return {
+        "income": [90000, 20000, 30000, 50000],
+        "expenses": [40000, 12000, 45000, 20000],
+        "cash": [100000, 5000, 2000, 0],
+        "loan_principal": [[500000, 80000], [900000, 0], [0, 0], [0, 0]],
+        "loan_rate": [[0.09, 0.14], [0.11, 0.0], [0.0, 0.0], [0.0, 0.0]],
+        "loan_emi": [[15000, 9000], [25000, 0], [0, 0], [0, 0]],
+        "invest_value": [[200000, 50000], [0, 10000], [0, 0], [30000, 0]],
+    }
+
+
+def test_closed_form_matches_a_monthly_loop(tables, players):
+    rng = np.random.default_rng(7)
+    cash_flows = np.where(rng.random((4, YEARS * 12)) < 0.05, rng.normal(0, 50000, (4, YEARS * 12)), 0.0)
+    ledger = build_ledger(**players, tables=tables, cash_flows=cash_flows)
+    for player in range(4):
+        row = {name: np.asarray(values[player], dtype=float) for name, values in players.items()}
+        expected, balances, payoff_month = loop_ledger(**row, tables=tables, cash_flows=cash_flows[player])
+        for column in LEDGER_COLUMNS:
+            np.testing.assert_allclose(ledger[column][player], expected[column], rtol=1e-9, atol=1e-6, err_msg=column)
+        np.testing.assert_allclose(ledger["loan_balance"][player], balances, rtol=1e-9, atol=1e-6)
+        assert ledger["payoff_month"][player].tolist() == payoff_month
+
+
+def test_loans_pay_off_inside_the_span(tables, players):
+    ledger = build_ledger(**players, tables=tables)
+    assert 0 <= ledger["payoff_month"][0, 1] < ledger["payoff_month"][0, 0]  # The small loan clears first
+    assert ledger["payoff_month"][1, 0] == -1 and ledger["loan_balance"][1, 0] > 0  # Capped EMI never catches up
+    assert (ledger["cash"][2:] >= 0).all()  # Debt-free cash never goes negative
+
+
+def test_segments_join_into_the_full_span(tables, players):
+    full = build_ledger(**players, tables=tables)
+    first = build_ledger(**players, tables=slice_tables(tables, 0, 24))
+    second = build_ledger(
+        first["income"][:, -1],
+        first["expenses_end"],
+        first["cash"][:, -1],
+        first["loan_balance"],
+        players["loan_rate"],
+        players["loan_emi"],
+        first["invest_value"],
+        slice_tables(tables, 24, YEARS * 12),
+    )
+    joined = concat_ledgers([first, second])
+    for column in ("income", "emi", "interest", "principal", "investment_accrual"):
+        np.testing.assert_allclose(joined[column], full[column], rtol=1e-9, atol=1e-6, err_msg=column)
+    np.testing.assert_allclose(joined["loan_balance"], full["loan_balance"], rtol=1e-9, atol=1e-6)
+
+
+def test_yearly_view_sums_flows_and_keeps_year_end_cash(tables, players):
+    ledger = build_ledger(**players, tables=tables)
+    view = yearly_view(ledger)
+    assert view["cash"].shape == (4, YEARS)
+    np.testing.assert_allclose(view["income"].sum(axis=1), ledger["income"].sum(axis=1))
+    np.testing.assert_array_equal(view["cash"][:, -1], ledger["cash"][:, -1])
+
+
+def test_cached_schedules_match_closed_form_amortization():
+    loans = [
+        {"principal": 800000, "interest_rate": 0.09, "emi": 25000, "origin": 800000, "months_paid": 0},
+        {"principal": 100000, "interest_rate": 0.12, "emi": 9000, "origin": 150000, "months_paid": 7},
+        {"principal": 50000, "interest_rate": 0.0, "emi": 4000, "origin": 50000, "months_paid": 0},
+    ]
+    months = 48
+    cached = schedule_window(loans, months)
+    for row, loan in enumerate(loans):
+        principal = np.array([[loan_balance(loan)]])
+        direct = amortize(principal, np.array([[loan["interest_rate"]]]), np.array([[loan["emi"]]]),
+                          np.full((1, months), 1e9), 0.4)  # Income so high the cap never binds
+        for cached_part, direct_part in zip(cached, direct):
+            np.testing.assert_allclose(cached_part[:, row], direct_part[:, 0], rtol=1e-9, atol=1e-6)
+        still_open = direct[3][0, 0]
+        assert months_to_payoff(loan) == np.argmin(still_open) + 1  # The payment that closes the loan
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("GAME_SESSION_STORE", "memory://")
+os.environ.setdefault("GAME_RECORDINGS_PATH", "")
+os.environ.setdefault("GAME_LOG_ARCHIVE_DIR", tempfile.mkdtemp(prefix="game-logs-"))
+
+from fastapi.testclient import TestClient
+
+from game_api import app
+from game_engine import LOG_CAPACITY, LOG_EVICT_CHUNK, LOG_PAGE_SIZE, log_event, log_length, read_log_page
+
+
+def make_log(entries, archive=None):
+    state = {"game_log": [], "log_offset": 0, "log_archive": archive}
+    for index in range(entries):
+        log_event(state, f"entry {index}")
+    return state
+
+
+def test_pages_run_newest_first_across_the_archive(tmp_path):
+    state = make_log(LOG_CAPACITY + 2 * LOG_EVICT_CHUNK + 7, archive=str(tmp_path))
+    assert len(state["game_log"]) <= LOG_CAPACITY
+    pages = []
+    page = 0
+    while entries := read_log_page(state, page):
+        assert len(entries) <= LOG_PAGE_SIZE
+        pages.extend(entries)
+        page += 1
+    assert pages == [f"entry {index}" for index in reversed(range(log_length(state)))]
+
+
+def test_without_archive_only_the_kept_entries_page():
+    state = make_log(LOG_CAPACITY + LOG_EVICT_CHUNK)
+    assert log_length(state) == len(state["game_log"])
+    last = (log_length(state) - 1) // LOG_PAGE_SIZE
+    assert read_log_page(state, last)[-1] == state["game_log"][0]
+
+
+@pytest.mark.parametrize("page, page_size", [(-1, LOG_PAGE_SIZE), (1000, LOG_PAGE_SIZE), (0, 0), (0, -5)])
+def test_out_of_range_pages_are_empty(page, page_size):
+    assert read_log_page(make_log(30), page, page_size) == []
+
+
+def test_api_rejects_bad_page_parameters():
+    client = TestClient(app)
+    session_id = client.post("/games", json={}).json()["session_id"]
+    assert client.get(f"/games/{session_id}/log").status_code == 200
+    assert client.get(f"/games/{session_id}/log", params={"page": 1000}).json()["entries"] == []
+    for params in ({"page": -1}, {"page_size": 0}, {"page_size": LOG_CAPACITY + 1}):
+        assert client.get(f"/games/{session_id}/log", params=params).status_code == 422
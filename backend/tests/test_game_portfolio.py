@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from game_economy import regime_tables
+from game_portfolio import REBALANCE_MONTHS, portfolio_path
+
+ASSETS = ("fixed_deposit", "equity_index", "gold")
+YEARS = 5
+
+
+def loop_path(values, factors, contributions, weights, first_rebalance, period=REBALANCE_MONTHS):
+    """One portfolio, one month at a time: contribute, grow, then rebalance at the start of rebalance months."""
+    months = factors.shape[-1] - 1
+    holdings = np.array(values, dtype=float)
+    if weights is not None and first_rebalance == 0:
+        holdings = weights * holdings.sum()
+    path = [holdings]
+    for month in range(months):
+        holdings = (holdings + contributions) * factors[:, month + 1] / factors[:, month]
+        rebalancing = month + 1 >= first_rebalance and (month + 1 - first_rebalance) % period == 0
+        if weights is not None and rebalancing and month + 1 < months:
+            holdings = weights * holdings.sum()
+        path.append(holdings)
+    return np.stack(path, axis=-1)
+
+
+@pytest.fixture
+def factors():
+    return regime_tables("india_historic", 0, YEARS, ASSETS)["invest_factor"]
+
+
+@pytest.mark.parametrize("first_rebalance", [0, 5, 12, YEARS * 12])
+def test_closed_form_matches_a_monthly_loop(factors, first_rebalance):
+    values = np.array([[100000, 50000, 0], [0, 0, 0], [20000, 80000, 10000]], dtype=float)
+    contributions = np.array([[5000, 0, 1000], [2000, 3000, 0], [0, 0, 0]], dtype=float)
+    weights = np.array([[0.5, 0.3, 0.2], [0.0, 1.0, 0.0], [0.2, 0.6, 0.2]])
+    path = portfolio_path(values, factors, contributions, weights, first_rebalance)
+    assert path.shape == (3, len(ASSETS), YEARS * 12 + 1)
+    for player in range(3):
+        expected = loop_path(values[player], factors, contributions[player], weights[player], first_rebalance)
+        np.testing.assert_allclose(path[player], expected, rtol=1e-9, atol=1e-6)
+
+
+def test_without_contributions_or_weights_holdings_just_grow(factors):
+    values = np.array([[1000, 2000, 3000]], dtype=float)
+    np.testing.assert_allclose(portfolio_path(values, factors), values[..., None] * factors)
+
+
+def test_rebalance_months_hold_the_target_weights(factors):
+    weights = np.array([[0.25, 0.5, 0.25]])
+    path = portfolio_path(np.array([[0, 100000, 0]], dtype=float), factors, weights=weights, first_rebalance=3)
+    for month in range(3, YEARS * 12, REBALANCE_MONTHS):
+        np.testing.assert_allclose(path[0, :, month] / path[0, :, month].sum(), weights[0])
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from game_engine import create_new_game, get_branching_scenarios
+from game_replay import (
+    REPLAY_VERSION,
+    append_recording,
+    export_replay,
+    read_recordings,
+    replay,
+    state_fingerprint,
+    verify_recordings,
+    verify_replay,
+)
+from game_simulator import play_game, random_policy
+
+
+@pytest.fixture(scope="module")
+def scenarios():
+    return get_branching_scenarios()
+
+
+@pytest.fixture(scope="module")
+def finished_games(scenarios):
+    rng = random.Random(11)
+    return [play_game(random_policy, rng, scenarios)["state"] for _ in range(20)]
+
+
+def test_records_replay_to_their_fingerprint(finished_games, scenarios):
+    for state in finished_games:
+        record = export_replay(state)
+        assert record["v"] == REPLAY_VERSION
+        assert len(record["choices"]) == len(state["decision_log"])
+        assert state_fingerprint(replay(record, scenarios)) == state_fingerprint(state)
+        assert verify_replay(record, scenarios)
+
+
+def test_fingerprints_are_deterministic_for_a_seed():
+    assert state_fingerprint(create_new_game(seed=42)) == state_fingerprint(create_new_game(seed=42))
+    assert create_new_game(seed=42)["rng_seed"] == 42
+
+
+def test_life_events_flag_survives_the_round_trip(scenarios):
+    state = play_game(random_policy, random.Random(3), scenarios)["state"]
+    record = export_replay(state)
+    assert "life_events" not in record
+    quiet = export_replay(dict(state, life_events=False))
+    assert quiet["life_events"] is False
+
+
+def test_v1_records_replay_without_life_events(finished_games, scenarios):
+    record = dict(export_replay(finished_games[0]), v=1)
+    quiet = replay(record, scenarios)
+    assert quiet["life_events"] is False
+    record["fingerprint"] = state_fingerprint(quiet, version=1)
+    assert verify_replay(record, scenarios)
+
+
+def test_tampered_records_fail(finished_games, scenarios):
+    record = export_replay(finished_games[0])
+    assert not verify_replay(dict(record, fingerprint="0" * 16), scenarios)
+    reseeded = [dict(export_replay(state), seed=state["rng_seed"] + 1) for state in finished_games]
+    assert not all(verify_replay(record, scenarios) for record in reseeded)  # Life events follow the seed
+    with pytest.raises(ValueError):
+        replay(dict(record, v=REPLAY_VERSION + 1), scenarios)
+
+
+def test_recording_files_verify(finished_games, tmp_path):
+    path = tmp_path / "recordings.jsonl"
+    for state in finished_games[:5]:
+        append_recording(path, state)
+    assert len(read_recordings(path)) == 5
+    total, mismatched, _ = verify_recordings(path)
+    assert (total, mismatched) == (5, [])
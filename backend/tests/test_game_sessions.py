@@ -0,0 +1,102 @@
+import random
+import sqlite3
+
+import pytest
+
+from game_engine import create_new_game, get_branching_scenarios, process_decision_and_advance
+from game_replay import state_fingerprint
+from game_sessions import (
+    SNAPSHOT_EVERY,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    open_session_store,
+    record_decision,
+)
+from game_solver import available_choices
+
+NEVER = 3600  # A flush interval long enough that only batch size or reads trigger a flush
+
+
+def rows(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def play(store, session_id, decisions, seed=0):
+    """Plays ``decisions`` random choices, recording each, and returns ``(state, seq)``."""
+    scenarios = get_branching_scenarios()
+    rng = random.Random(seed)
+    state, seq = create_new_game(seed=seed), 0
+    store.save_snapshot(session_id, state, seq)
+    for _ in range(decisions):
+        choices = available_choices(state, scenarios)
+        if not choices:
+            break
+        new_state = process_decision_and_advance(state, rng.choice(choices)["text"])
+        seq = record_decision(store, session_id, seq, state["scenario_key"], new_state, "")
+        state = new_state
+    return state, seq
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "games.db"), batch_size=4, flush_interval=NEVER)
+    yield store
+    store.close()
+
+
+def test_writes_wait_for_a_full_batch(sqlite_store):
+    sqlite_store.save_snapshot("a", create_new_game(seed=1), 0)
+    sqlite_store.append_decision("a", 1, {"choice_text": "x"})
+    sqlite_store.append_decision("a", 2, {"choice_text": "y"})
+    assert rows(sqlite_store.path, "decisions") == rows(sqlite_store.path, "snapshots") == 0
+    sqlite_store.append_decision("a", 3, {"choice_text": "z"})  # The fourth pending write
+    assert (rows(sqlite_store.path, "snapshots"), rows(sqlite_store.path, "decisions")) == (1, 3)
+
+
+def test_background_flush_writes_a_partial_batch(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "games.db"), batch_size=100, flush_interval=0.01)
+    try:
+        store.save_snapshot("a", create_new_game(seed=1), 0)
+        store._closed.wait(0.2)
+        assert rows(store.path, "snapshots") == 1
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("url", ["memory://", "sqlite"])
+def test_sessions_restore_to_the_live_game(url, tmp_path):
+    store = open_session_store(url if url == "memory://" else f"sqlite:///{tmp_path / 'games.db'}")
+    state, seq = play(store, "game", SNAPSHOT_EVERY + 2, seed=4)
+    if url != "memory://":  # A restarted worker sees only what reached the file
+        store.close()
+        store = open_session_store(f"sqlite:///{tmp_path / 'games.db'}")
+    restored, restored_seq = store.load("game")
+    assert restored_seq == seq
+    assert state_fingerprint(restored) == state_fingerprint(state)
+    _, last_seq, decisions = store.load_raw("game")
+    assert last_seq + len(decisions) == seq and len(decisions) < SNAPSHOT_EVERY  # Only the tail is replayed
+    assert store.load("missing") is None
+    store.close()
+
+
+def test_compaction_drops_covered_decisions_and_idle_sessions(sqlite_store):
+    play(sqlite_store, "kept", SNAPSHOT_EVERY + 1, seed=1)
+    play(sqlite_store, "idle", SNAPSHOT_EVERY + 1, seed=2)
+    sqlite_store.flush()
+    before = rows(sqlite_store.path, "decisions")
+    sqlite_store.compact()
+    assert rows(sqlite_store.path, "decisions") < before
+    assert sqlite_store.load("kept") is not None
+
+    sqlite_store._conn.execute("UPDATE snapshots SET updated_at = 0 WHERE session_id = 'idle'")
+    sqlite_store.compact(max_idle_seconds=60)
+    assert sqlite_store.load("idle") is None
+    assert sqlite_store.load("kept") is not None
+
+
+def test_memory_store_compacts_idle_sessions():
+    store = InMemorySessionStore()
+    play(store, "idle", 2)
+    store.compact(max_idle_seconds=-1)
+    assert store.load("idle") is None
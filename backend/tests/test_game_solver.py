@@ -0,0 +1,103 @@
+import pytest
+
+import game_solver
+from game_engine import create_new_game, get_branching_scenarios, process_decision_and_advance
+from game_solver import (
+    available_choices,
+    canonical_state,
+    choice_outcomes,
+    fork_state,
+    preview_choices,
+    solve_parallel,
+    solve_state,
+)
+
+
+@pytest.fixture(scope="module")
+def scenarios():
+    return get_branching_scenarios()
+
+
+@pytest.fixture
+def root():
+    return create_new_game(seed=5, life_events=False)
+
+
+def every_ending(state, scenarios):
+    """All ``(net_worth, financial_health)`` endings reachable from ``state``, one per path."""
+    choices = available_choices(state, scenarios)
+    if not choices:
+        return [(state["finances"]["net_worth"], state["financial_health"])]
+    endings = []
+    for choice in choices:
+        endings += every_ending(process_decision_and_advance(fork_state(state), choice["text"]), scenarios)
+    return endings
+
+
+def test_solver_matches_every_path(root, scenarios):
+    solved = solve_state(root, {}, scenarios)
+    endings = every_ending(root, scenarios)
+    assert solved["paths"] == len(endings)
+    assert (solved["best"]["net_worth"], solved["best"]["financial_health"]) == max(endings)
+    assert (solved["worst"]["net_worth"], solved["worst"]["financial_health"]) == min(endings)
+    for choice in available_choices(root, scenarios):
+        child = process_decision_and_advance(fork_state(root), choice["text"])
+        assert solved["choices"][choice["id"]]["paths"] == len(every_ending(child, scenarios))
+
+
+def test_best_path_replays_to_its_outcome(root, scenarios):
+    best = solve_state(root, {}, scenarios)["best"]
+    state = root
+    for choice_id in best["path"]:
+        choice = next(c for c in available_choices(state, scenarios) if c["id"] == choice_id)
+        state = process_decision_and_advance(fork_state(state), choice["text"])
+    assert state["finances"]["net_worth"] == best["net_worth"]
+    assert not available_choices(state, scenarios)
+
+
+def test_memo_answers_repeat_solves_without_playing(root, scenarios, monkeypatch):
+    memo = {}
+    first = solve_state(root, memo, scenarios)
+    solved_nodes = len(memo)
+
+    def unexpected(*args):
+        raise AssertionError("memoized node was played again")
+
+    monkeypatch.setattr(game_solver, "process_decision_and_advance", unexpected)
+    assert solve_state(fork_state(root), memo, scenarios) is first
+    assert len(memo) == solved_nodes
+
+
+def test_parallel_merge_matches_a_serial_solve(root, scenarios):
+    serial_memo = {}
+    serial = solve_state(root, serial_memo, scenarios)
+    parallel_memo = {}
+    parallel = solve_parallel(root, parallel_memo, max_workers=2, split_depth=1)
+    assert parallel == serial
+    assert parallel_memo.keys() == serial_memo.keys()  # Every worker's subtree came back into the memo
+
+
+def test_seed_only_keys_states_with_life_events():
+    quiet = [create_new_game(seed=seed, life_events=False) for seed in (1, 2)]
+    eventful = [create_new_game(seed=seed) for seed in (1, 2)]
+    assert canonical_state(quiet[0]) == canonical_state(quiet[1])
+    assert canonical_state(eventful[0]) != canonical_state(eventful[1])
+
+
+def test_choice_outcomes_keep_the_memo_bounded(monkeypatch):
+    monkeypatch.setattr(game_solver, "_OUTCOME_MEMO", {})
+    monkeypatch.setattr(game_solver, "OUTCOME_MEMO_SIZE", 5)
+    outcomes = choice_outcomes(create_new_game(seed=9))
+    assert outcomes and len(game_solver._OUTCOME_MEMO) <= 5
+    assert choice_outcomes(create_new_game(seed=10)) == outcomes  # Shared, seed-free table
+
+
+def test_previews_are_what_each_choice_then_does(scenarios):
+    state = create_new_game(seed=11, life_events=True)
+    previews = preview_choices(state, scenarios)
+    assert set(previews) == {choice["id"] for choice in available_choices(state, scenarios)}
+    for choice in available_choices(state, scenarios):
+        played = process_decision_and_advance(fork_state(state), choice["text"])
+        assert previews[choice["id"]]["net_worth"] == played["finances"]["net_worth"]
+        assert previews[choice["id"]]["financial_health"] == played["financial_health"]
+    assert preview_choices(fork_state(state), scenarios) is previews  # Same snapshot, memoized
@@ -0,0 +1,116 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from voice_audio import AudioQueue, FrameBatcher, pcm_frame
+
+RATE = 16000
+FRAME = 320  # 20 ms
+
+
+def frame(value=1, size=FRAME):
+    return np.full(size, value, dtype=np.int16)
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_drop_oldest_trims_to_the_duration_bound():
+    queue = AudioQueue(RATE, max_ms=100)  # 1600 samples
+    for value in range(8):
+        queue.put_nowait(frame(value))
+    items = drain(queue)
+    assert sum(item.size for item in items) == 1600
+    assert items[-1][0] == 7
+    assert queue.stats()["dropped_ms"] == pytest.approx(8 * 20 - 100)
+
+
+def test_paired_items_are_dropped_whole():
+    queue = AudioQueue(RATE, max_ms=50)
+    for value in range(4):
+        queue.put_nowait((RATE, frame(value)))
+    assert [item[1][0] for item in drain(queue)] == [2, 3]
+
+
+def test_coalesce_merges_the_oldest_items_without_losing_audio():
+    queue = AudioQueue(RATE, max_ms=1000, max_items=4, policy="coalesce")
+    for value in range(10):
+        queue.put_nowait(frame(value))
+    items = drain(queue)
+    assert len(items) == 4
+    assert np.array_equal(np.concatenate(items), np.repeat(np.arange(10, dtype=np.int16), FRAME))
+    assert queue.stats()["coalesced"] == 6
+
+
+def test_nothing_is_queued_after_the_shutdown_signal():
+    queue = AudioQueue(RATE, max_ms=1000, max_items=4, policy="coalesce")
+    queue.put_nowait(frame())
+    queue.put_nowait(None)
+    for _ in range(10):
+        queue.put_nowait(frame())
+    assert len(drain(queue)) == 2
+    assert queue.samples == 0
+
+
+@pytest.mark.parametrize("policy", ["coalesce", "drop_oldest"])
+def test_markers_keep_their_place_and_the_duration_bound_holds(policy):
+    marker = object()
+    queue = AudioQueue(RATE, max_ms=100, max_items=4, policy=policy)
+    queue.put_nowait(marker)
+    for value in range(20):
+        queue.put_nowait(frame(value))
+    assert queue.samples <= 1600
+    items = drain(queue)
+    assert items[0] is marker
+    assert all(isinstance(item, np.ndarray) for item in items[1:])
+
+
+def test_clear_keeps_a_pending_shutdown_signal():
+    queue = AudioQueue(RATE, max_ms=1000)
+    queue.put_nowait(frame())
+    queue.put_nowait(None)
+    queue.clear()
+    assert drain(queue) == [None]
+
+
+def test_get_reports_when_the_item_was_queued():
+    async def run():
+        queue = AudioQueue(RATE, max_ms=1000)
+        queue.put_nowait(frame())
+        queued = queue._times[0]
+        await queue.get()
+        return queued, queue.last_enqueued
+
+    queued, reported = asyncio.run(run())
+    assert reported == queued
+
+
+def test_batcher_releases_everything_it_was_given():
+    batcher = FrameBatcher(RATE)
+    sent = []
+    for value in range(50):
+        batcher.add(frame(value))
+        if batcher.ready(0):
+            sent.append(batcher.take().copy())
+    if len(batcher):
+        sent.append(batcher.take().copy())
+    assert np.array_equal(np.concatenate(sent), np.repeat(np.arange(50, dtype=np.int16), FRAME))
+    assert all(chunk.size >= batcher.target for chunk in sent[:-1])
+
+
+def test_pcm_frame_copies_only_when_it_has_to():
+    mono = frame(5)
+    assert pcm_frame(mono) is mono
+    channels_first = frame(5).reshape(1, FRAME)  # fastrtc's (channels, samples)
+    assert pcm_frame(channels_first) is channels_first
+    strided = np.arange(FRAME * 2, dtype=np.int16)[::2]
+    floats = np.linspace(-1, 1, FRAME)
+    for array in (strided, floats):
+        converted = pcm_frame(array)
+        assert converted.dtype == np.int16 and converted.flags.c_contiguous
+        assert not np.shares_memory(converted, array)
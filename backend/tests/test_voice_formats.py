@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from voice_formats import Resampler, frame_size, negotiate
+
+
+def sine(frequency, rate, seconds=0.5, amplitude=8000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def test_clients_get_their_rates():
+    assert negotiate("browser") == (16000, 24000)
+    assert negotiate("phone") == (8000, 8000)
+    assert negotiate("websocket") == (8000, 8000)
+
+
+def test_matching_rates_pass_through_untouched():
+    samples = sine(440, 24000)
+    assert Resampler(24000, 24000)(samples) is samples
+
+
+@pytest.mark.parametrize("from_rate, to_rate", [(24000, 8000), (24000, 16000), (16000, 24000), (8000, 24000)])
+def test_chunked_output_matches_one_pass_and_keeps_the_tone(from_rate, to_rate):
+    samples = sine(440, from_rate)
+    whole = Resampler(from_rate, to_rate)(samples)
+    streaming = Resampler(from_rate, to_rate)
+    step = frame_size(from_rate, 20) + 7  # Chunks that do not line up with the ratio
+    chunked = np.concatenate([streaming(samples[start : start + step]) for start in range(0, samples.size, step)])
+    assert np.array_equal(chunked, whole)
+    assert abs(whole.size - samples.size * to_rate / from_rate) <= 1
+
+    # Past the filter's start-up, the output is a clean 440 Hz tone of the same amplitude
+    t = np.arange(whole.size) / to_rate
+    settled = slice(whole.size // 10, -whole.size // 10)
+    basis = np.stack([np.sin(2 * np.pi * 440 * t), np.cos(2 * np.pi * 440 * t)], axis=1)[settled]
+    fit, *_ = np.linalg.lstsq(basis, whole[settled].astype(float), rcond=None)
+    assert np.hypot(*fit) == pytest.approx(8000, rel=0.01)
+    assert np.sqrt(np.mean((basis @ fit - whole[settled]) ** 2)) < 0.005 * 8000
+
+
+def test_decimating_rejects_tones_above_the_new_nyquist():
+    out = Resampler(24000, 8000)(sine(6000, 24000))  # Would alias to 2 kHz at 8 kHz
+    assert np.sqrt(np.mean(out[200:-200].astype(float) ** 2)) < 0.01 * 8000
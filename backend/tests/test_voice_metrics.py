@@ -0,0 +1,98 @@
+import json
+import types
+
+import pytest
+
+import voice_metrics
+from voice_metrics import LATENCY_BUCKETS_MS, CallMetrics, Histogram, Telemetry
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for ``time`` inside voice_metrics; ``clock.now`` is in seconds."""
+    clock = types.SimpleNamespace(now=100.0)
+    clock.monotonic = lambda: clock.now
+    clock.time = lambda: clock.now
+    monkeypatch.setattr(voice_metrics, "time", clock)
+    return clock
+
+
+def test_histogram_quantiles_are_bucket_bounds_capped_at_the_max():
+    histogram = Histogram()
+    for ms in [3] * 50 + [40] * 40 + [260] * 9 + [1234]:
+        histogram.observe(ms)
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.9) == 50
+    assert histogram.quantile(0.99) == 300
+    assert histogram.quantile(1.0) == 1234  # Its bucket runs to 1500, but nothing larger was seen
+    summary = histogram.summary()
+    assert summary["count"] == 100 and summary["max_ms"] == 1234
+    assert summary["mean_ms"] == pytest.approx((150 + 1600 + 2340 + 1234) / 100)
+
+
+def test_histogram_edges_and_overflow():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None and histogram.summary()["mean_ms"] is None
+    histogram.observe(LATENCY_BUCKETS_MS[0])  # A value on a bound lands in that bound's bucket
+    assert histogram.counts[0] == 1
+    histogram.observe(LATENCY_BUCKETS_MS[-1] * 3)
+    assert histogram.counts[-1] == 1 and histogram.quantile(1.0) == LATENCY_BUCKETS_MS[-1] * 3
+    single = Histogram()
+    single.observe(7)
+    assert single.quantile(0.5) == 7  # Capped at the largest value seen, not the bucket's 10
+
+
+def test_merged_histograms_count_everything():
+    first, second = Histogram(), Histogram()
+    for ms in (1, 30, 600):
+        first.observe(ms)
+    for ms in (80, 9000):
+        second.observe(ms)
+    first.merge(second)
+    assert first.count == 5 and sum(first.counts) == 5 and first.max == 9000
+
+
+def test_turn_latency_counts_the_first_audio_of_each_reply(clock):
+    metrics = CallMetrics()
+    metrics.start("call")
+    clock.now += 0.2
+    metrics.connected()
+    metrics.chunk_sent(640, first_queued=clock.now - 0.03)
+    clock.now += 0.4
+    metrics.audio_received(960)
+    clock.now += 0.1
+    metrics.audio_received(960)  # Same reply: no second latency sample
+    metrics.turn_complete()
+    metrics.chunk_sent(640, first_queued=clock.now)
+    clock.now += 0.25
+    metrics.audio_received(960)
+    latency = {name: histogram.summary() for name, histogram in metrics.histograms.items()}
+    assert latency["connect_ms"]["max_ms"] == pytest.approx(200)
+    assert latency["mic_to_model_ms"]["max_ms"] == pytest.approx(30)
+    assert latency["time_to_first_audio_ms"]["count"] == 1
+    assert latency["time_to_first_audio_ms"]["max_ms"] == pytest.approx(600)
+    assert latency["turn_latency_ms"]["count"] == 2
+    assert latency["turn_latency_ms"]["max_ms"] == pytest.approx(400)
+    assert metrics.counters["bytes_received"] == 2880
+
+
+def test_telemetry_totals_live_and_finished_calls_without_their_ids(clock, tmp_path):
+    log = tmp_path / "calls.jsonl"
+    telemetry = Telemetry(str(log))
+    calls = [CallMetrics(lambda: {"uplink_queue": 0}) for _ in range(3)]
+    for index, metrics in enumerate(calls):
+        telemetry.open(f"webrtc-{index}", metrics)
+        metrics.frame_received()
+        metrics.histograms["turn_latency_ms"].observe(100 * (index + 1))
+    telemetry.close(calls[0])
+    telemetry.close(calls[0])  # Closing twice counts once
+
+    report = telemetry.report()
+    assert (report["live_calls"], report["finished_calls"], report["frames_in"]) == (2, 1, 3)
+    assert report["latency"]["turn_latency_ms"]["count"] == 3
+    assert [call["call"] for call in report["calls"]] == [2, 3]
+    assert "webrtc-" not in json.dumps(report)  # /input_hook accepts these ids, so they stay private
+    assert report["calls"][0]["uplink_queue"] == 0
+
+    logged = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(logged) == 1 and logged[0]["call_id"] == "webrtc-0" and logged[0]["call"] == 1
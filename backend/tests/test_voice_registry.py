@@ -0,0 +1,102 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+import voice_registry
+from voice_registry import WORKER_ID, InProcessRegistry, SQLiteRegistry, open_registry
+
+SECRET = "test-secret"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def registry(request, tmp_path):
+    registry = InProcessRegistry() if request.param == "memory" else SQLiteRegistry(str(tmp_path / "voice.db"), SECRET)
+    yield registry
+    registry.close()
+
+
+def test_claim_release_and_load(registry):
+    registry.claim("a")
+    registry.claim("b", worker="other:1")
+    registry.claim("c", worker="other:1")
+    assert registry.owner("a") == WORKER_ID and registry.owner("missing") is None
+    assert registry.load() == {WORKER_ID: 1, "other:1": 2}
+    assert registry.least_loaded([WORKER_ID, "idle:2"]) == "idle:2"
+    registry.release("b")
+    registry.release("c")
+    assert registry.owner("b") is None
+    assert registry.least_loaded() == WORKER_ID
+
+
+def test_args_are_taken_once(registry):
+    registry.set_args("call", ["key", "Puck"])
+    registry.set_args("call", ["key", "Kore"])  # A later hook replaces the earlier one
+    assert registry.take_args("call") == ["key", "Kore"]
+    assert registry.take_args("call") is None
+
+
+def test_untaken_args_expire(registry, monkeypatch):
+    registry.set_args("abandoned", ["key", "Puck"])
+    monkeypatch.setattr(voice_registry, "PENDING_ARGS_SECONDS", 0)
+    assert registry.take_args("abandoned") is None
+
+
+def test_pending_args_are_capped(registry, monkeypatch):
+    monkeypatch.setattr(voice_registry, "PENDING_ARGS_MAX", 3)
+    for index in range(5):
+        registry.set_args(f"call-{index}", ["key", "Puck"])
+        time.sleep(0.001)  # Distinct arrival times, so the oldest is well defined
+    assert [registry.take_args(f"call-{index}") is not None for index in range(5)] == [False, False, True, True, True]
+
+
+def test_release_drops_pending_args(registry):
+    registry.claim("call")
+    registry.set_args("call", ["key", "Puck"])
+    registry.release("call")
+    assert registry.take_args("call") is None
+
+
+def test_waiting_for_args_takes_them_when_they_arrive(registry):
+    async def scenario():
+        waiting = asyncio.create_task(registry.wait_for_args("call"))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        registry.set_args("call", ["key", "Puck"])
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(scenario()) == ["key", "Puck"]
+    assert registry.take_args("call") is None
+
+
+def test_sqlite_never_stores_the_key_in_the_clear(tmp_path):
+    path = str(tmp_path / "voice.db")
+    writer, reader, stranger = (SQLiteRegistry(path, secret) for secret in (SECRET, SECRET, "other-secret"))
+    writer.set_args("call", ["AIzaSyPLAINTEXT", "Puck"])
+    with sqlite3.connect(path) as conn:
+        (sealed,) = conn.execute("SELECT sealed FROM voice_args").fetchone()
+    assert b"AIzaSyPLAINTEXT" not in sealed
+    assert stranger.take_args("call") is None  # Sealed with another launch's secret
+    writer.set_args("call", ["AIzaSyPLAINTEXT", "Puck"])
+    assert reader.take_args("call") == ["AIzaSyPLAINTEXT", "Puck"]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM voice_args").fetchone()[0] == 0
+
+
+def test_sqlite_clears_stale_sessions_on_open(tmp_path):
+    path = str(tmp_path / "voice.db")
+    first = SQLiteRegistry(path, SECRET)
+    first.claim("crashed", worker="gone:1")
+    first._execute("UPDATE voice_sessions SET updated_at = 0")
+    first.claim("live")
+    second = SQLiteRegistry(path, SECRET)
+    assert second.owner("crashed") is None and second.owner("live") == WORKER_ID
+
+
+def test_sqlite_needs_a_shared_secret(tmp_path, monkeypatch):
+    monkeypatch.delenv(voice_registry.SECRET_ENV, raising=False)
+    with pytest.raises(ValueError):
+        open_registry(f"sqlite:///{tmp_path / 'voice.db'}")
+    monkeypatch.setenv(voice_registry.SECRET_ENV, SECRET)
+    assert isinstance(open_registry(f"sqlite:///{tmp_path / 'voice.db'}"), SQLiteRegistry)
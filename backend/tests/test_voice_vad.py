@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from voice_vad import END_OF_SPEECH, VoiceGate
+
+RATE = 16000
+FRAME = RATE * 20 // 1000  # 20 ms frames, as fastrtc delivers them
+
+
+def tone(frames, amplitude=3000, hz=220, start=0):
+    t = (start + np.arange(frames * FRAME)) / RATE
+    return np.split((amplitude * np.sin(2 * np.pi * hz * t)).astype(np.int16), frames)
+
+
+def silence(frames, rng=None, std=20):
+    rng = rng or np.random.default_rng(0)
+    return np.split(rng.normal(0, std, frames * FRAME).astype(np.int16), frames)
+
+
+def run(gate, frames):
+    out = []
+    for frame in frames:
+        out.extend(gate.admit(frame))
+    return out
+
+
+def markers(out):
+    return [index for index, item in enumerate(out) if item is END_OF_SPEECH]
+
+
+@pytest.fixture
+def gate():
+    return VoiceGate(RATE, backend="energy", hangover_ms=200, preroll_ms=60)
+
+
+def test_silence_is_dropped(gate):
+    assert run(gate, silence(50)) == []
+    assert gate.dropped > 0 and gate.passed == 0
+
+
+def test_speech_opens_with_the_preroll(gate):
+    quiet = silence(10)
+    speech = tone(5)
+    out = run(gate, quiet + speech)
+    # 60 ms of pre-roll, so the onset is not clipped
+    assert all(a is b for a, b in zip(out, quiet[-3:] + speech, strict=True))
+
+
+def test_hangover_then_one_end_of_speech(gate):
+    tail = silence(30)
+    out = run(gate, tone(10) + tail)
+    assert markers(out) == [len(out) - 1]
+    hangover = out[10:-1]
+    assert len(hangover) == 200 // 20 and all(a is b for a, b in zip(hangover, tail))
+
+
+def test_pauses_shorter_than_the_hangover_keep_the_gate_open(gate):
+    out = run(gate, tone(10) + silence(5) + tone(10, start=15 * FRAME))
+    assert markers(out) == []
+    assert len(out) == 25
+
+
+def test_each_utterance_ends_once(gate):
+    out = run(gate, (tone(10) + silence(20)) * 3)
+    assert len(markers(out)) == 3
+
+
+def test_steady_loud_noise_does_not_hold_the_gate_open(gate):
+    rng = np.random.default_rng(1)
+    noise = [np.clip(rng.normal(0, 400, FRAME), -32768, 32767).astype(np.int16) for _ in range(300)]
+    out = run(gate, noise)
+    assert markers(out) and markers(out)[0] < 250  # Closed within five seconds of noise
+    assert len(run(gate, noise[:50])) < 50
+
+
+def test_off_forwards_everything():
+    gate = VoiceGate(RATE, backend="off")
+    frames = silence(5)
+    assert all(a is b for a, b in zip(run(gate, frames), frames, strict=True))
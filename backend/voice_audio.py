@@ -0,0 +1,304 @@
+"""Audio helpers for the Gemini voice handler in ``fastrc.py``.
+
+PCM frames travel through the handler as the int16 arrays they arrived in and
+are read through the buffer protocol, so nothing is copied until the one
+base64 pass the Live API's JSON protocol requires.
+
+Microphone frames are packed into 60-200 ms chunks by ``FrameBatcher`` before
+they are sent, and the model's bursty replies are smoothed by ``JitterBuffer``
+before they are played. Both directions queue through ``AudioQueue``, which
+bounds how much audio a stalled peer can pile up. fastrtc pulls playback
+audio into a buffer of its own as fast as it is offered and paces it out in
+real time, so ``PlaybackClock`` keeps track of how far ahead of the listener
+the emitted audio is, and the handler only runs ``PLAYBACK_LEAD_MS`` ahead.
+"""
+
+import asyncio
+import binascii
+import collections
+import os
+import time
+
+import numpy as np
+
+BATCH_MIN_MS = int(os.getenv("VOICE_BATCH_MIN_MS", "60"))
+BATCH_MAX_MS = int(os.getenv("VOICE_BATCH_MAX_MS", "200"))
+BATCH_RTT_FACTOR = 4  # A chunk covers this many send round trips, within the bounds above
+RTT_SMOOTHING = 0.2  # Weight of the newest send time in the moving average
+JITTER_MIN_MS = int(os.getenv("VOICE_JITTER_MIN_MS", "40"))
+JITTER_MAX_MS = int(os.getenv("VOICE_JITTER_MAX_MS", "200"))
+JITTER_STEP_MS = 20  # Extra prebuffer added after each underrun within a turn
+UPLINK_MAX_MS = int(os.getenv("VOICE_UPLINK_MAX_MS", "1000"))
+UPLINK_MAX_FRAMES = int(os.getenv("VOICE_UPLINK_MAX_FRAMES", "16"))
+PLAYBACK_MAX_MS = int(os.getenv("VOICE_PLAYBACK_MAX_MS", "5000"))  # Model replies arrive faster than real time
+PLAYBACK_LEAD_MS = int(os.getenv("VOICE_PLAYBACK_LEAD_MS", "200"))  # Audio handed to the transport ahead of playback
+
+
+def pcm_frame(array: np.ndarray) -> np.ndarray:
+    """Returns a frame's samples as a C-contiguous int16 buffer, copying only if they are not one already.
+
+    Frames arrive as (channels, samples) or (samples,); both share one layout
+    in memory, so no squeeze is needed.
+    """
+    if array.dtype == np.int16 and array.flags.c_contiguous:
+        return array
+    return np.ascontiguousarray(array, dtype=np.int16)
+
+
+def encode_pcm(data: np.ndarray | memoryview | bytes) -> str:
+    """Base64-encodes PCM straight from its buffer for the Live API's JSON messages."""
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+
+def _samples(sample_rate: int, ms: int) -> int:
+    return sample_rate * ms // 1000
+
+
+def _append(buffer: np.ndarray, filled: int, samples: np.ndarray) -> np.ndarray:
+    """Copies ``samples`` in after the first ``filled`` samples, growing ``buffer`` only if it is full."""
+    end = filled + samples.size
+    if end > len(buffer):
+        buffer = np.concatenate([buffer[:filled], np.empty(end, dtype=np.int16)])
+    buffer[filled:end] = samples.reshape(-1)
+    return buffer
+
+
+class FrameBatcher:
+    """Packs uplink frames into one pre-allocated buffer and releases them as a single chunk.
+
+    A chunk is ready once it holds ``target`` samples and nothing else is
+    waiting, or once it reaches the maximum. The target follows the measured
+    send round trip (``observe``), so a slow link gets fewer, larger messages.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_ms: int = BATCH_MIN_MS,
+        max_ms: int = BATCH_MAX_MS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.min_samples = _samples(sample_rate, min_ms)
+        self.max_samples = _samples(sample_rate, max_ms)
+        self.target = self.min_samples
+        self.linger = min_ms / 1000  # Seconds a partial chunk waits for more frames before it is sent
+        self.rtt = 0.0
+        # Room for one more frame past the maximum, so frames are never split
+        self._buffer = np.empty(2 * self.max_samples, dtype=np.int16)
+        self._filled = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def add(self, frame: np.ndarray) -> None:
+        self._buffer = _append(self._buffer, self._filled, frame)
+        self._filled += frame.size
+
+    def ready(self, backlog: int = 0) -> bool:
+        """Whether to send now, given ``backlog`` frames still queued behind this chunk."""
+        return self._filled >= self.max_samples or (
+            self._filled >= self.target and not backlog
+        )
+
+    def take(self) -> np.ndarray:
+        """The pending chunk, as a view that stays valid until the next ``add``."""
+        chunk = self._buffer[: self._filled]
+        self._filled = 0
+        return chunk
+
+    def observe(self, seconds: float) -> None:
+        """Feeds back how long sending the last chunk took."""
+        self.rtt += RTT_SMOOTHING * (seconds - self.rtt)
+        wanted = int(BATCH_RTT_FACTOR * self.rtt * self.sample_rate)
+        self.target = min(max(wanted, self.min_samples), self.max_samples)
+
+
+class JitterBuffer:
+    """Holds back model audio until enough is buffered to play without gaps.
+
+    While playback is running, audio passes straight through. Once it has run
+    dry, audio is held until ``target`` samples are buffered. Every dry spell
+    in the middle of a turn raises the target by a step; the end of a turn
+    lowers it again.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_ms: int = JITTER_MIN_MS,
+        max_ms: int = JITTER_MAX_MS,
+    ) -> None:
+        self.min_samples = _samples(sample_rate, min_ms)
+        self.max_samples = _samples(sample_rate, max_ms)
+        self.step = _samples(sample_rate, JITTER_STEP_MS)
+        self.target = self.min_samples
+        self._buffer = np.empty(self.max_samples, dtype=np.int16)
+        self._filled = 0
+        self._in_turn = False
+
+    def push(self, samples: np.ndarray, playing: bool) -> np.ndarray | None:
+        """Adds model audio; returns what should be queued for playback now, if anything."""
+        if not playing and self._in_turn and not self._filled:
+            # Playback ran dry mid-turn: buffer more before resuming, this time and next
+            self.target = min(self.target + self.step, self.max_samples)
+            self._in_turn = False
+        if not self._filled and (playing or samples.size >= self.target):
+            self._in_turn = True
+            return samples
+        self._buffer = _append(self._buffer, self._filled, samples)
+        self._filled += samples.size
+        if playing or self._filled >= self.target:
+            self._in_turn = True
+            return self._take()
+        return None
+
+    def end_turn(self) -> np.ndarray | None:
+        """Releases whatever is held once the model finishes a turn."""
+        self._in_turn = False
+        self.target = max(self.target - self.step, self.min_samples)
+        return self._take() if self._filled else None
+
+    def clear(self) -> None:
+        """Drops held audio, e.g. when the user interrupts the model."""
+        self._filled = 0
+        self._in_turn = False
+
+    def _take(self) -> np.ndarray:
+        chunk = self._buffer[: self._filled].copy()
+        self._filled = 0
+        return chunk
+
+
+def _is_audio(item) -> bool:
+    return isinstance(item, (np.ndarray, tuple))
+
+
+class PlaybackClock:
+    """How much of the audio already handed to the transport is still to be heard."""
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self._until = 0.0  # Monotonic time at which everything emitted so far has played
+
+    def emitted(self, samples: int) -> None:
+        now = time.monotonic()
+        self._until = max(self._until, now) + samples / self.sample_rate
+
+    def ahead(self) -> float:
+        """Seconds of emitted audio not yet played."""
+        return max(self._until - time.monotonic(), 0.0)
+
+    def playing(self) -> bool:
+        return self._until > time.monotonic()
+
+    def reset(self) -> None:
+        """Forgets emitted audio, e.g. once the transport's buffer has been cleared."""
+        self._until = 0.0
+
+
+def _item_samples(item) -> int:
+    if not _is_audio(item):
+        return 0
+    return item[1].size if isinstance(item, tuple) else item.size
+
+
+class AudioQueue(asyncio.Queue):
+    """Never-blocking audio queue bounded by duration, and optionally by item count.
+
+    Items are int16 arrays or ``(sample_rate, array)`` pairs. Anything else
+    is a marker, such as ``None`` (the shutdown signal); markers keep their
+    place and are never dropped, and once ``None`` is queued later puts are
+    ignored. Past ``max_ms`` of audio the oldest audio is dropped (bare
+    arrays are trimmed), as stale audio is worse than missing audio. Past
+    ``max_items``, the ``"coalesce"`` policy merges the two oldest items
+    into one instead, so a slow consumer gets fewer, larger items, while
+    ``"drop_oldest"`` drops the oldest item; neither touches a marker at the
+    head, and the duration bound still holds meanwhile. ``stats`` reports depth, the
+    high-water mark and what was dropped, and ``last_enqueued`` when the item
+    last returned by ``get`` was put (merged items keep the older time).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        max_ms: int,
+        max_items: int | None = None,
+        policy: str = "drop_oldest",
+    ) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_samples = _samples(sample_rate, max_ms)
+        self.max_items = max_items
+        self.policy = policy
+        self.samples = 0
+        self.high_water = 0
+        self.last_enqueued: float | None = None
+        self.closed = False  # Set once None is queued
+        self._times = collections.deque()
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _put(self, item) -> None:
+        if self.closed:  # Whatever arrives after shutdown has no one to go to
+            self.dropped += _item_samples(item)
+            return
+        self.closed = item is None
+        queue = self._queue
+        queue.append(item)
+        self._times.append(time.monotonic())
+        self.samples += _item_samples(item)
+        while self.samples > self.max_samples:
+            self._drop(self.samples - self.max_samples)
+        while self.max_items and len(queue) > self.max_items:
+            first, second = queue[0], queue[1]
+            if self.policy == "coalesce" and isinstance(first, np.ndarray) and isinstance(second, np.ndarray):
+                queue.popleft()
+                queue[0] = np.concatenate([first.reshape(-1), second.reshape(-1)])
+                del self._times[1]
+                self.coalesced += 1
+            elif self.policy != "coalesce" and _is_audio(first):
+                self._drop()
+            else:
+                break
+        self.high_water = max(self.high_water, self.samples)
+
+    def _get(self):
+        item = self._queue.popleft()
+        self.last_enqueued = self._times.popleft()
+        self.samples -= _item_samples(item)
+        return item
+
+    def _drop(self, excess: int | None = None) -> None:
+        """Drops the oldest audio, or just its first ``excess`` samples if it is a longer bare array."""
+        queue = self._queue
+        index = next(position for position, item in enumerate(queue) if _is_audio(item))
+        oldest = queue[index]
+        if excess is not None and not isinstance(oldest, tuple) and oldest.size > excess:
+            queue[index] = oldest.reshape(-1)[excess:]
+            dropped = excess
+        else:
+            dropped = _item_samples(oldest)
+            del queue[index]
+            del self._times[index]
+        self.samples -= dropped
+        self.dropped += dropped
+
+    def clear(self) -> None:
+        """Drops everything queued, e.g. playback the user has just talked over."""
+        closing = bool(self._queue) and self._queue[-1] is None
+        self.dropped += self.samples
+        self._queue.clear()
+        self._times.clear()
+        self.samples = 0
+        if closing:
+            self._queue.append(None)
+            self._times.append(time.monotonic())
+
+    def stats(self) -> dict:
+        to_ms = 1000 / self.sample_rate
+        return {
+            "depth_ms": self.samples * to_ms,
+            "high_water_ms": self.high_water * to_ms,
+            "dropped_ms": self.dropped * to_ms,
+            "coalesced": self.coalesced,
+        }
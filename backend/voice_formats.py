@@ -0,0 +1,98 @@
+"""Sample-rate negotiation and resampling between voice clients and Gemini.
+
+Gemini Live takes 16-bit mono PCM at any rate named in the blob's MIME type
+(16 kHz natively) and replies at 24 kHz. ``negotiate`` picks the cheapest
+pair of rates for a kind of client, and the handler asks once per
+connection: WebRTC browsers keep the model's own rates, so nothing is
+resampled here, while phone calls and fastrtc's websocket transport, which
+both carry 8-bit mu-law, run at 8 kHz end to end. Their uplink goes out at
+8 kHz as-is, half the bytes of 16 kHz, and only the model's replies are
+resampled, once, by a ``Resampler`` that keeps its filter history between
+chunks.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+MODEL_INPUT_RATE = 16000
+MODEL_OUTPUT_RATE = 24000
+CLIENT_RATES = {  # client -> (microphone rate, speaker rate)
+    "browser": (MODEL_INPUT_RATE, MODEL_OUTPUT_RATE),
+    "phone": (8000, 8000),  # Telephony audio is 8 kHz, so anything more is resampled away
+    "websocket": (8000, 8000),  # Mu-law frames, as from a phone
+}
+TAPS_PER_PHASE = 16  # Filter length per polyphase branch when upsampling; longer is sharper and slower
+KAISER_BETA = 8.0
+
+
+def negotiate(client: str) -> tuple[int, int]:
+    """``(input_rate, output_rate)`` for a ``"browser"``, ``"phone"`` or ``"websocket"`` client."""
+    return CLIENT_RATES[client]
+
+
+def uplink_mime(sample_rate: int) -> str:
+    return f"audio/pcm;rate={sample_rate}"
+
+
+def frame_size(sample_rate: int, ms: int = 20) -> int:
+    return sample_rate * ms // 1000
+
+
+@lru_cache(maxsize=16)
+def polyphase_filter(up: int, down: int, taps: int = TAPS_PER_PHASE) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass for ``up``/``down`` resampling, split into (up, taps) branches.
+
+    Each branch is stored reversed so it lines up with a window of input
+    samples in time order. Shared, read-only, by every session at this ratio.
+    """
+    length = up * taps
+    cutoff = 0.45 / max(up, down)  # Cycles per sample at the upsampled rate, a little under Nyquist
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, KAISER_BETA)
+    h *= up / h.sum()
+    branches = np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+    branches.flags.writeable = False
+    return branches
+
+
+class Resampler:
+    """Streaming polyphase resampler for int16 chunks, one per session and direction.
+
+    The last ``taps - 1`` input samples and the position of the next output
+    sample carry over between calls, so chunk boundaries are seamless.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int) -> None:
+        common = math.gcd(from_rate, to_rate)
+        self.up = to_rate // common
+        self.down = from_rate // common
+        # Decimating needs a filter spanning as many input samples as it drops
+        taps = TAPS_PER_PHASE * max(1, self.down // self.up)
+        self.taps = taps
+        self.identity = self.up == self.down
+        self._branches = polyphase_filter(self.up, self.down, taps) if not self.identity else None
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._consumed = 0  # Input samples seen so far
+        self._next = 0  # Position of the next output sample, in upsampled samples
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        if self.identity:
+            return samples
+        samples = samples.reshape(-1)
+        buffer = np.concatenate([self._history, samples.astype(np.float32)])
+        end = (self._consumed + samples.size) * self.up  # Upsampled position just past this chunk
+        positions = np.arange(self._next, end, self.down)
+        inputs = positions // self.up  # Input sample each output is centred on
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)
+        # Window j ends at input sample self._consumed + j
+        out = np.einsum(
+            "nk,nk->n",
+            windows[inputs - self._consumed],
+            self._branches[positions % self.up],
+        )
+        self._history = buffer[-(self.taps - 1) :]
+        self._consumed += samples.size
+        self._next = int(positions[-1]) + self.down if positions.size else self._next
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
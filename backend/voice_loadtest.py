@@ -0,0 +1,404 @@
+"""Load test for the voice server with a local stand-in for Gemini Live.
+
+Run ``python voice_loadtest.py --sessions 50`` from this directory. It
+
+1. starts ``MockLiveServer``, which speaks enough of the Live API's websocket
+   protocol for ``google-genai``: it completes the setup handshake, listens
+   to the PCM each call sends and, once the caller signals
+   ``audio_stream_end`` (or, failing that, after ``--turn-gap-ms`` without
+   audio), answers after ``--latency-ms`` with either an echo of what it
+   heard or a synthesized tone;
+2. starts ``fastrc:app`` under uvicorn in a subprocess, pointed at the stand-in
+   through ``VOICE_GEMINI_BASE_URL``;
+3. drives ``--sessions`` concurrent calls through the ``/websocket/offer``
+   route ``stream.mount(app)`` adds, as 8 kHz mu-law like that transport
+   carries. Each call alternates ``--talk`` seconds of speech-like audio
+   with ``--listen`` seconds of silence at real-time pace.
+
+It then reports the server's CPU, peak memory, sessions per core used, and
+turn latency percentiles as the clients saw them (end of speech until the
+first audible reply), alongside each worker's own ``/voice/metrics``. How
+many turns ended on ``audio_stream_end`` rather than the stand-in's silence
+timeout shows whether the server closes turns itself; it only sends one with
+``VOICE_AUDIO_STREAM_END=1`` in the environment, which the server inherits.
+
+The Live API client always connects over TLS, so the stand-in serves a
+throwaway self-signed certificate (made with the ``openssl`` CLI) that the
+server subprocess is told to trust through ``SSL_CERT_FILE``. CPU and memory
+are read from ``/proc``, so those figures need Linux.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import pathlib
+import secrets
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from voice_formats import MODEL_OUTPUT_RATE, Resampler
+
+current_dir = pathlib.Path(__file__).parent
+
+CLIENT_RATE = 8000  # fastrtc's websocket transport carries telephone-rate mu-law
+FRAME_MS = 20
+REPLY_CHUNK_MS = 100
+AUDIBLE_RMS = 200.0  # Received audio louder than this counts as the reply starting
+READY_TIMEOUT_SECONDS = 30
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """G.711 mu-law, as fastrtc's websocket transport expects."""
+    x = samples.astype(np.int32)
+    sign = (x < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(x), 32635) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def mulaw_decode(data: bytes) -> np.ndarray:
+    u = ~np.frombuffer(data, dtype=np.uint8).astype(np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    magnitude = (((u & 0x0F) << 3) + 0x84) << exponent
+    return np.where(u & 0x80, 0x84 - magnitude, magnitude - 0x84).astype(np.int16)
+
+
+def speech_like(seconds: float, rate: int, rng: np.random.Generator) -> np.ndarray:
+    """A vowel-ish tone with a wobbling pitch and a little noise, loud enough for the VAD."""
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+    return (3000 * voice + rng.normal(0, 50, t.size)).astype(np.int16)
+
+
+def tone(seconds: float, rate: int, frequency: float = 220.0) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (4000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"count": len(values), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": max(values)}
+
+
+class MockLiveServer:
+    """Stand-in for Gemini Live's BidiGenerateContent websocket."""
+
+    def __init__(
+        self, latency_ms: float, reply: str = "echo", reply_seconds: float = 1.0, turn_gap_ms: float = 2000.0
+    ) -> None:
+        self.latency = latency_ms / 1000
+        self.reply = reply
+        self.reply_seconds = reply_seconds
+        self.turn_gap = turn_gap_ms / 1000  # Stands in for the real server's own, slower, silence detection
+        self.sessions = 0
+        self.turns = 0
+        self.turns_signalled = 0  # Ended by audio_stream_end rather than the silence timeout
+
+    async def handle(self, websocket) -> None:
+        await websocket.recv()  # The setup message; model and voice do not matter here
+        await websocket.send(json.dumps({"setupComplete": {}}))
+        self.sessions += 1
+        heard = []
+        while True:
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), self.turn_gap if heard else None)
+            except (asyncio.TimeoutError, TimeoutError):
+                asyncio.create_task(self.answer(websocket, heard))
+                heard = []
+                continue
+            except ConnectionClosed:
+                return
+            message = json.loads(raw)
+            realtime = message.get("realtime_input") or message.get("realtimeInput") or {}
+            for chunk in realtime.get("media_chunks") or realtime.get("mediaChunks") or []:
+                mime = chunk.get("mime_type") or chunk.get("mimeType") or ""
+                rate = int(mime.split("rate=")[1]) if "rate=" in mime else CLIENT_RATE
+                heard.append((rate, np.frombuffer(base64.b64decode(chunk["data"]), dtype=np.int16)))
+            if (realtime.get("audio_stream_end") or realtime.get("audioStreamEnd")) and heard:
+                self.turns_signalled += 1
+                asyncio.create_task(self.answer(websocket, heard))
+                heard = []
+
+    async def answer(self, websocket, heard: list) -> None:
+        await asyncio.sleep(self.latency)
+        if self.reply == "echo":
+            said = np.concatenate([samples for _, samples in heard])
+            audio = Resampler(heard[0][0], MODEL_OUTPUT_RATE)(said)
+        else:
+            audio = tone(self.reply_seconds, MODEL_OUTPUT_RATE)
+        step = MODEL_OUTPUT_RATE * REPLY_CHUNK_MS // 1000
+        try:
+            for start in range(0, audio.size, step):
+                part = {
+                    "inlineData": {
+                        "mimeType": f"audio/pcm;rate={MODEL_OUTPUT_RATE}",
+                        "data": base64.b64encode(audio[start : start + step].tobytes()).decode("ascii"),
+                    }
+                }
+                await websocket.send(json.dumps({"serverContent": {"modelTurn": {"parts": [part]}}}))
+            await websocket.send(json.dumps({"serverContent": {"turnComplete": True}}))
+            self.turns += 1
+        except ConnectionClosed:
+            pass
+
+
+def self_signed_certificate(directory: str) -> tuple[str, str]:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", key, "-out", cert, "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def _process_tree(pid: int) -> list[int]:
+    children = {}
+    for stat in pathlib.Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def process_usage(pid: int) -> tuple[float, float]:
+    """CPU seconds and resident MB of a process and its children, from ``/proc``."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu, rss = 0.0, 0.0
+    for member in _process_tree(pid):
+        try:
+            fields = pathlib.Path(f"/proc/{member}/stat").read_text().rsplit(")", 1)[1].split()
+            status = pathlib.Path(f"/proc/{member}/status").read_text()
+        except OSError:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / ticks
+        rss += next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmRSS")) / 1024
+    return cpu, rss
+
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def _post_json(url: str, body: dict) -> dict:
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def worker_metrics(base_url: str, workers: int) -> dict:
+    """``/voice/metrics`` from each worker, asked until every one has answered or the tries run out.
+
+    Each worker reports only its own calls, and which worker answers a new
+    connection is up to the kernel.
+    """
+    reports = {}
+    for _ in range(20 * workers):
+        report = await asyncio.to_thread(_get_json, base_url + "/voice/metrics")
+        reports[report["worker"]] = report
+        if len(reports) == workers:
+            break
+    return reports
+
+
+class SyntheticCall:
+    """One caller on fastrtc's websocket transport, timing how long each reply takes to start."""
+
+    def __init__(self, base_url: str, talk: float, listen: float, seed: int) -> None:
+        self.base_url = base_url
+        self.talk = talk
+        self.listen = listen
+        self.rng = np.random.default_rng(seed)
+        self.call_id = uuid.uuid4().hex
+        self.latencies: list[float] = []
+        self.late_frames = 0
+        self.error: str | None = None
+        self._spoke_at: float | None = None
+
+    async def run(self, until: float) -> None:
+        ws_url = self.base_url.replace("http", "ws", 1) + "/websocket/offer"
+        try:
+            async with connect(ws_url) as websocket:
+                await websocket.send(json.dumps({"event": "start", "websocket_id": self.call_id}))
+                await asyncio.to_thread(
+                    _post_json,
+                    self.base_url + "/input_hook",
+                    {"webrtc_id": self.call_id, "api_key": "loadtest", "voice_name": "Puck"},
+                )
+                listener = asyncio.create_task(self.listen_for_replies(websocket))
+                try:
+                    await self.speak(websocket, until)
+                    await websocket.send(json.dumps({"event": "stop"}))
+                finally:
+                    listener.cancel()
+        except Exception as error:  # Reported per call rather than stopping the whole run
+            self.error = f"{type(error).__name__}: {error}"
+
+    async def speak(self, websocket, until: float) -> None:
+        frame = CLIENT_RATE * FRAME_MS // 1000
+        silence = np.zeros(int(self.listen * CLIENT_RATE), dtype=np.int16)
+        next_frame = time.monotonic()
+        while time.monotonic() < until:
+            turn = np.concatenate([speech_like(self.talk, CLIENT_RATE, self.rng), silence])
+            speech_frames = int(self.talk * CLIENT_RATE) // frame
+            for index, start in enumerate(range(0, turn.size - frame + 1, frame)):
+                payload = base64.b64encode(mulaw_encode(turn[start : start + frame])).decode("ascii")
+                await websocket.send(json.dumps({"event": "media", "media": {"payload": payload}}))
+                if index == speech_frames - 1:
+                    self._spoke_at = time.monotonic()
+                next_frame += FRAME_MS / 1000
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.late_frames += 1  # This client process is falling behind real time
+
+    async def listen_for_replies(self, websocket) -> None:
+        async for raw in websocket:
+            message = json.loads(raw)
+            if message.get("event") != "media" or self._spoke_at is None:
+                continue
+            audio = mulaw_decode(base64.b64decode(message["media"]["payload"])).astype(np.float32)
+            if audio.size and np.sqrt(np.mean(audio**2)) > AUDIBLE_RMS:
+                self.latencies.append((time.monotonic() - self._spoke_at) * 1000)
+                self._spoke_at = None
+
+
+async def run_load(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="voice-loadtest-")
+    cert, key = self_signed_certificate(workdir)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    mock = MockLiveServer(args.latency_ms, args.reply, args.reply_seconds, args.turn_gap_ms)
+
+    async with serve(mock.handle, "127.0.0.1", args.mock_port, ssl=context):
+        env = dict(
+            os.environ,
+            SSL_CERT_FILE=cert,
+            VOICE_GEMINI_BASE_URL=f"https://127.0.0.1:{args.mock_port}/",
+            GOOGLE_API_KEY="loadtest",
+            VOICE_WORKERS=str(args.workers),
+            VOICE_REGISTRY_SECRET=secrets.token_hex(32),
+        )
+        env.pop("MODE", None)
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "fastrc:app",
+                "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers),
+            ],
+            cwd=current_dir,
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+            while True:
+                try:
+                    await asyncio.to_thread(_get_json, base_url + "/voice/workers")
+                    break
+                except OSError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("Voice server did not start")
+                    await asyncio.sleep(0.2)
+
+            cpu_before, _ = process_usage(server.pid)
+            started = time.monotonic()
+            until = started + args.ramp + args.duration
+            calls = [SyntheticCall(base_url, args.talk, args.listen, seed) for seed in range(args.sessions)]
+            peak_rss = 0.0
+
+            async def start_later(call: SyntheticCall, delay: float) -> None:
+                await asyncio.sleep(delay)
+                await call.run(until)
+
+            async def sample_memory() -> None:
+                nonlocal peak_rss
+                while True:
+                    peak_rss = max(peak_rss, process_usage(server.pid)[1])
+                    await asyncio.sleep(1)
+
+            sampler = asyncio.create_task(sample_memory())
+            await asyncio.gather(
+                *(start_later(call, args.ramp * i / max(args.sessions, 1)) for i, call in enumerate(calls))
+            )
+            sampler.cancel()
+            elapsed = time.monotonic() - started
+            cpu_after, rss = process_usage(server.pid)
+            server_metrics = await worker_metrics(base_url, args.workers)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    cores_used = (cpu_after - cpu_before) / elapsed
+    return {
+        "sessions": args.sessions,
+        "workers": args.workers,
+        "seconds": elapsed,
+        "failed_sessions": sum(call.error is not None for call in calls),
+        "errors": sorted({call.error for call in calls if call.error})[:5],
+        "server_cpu_cores": cores_used,
+        "sessions_per_core": args.sessions / cores_used if cores_used else None,
+        "server_peak_rss_mb": max(peak_rss, rss),
+        "mock_turns_answered": mock.turns,
+        "mock_turns_ended_by_audio_stream_end": mock.turns_signalled,
+        "client_late_frames": sum(call.late_frames for call in calls),
+        "turn_latency": percentiles([latency for call in calls for latency in call.latencies]),
+        "server_latency_by_worker": {worker: report["latency"] for worker, report in server_metrics.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the voice server against a local Gemini Live stand-in.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds every call stays up after the ramp")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which calls are started")
+    parser.add_argument("--talk", type=float, default=2.0, help="Seconds of speech per turn")
+    parser.add_argument("--listen", type=float, default=3.0, help="Seconds of silence per turn")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Stand-in model latency per reply")
+    parser.add_argument("--reply", choices=("echo", "tone"), default="echo")
+    parser.add_argument("--reply-seconds", type=float, default=1.0, help="Length of tone replies")
+    parser.add_argument(
+        "--turn-gap-ms", type=float, default=2000.0, help="Silence after which the stand-in ends a turn unasked"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mock-port", type=int, default=8443)
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    print(json.dumps(report, indent=2, default=float))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=float)
@@ -0,0 +1,195 @@
+"""Latency and throughput telemetry for voice calls.
+
+Every call gets a ``CallMetrics`` that counts frames and bytes each way and
+keeps latency histograms:
+
+- ``connect_ms``: call start until the Gemini session is ready
+- ``time_to_first_audio_ms``: call start until the model's first audio
+- ``mic_to_model_ms``: a frame entering the uplink queue until its chunk is sent
+- ``model_to_speaker_ms``: model audio entering the playback queue until it is played
+- ``turn_latency_ms``: the last audio sent before a reply until the reply's first audio
+
+``telemetry`` holds the live calls and folds finished ones into per-worker
+totals, which ``/voice/metrics`` in ``fastrc.py`` serves. Calls appear
+there by a per-worker number, never their ``webrtc_id``, which is what
+``/input_hook`` accepts. With ``VOICE_METRICS_LOG`` set, each finished call
+is also appended to that file as one JSON line, with its ``webrtc_id``.
+"""
+
+import bisect
+import json
+import os
+import time
+
+METRICS_LOG = os.getenv("VOICE_METRICS_LOG")
+LATENCY_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+HISTOGRAMS = (
+    "connect_ms",
+    "time_to_first_audio_ms",
+    "mic_to_model_ms",
+    "model_to_speaker_ms",
+    "turn_latency_ms",
+)
+COUNTERS = ("frames_in", "chunks_sent", "bytes_sent", "chunks_received", "bytes_received", "chunks_played")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds, capped at the maximum seen."""
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= q * self.count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max,
+        }
+
+
+def _ms_since(moment: float, now: float) -> float:
+    return (now - moment) * 1000
+
+
+class CallMetrics:
+    """Counters and latency histograms for one call.
+
+    ``gauges`` is an optional zero-argument callable returning point-in-time
+    readings (queue depths and the like) to include in snapshots.
+    """
+
+    def __init__(self, gauges=None) -> None:
+        self.call_id: str | None = None
+        self.number: int | None = None  # Shown instead of call_id, which identifies the call to /input_hook
+        self.gauges = gauges
+        self.started = time.monotonic()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram() for name in HISTOGRAMS}
+        self._last_sent: float | None = None
+        self._replying = False
+        self._heard_first = False
+
+    def start(self, call_id: str, number: int | None = None) -> None:
+        self.call_id = call_id
+        self.number = number
+        self.started = time.monotonic()
+
+    def connected(self) -> None:
+        self.histograms["connect_ms"].observe(_ms_since(self.started, time.monotonic()))
+
+    def frame_received(self) -> None:
+        self.counters["frames_in"] += 1
+
+    def chunk_sent(self, size: int, first_queued: float) -> None:
+        now = time.monotonic()
+        self.counters["chunks_sent"] += 1
+        self.counters["bytes_sent"] += size
+        self.histograms["mic_to_model_ms"].observe(_ms_since(first_queued, now))
+        self._last_sent = now
+
+    def audio_received(self, size: int) -> None:
+        now = time.monotonic()
+        self.counters["chunks_received"] += 1
+        self.counters["bytes_received"] += size
+        if not self._heard_first:
+            self._heard_first = True
+            self.histograms["time_to_first_audio_ms"].observe(_ms_since(self.started, now))
+        if not self._replying and self._last_sent is not None:
+            self.histograms["turn_latency_ms"].observe(_ms_since(self._last_sent, now))
+        self._replying = True
+
+    def turn_complete(self) -> None:
+        self._replying = False
+
+    def audio_played(self, queued: float) -> None:
+        self.counters["chunks_played"] += 1
+        self.histograms["model_to_speaker_ms"].observe(_ms_since(queued, time.monotonic()))
+
+    def snapshot(self) -> dict:
+        return {
+            "call": self.number,
+            "duration_s": time.monotonic() - self.started,
+            **self.counters,
+            **(self.gauges() if self.gauges else {}),
+            "latency": {name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+
+
+class Telemetry:
+    """Live calls plus totals over the calls this worker has finished."""
+
+    def __init__(self, log_path: str | None = METRICS_LOG) -> None:
+        self.log_path = log_path
+        self.live: dict[str, CallMetrics] = {}
+        self.opened = 0
+        self.finished = 0
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram() for name in HISTOGRAMS}
+
+    def open(self, call_id: str, metrics: CallMetrics) -> None:
+        self.opened += 1
+        metrics.start(call_id, self.opened)
+        self.live[call_id] = metrics
+
+    def close(self, metrics: CallMetrics) -> None:
+        if self.live.pop(metrics.call_id, None) is None:
+            return
+        self.finished += 1
+        for name, value in metrics.counters.items():
+            self.counters[name] += value
+        for name, histogram in metrics.histograms.items():
+            self.histograms[name].merge(histogram)
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps({"ts": time.time(), "call_id": metrics.call_id, **metrics.snapshot()}) + "\n")
+
+    def report(self) -> dict:
+        """Totals and latency summaries over finished and live calls, plus each live call."""
+        counters = dict(self.counters)
+        histograms = {name: Histogram() for name in HISTOGRAMS}
+        for name, histogram in self.histograms.items():
+            histograms[name].merge(histogram)
+        for metrics in self.live.values():
+            for name, value in metrics.counters.items():
+                counters[name] += value
+            for name, histogram in metrics.histograms.items():
+                histograms[name].merge(histogram)
+        return {
+            "live_calls": len(self.live),
+            "finished_calls": self.finished,
+            **counters,
+            "latency": {name: histogram.summary() for name, histogram in histograms.items()},
+            "calls": [metrics.snapshot() for metrics in self.live.values()],
+        }
+
+
+telemetry = Telemetry()
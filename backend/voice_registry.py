@@ -0,0 +1,256 @@
+"""Voice session registry shared by the fastrtc workers on one host.
+
+A call's WebRTC peer connection lives in whichever worker answered its
+offer, but ``/input_hook`` can land on any worker. The registry records
+which worker owns each ``webrtc_id`` and hands the arguments the browser
+sent for it to the owning handler wherever they arrived. The same records
+give routing hints (the owner of a call, the least loaded worker) to a proxy
+in front of the workers.
+
+Arguments carry the user's API key, so they are held only until the call
+takes them, and for at most ``PENDING_ARGS_SECONDS`` when no call does (a
+page reload, an abandoned offer), with at most ``PENDING_ARGS_MAX`` waiting.
+
+``memory://`` keeps everything in process and suits a single worker;
+``sqlite:///voice_sessions.db`` is a WAL-mode file shared by every worker on
+the host. It stores arguments sealed with ``VOICE_REGISTRY_SECRET``, which
+every worker must share and which never touches the file, so what a crashed
+worker leaves behind cannot be read back.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+ARGS_POLL_SECONDS = (0.02, 0.2)  # First and longest wait between looks for args stored by another worker
+STALE_SESSION_SECONDS = 6 * 3600  # Entries older than this are left behind by crashed workers
+PENDING_ARGS_SECONDS = 30  # Args no call has taken by then belong to a call that never started
+PENDING_ARGS_MAX = 1024  # Untaken args kept at once; the oldest go first
+SECRET_ENV = "VOICE_REGISTRY_SECRET"
+
+
+class SessionRegistry:
+    """Interface for voice session registries."""
+
+    def claim(self, webrtc_id, worker=WORKER_ID):
+        """Records that ``worker`` owns the call."""
+        raise NotImplementedError
+
+    def release(self, webrtc_id):
+        raise NotImplementedError
+
+    def set_args(self, webrtc_id, args):
+        """Holds args for the call until it takes them or ``PENDING_ARGS_SECONDS`` pass."""
+        raise NotImplementedError
+
+    def take_args(self, webrtc_id):
+        """Removes and returns the args held for a call, or None if none have arrived."""
+        raise NotImplementedError
+
+    def owner(self, webrtc_id):
+        """The worker that owns a call, or None."""
+        raise NotImplementedError
+
+    def load(self):
+        """Active calls per worker."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def least_loaded(self, workers=()):
+        """The worker with the fewest calls among ``workers`` and those with calls."""
+        counts = dict.fromkeys(workers, 0) | self.load()
+        return min(counts, key=counts.get) if counts else None
+
+    async def wait_for_args(self, webrtc_id):
+        """Waits until args for the call are stored and takes them, checking less often the longer it takes."""
+        delay, longest = ARGS_POLL_SECONDS
+        while (args := self.take_args(webrtc_id)) is None:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, longest)
+        return args
+
+
+class InProcessRegistry(SessionRegistry):
+    """Registry for a single worker; waiting for args needs no polling."""
+
+    def __init__(self):
+        self._owners = {}
+        self._pending = {}  # webrtc_id -> (args, stored at), oldest first
+        self._arrived = {}
+
+    def claim(self, webrtc_id, worker=WORKER_ID):
+        self._owners[webrtc_id] = worker
+
+    def release(self, webrtc_id):
+        self._owners.pop(webrtc_id, None)
+        self._pending.pop(webrtc_id, None)
+
+    def set_args(self, webrtc_id, args):
+        now = time.monotonic()
+        self._pending.pop(webrtc_id, None)
+        self._pending[webrtc_id] = (list(args), now)
+        while self._pending:
+            oldest, (_, stored_at) = next(iter(self._pending.items()))
+            if len(self._pending) <= PENDING_ARGS_MAX and now - stored_at < PENDING_ARGS_SECONDS:
+                break
+            del self._pending[oldest]
+        if webrtc_id in self._arrived:
+            self._arrived[webrtc_id].set()
+
+    def take_args(self, webrtc_id):
+        args, stored_at = self._pending.pop(webrtc_id, (None, None))
+        if args is None or time.monotonic() - stored_at >= PENDING_ARGS_SECONDS:
+            return None
+        return args
+
+    def owner(self, webrtc_id):
+        return self._owners.get(webrtc_id)
+
+    def load(self):
+        counts = {}
+        for worker in self._owners.values():
+            counts[worker] = counts.get(worker, 0) + 1
+        return counts
+
+    async def wait_for_args(self, webrtc_id):
+        arrived = self._arrived.setdefault(webrtc_id, asyncio.Event())
+        try:
+            while (args := self.take_args(webrtc_id)) is None:
+                arrived.clear()
+                await arrived.wait()
+            return args
+        finally:
+            self._arrived.pop(webrtc_id, None)
+
+
+class SQLiteRegistry(SessionRegistry):
+    """Registry in a SQLite file shared by the workers on one host.
+
+    Rows are tiny and written once or twice per call, so every write commits
+    immediately; ownership rows older than ``STALE_SESSION_SECONDS`` are
+    cleared when the registry opens. Args are sealed with ``secret``
+    (``VOICE_REGISTRY_SECRET`` by default) and deleted when taken.
+    """
+
+    def __init__(self, path, secret=None):
+        secret = secret or os.getenv(SECRET_ENV)
+        if not secret:
+            raise ValueError(f"The SQLite voice registry needs {SECRET_ENV}, shared by every worker")
+        self.path = path
+        self._key = hashlib.sha256(secret.encode("utf-8")).digest()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS voice_sessions (
+                webrtc_id TEXT PRIMARY KEY,
+                worker TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS voice_sessions_worker ON voice_sessions (worker);
+            CREATE TABLE IF NOT EXISTS voice_args (
+                webrtc_id TEXT PRIMARY KEY,
+                sealed BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self._execute("PRAGMA table_info(voice_sessions)")}
+        if "args" in columns:  # Files from before args were sealed kept them in plain text
+            self._execute("UPDATE voice_sessions SET args = NULL")
+        self._execute("DELETE FROM voice_sessions WHERE updated_at < ?", (time.time() - STALE_SESSION_SECONDS,))
+        self._expire_args()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _expire_args(self):
+        self._execute("DELETE FROM voice_args WHERE stored_at < ?", (time.time() - PENDING_ARGS_SECONDS,))
+        self._execute(
+            "DELETE FROM voice_args WHERE webrtc_id NOT IN "
+            "(SELECT webrtc_id FROM voice_args ORDER BY stored_at DESC LIMIT ?)",
+            (PENDING_ARGS_MAX,),
+        )
+
+    def _seal(self, webrtc_id, args):
+        """Encrypts and authenticates args for one call: a keyed-BLAKE2b keystream, then an HMAC tag."""
+        nonce = secrets.token_bytes(16)
+        plain = json.dumps(list(args)).encode("utf-8")
+        body = bytes(a ^ b for a, b in zip(plain, self._keystream(nonce, len(plain))))
+        tag = hmac.new(self._key, webrtc_id.encode("utf-8") + nonce + body, hashlib.sha256).digest()
+        return nonce + tag + body
+
+    def _unseal(self, webrtc_id, sealed):
+        """The args in ``sealed``, or None if they were sealed for another call or with another secret."""
+        nonce, tag, body = sealed[:16], sealed[16:48], sealed[48:]
+        expected = hmac.new(self._key, webrtc_id.encode("utf-8") + nonce + body, hashlib.sha256).digest()
+        if not hmac.compare_digest(tag, expected):
+            return None
+        return json.loads(bytes(a ^ b for a, b in zip(body, self._keystream(nonce, len(body)))))
+
+    def _keystream(self, nonce, size):
+        blocks = (
+            hashlib.blake2b(nonce + counter.to_bytes(8, "big"), key=self._key, person=b"voice-args").digest()
+            for counter in range(-(-size // 64))
+        )
+        return b"".join(blocks)[:size]
+
+    def claim(self, webrtc_id, worker=WORKER_ID):
+        self._execute(
+            "INSERT INTO voice_sessions (webrtc_id, worker, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (webrtc_id) DO UPDATE SET worker = excluded.worker, updated_at = excluded.updated_at",
+            (webrtc_id, worker, time.time()),
+        )
+
+    def release(self, webrtc_id):
+        self._execute("DELETE FROM voice_sessions WHERE webrtc_id = ?", (webrtc_id,))
+        self._execute("DELETE FROM voice_args WHERE webrtc_id = ?", (webrtc_id,))
+
+    def set_args(self, webrtc_id, args):
+        self._execute(
+            "INSERT INTO voice_args (webrtc_id, sealed, stored_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (webrtc_id) DO UPDATE SET sealed = excluded.sealed, stored_at = excluded.stored_at",
+            (webrtc_id, self._seal(webrtc_id, args), time.time()),
+        )
+        self._expire_args()
+
+    def take_args(self, webrtc_id):
+        rows = self._execute(
+            "DELETE FROM voice_args WHERE webrtc_id = ? AND stored_at >= ? RETURNING sealed",
+            (webrtc_id, time.time() - PENDING_ARGS_SECONDS),
+        )
+        return self._unseal(webrtc_id, rows[0][0]) if rows else None
+
+    def owner(self, webrtc_id):
+        rows = self._execute("SELECT worker FROM voice_sessions WHERE webrtc_id = ?", (webrtc_id,))
+        return rows[0][0] if rows else None
+
+    def load(self):
+        rows = self._execute(
+            "SELECT worker, COUNT(*) FROM voice_sessions WHERE worker IS NOT NULL GROUP BY worker"
+        )
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_registry(url):
+    """Builds a registry from a URL such as ``sqlite:///voice_sessions.db`` or ``memory://``."""
+    if url.startswith("memory://"):
+        return InProcessRegistry()
+    if url.startswith("sqlite:///"):
+        return SQLiteRegistry(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported voice registry URL: {url}")
@@ -0,0 +1,198 @@
+"""Shared Gemini clients and a pool of pre-warmed live sessions for ``fastrc.py``.
+
+Opening a live session costs a websocket handshake plus the setup round trip,
+which used to sit between a call starting and its first audio. The pool
+keeps up to ``VOICE_POOL_SIZE`` sessions per (API key, voice) already
+connected and hands one out when a call starts. A live session carries the
+conversation, so each one serves a single call; the pool refills after the
+call ends, so an API key never holds an idle session on top of a live one
+against its concurrent-session limit. Warm sessions nobody claims within
+``VOICE_POOL_IDLE_SECONDS`` are closed, and a key/voice pair is only kept
+warm while it is being used, for at most ``POOL_MAX_KEYS`` pairs at a time.
+"""
+
+import asyncio
+import collections
+import contextlib
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+
+from google import genai
+from google.genai.types import (
+    LiveConnectConfig,
+    PrebuiltVoiceConfig,
+    SpeechConfig,
+    VoiceConfig,
+)
+
+LIVE_MODEL = "gemini-2.0-flash-exp"
+POOL_SIZE = int(os.getenv("VOICE_POOL_SIZE", "1"))
+POOL_IDLE_SECONDS = float(os.getenv("VOICE_POOL_IDLE_SECONDS", "60"))
+POOL_MAX_KEYS = 64  # (API key, voice) pairs kept warm at once; calls beyond them connect on demand
+GEMINI_BASE_URL = os.getenv("VOICE_GEMINI_BASE_URL")  # Points calls at a stand-in such as voice_loadtest's
+# Off by default: the SDK in use has no audio_stream_end, and the raw message has only been tried against
+# voice_loadtest's stand-in. Without it the VAD hangover's trailing silence lets Gemini end the turn itself.
+AUDIO_STREAM_END = os.getenv("VOICE_AUDIO_STREAM_END") == "1"
+
+
+@lru_cache(maxsize=64)
+def shared_client(api_key: str | None) -> genai.Client:
+    """One client, and so one HTTP/websocket setup, per API key."""
+    http_options = {"api_version": "v1alpha"}
+    if GEMINI_BASE_URL:
+        http_options["base_url"] = GEMINI_BASE_URL
+    return genai.Client(
+        api_key=api_key or os.getenv("GOOGLE_API_KEY"),
+        http_options=http_options,
+    )
+
+
+def live_config(voice_name: str) -> LiveConnectConfig:
+    return LiveConnectConfig(
+        response_modalities=["AUDIO"],  # type: ignore
+        speech_config=SpeechConfig(
+            voice_config=VoiceConfig(
+                prebuilt_voice_config=PrebuiltVoiceConfig(
+                    voice_name=voice_name,
+                )
+            )
+        ),
+    )
+
+
+async def end_audio_stream(session) -> None:
+    """Tells Gemini the microphone audio has paused, so it can end the user's turn at once.
+
+    Does nothing unless ``VOICE_AUDIO_STREAM_END=1``. A failed send is logged
+    rather than raised, so it never ends the call.
+    """
+    if not AUDIO_STREAM_END:
+        return
+    try:
+        if hasattr(session, "send_realtime_input"):
+            await session.send_realtime_input(audio_stream_end=True)
+        else:  # SDKs before audio_stream_end have no way to send it but the raw socket
+            await session._ws.send(json.dumps({"realtime_input": {"audio_stream_end": True}}))
+    except Exception as e:
+        logging.warning(f"Could not send audio_stream_end: {e}")
+
+
+def _failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+class LiveSessionPool:
+    """Pre-warmed, single-use live sessions keyed by (API key, voice)."""
+
+    def __init__(
+        self, size: int = POOL_SIZE, idle_seconds: float = POOL_IDLE_SECONDS
+    ) -> None:
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self._warm: dict[tuple, collections.deque] = {}  # key -> (opening task, started at)
+        self._tasks: set[asyncio.Task] = set()
+        self._sweeper: asyncio.Task | None = None
+        self._closed = False
+
+    def prewarm(self, api_key: str | None, voice_name: str) -> None:
+        """Starts connecting sessions for this key and voice until ``size`` are warm or warming."""
+        api_key = api_key or None  # An empty key field means the server's own key
+        key = (api_key, voice_name)
+        if self._closed or key not in self._warm and len(self._warm) >= POOL_MAX_KEYS:
+            return
+        warm = self._warm.setdefault(key, collections.deque())
+        while len(warm) < self.size:
+            warm.append((self._spawn(self._open(api_key, voice_name)), time.monotonic()))
+        if self._sweeper is None and self.size:
+            self._sweeper = self._spawn(self._sweep())
+
+    @contextlib.asynccontextmanager
+    async def session(self, api_key: str | None, voice_name: str):
+        """A connected live session for one call, warm if one is ready or on its way."""
+        api_key = api_key or None
+        opening = self._take((api_key, voice_name))
+        stack = None
+        if opening is not None:
+            with contextlib.suppress(Exception):
+                stack, session = await opening
+        if stack is None:  # Nothing warm, or pre-warming failed: connect now
+            stack, session = await self._open(api_key, voice_name)
+        try:
+            async with stack:
+                yield session
+        finally:
+            self.prewarm(api_key, voice_name)  # Ready for this key's next call, now this one is closed
+
+    async def close(self) -> None:
+        """Closes every warm session, e.g. when the server shuts down."""
+        self._closed = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        for warm in self._warm.values():
+            while warm:
+                self._discard(warm.popleft()[0])
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _open(self, api_key: str | None, voice_name: str):
+        stack = contextlib.AsyncExitStack()
+        try:
+            session = await stack.enter_async_context(
+                shared_client(api_key).aio.live.connect(
+                    model=LIVE_MODEL, config=live_config(voice_name)
+                )
+            )
+        except BaseException:
+            await stack.aclose()
+            raise
+        return stack, session
+
+    def _take(self, key: tuple) -> asyncio.Task | None:
+        warm = self._warm.get(key)
+        now = time.monotonic()
+        while warm:
+            opening, started = warm.popleft()
+            if now - started < self.idle_seconds and not _failed(opening):
+                return opening
+            self._discard(opening)
+        return None
+
+    def _discard(self, opening: asyncio.Task) -> None:
+        def close(task: asyncio.Task) -> None:
+            if not _failed(task):
+                stack, _ = task.result()
+                self._spawn(stack.aclose())
+
+        opening.add_done_callback(close)
+        opening.cancel()
+
+    async def _sweep(self) -> None:
+        try:
+            while self._warm:
+                await asyncio.sleep(self.idle_seconds / 2)
+                now = time.monotonic()
+                for key, warm in list(self._warm.items()):
+                    stale = [
+                        entry
+                        for entry in warm
+                        if now - entry[1] >= self.idle_seconds or _failed(entry[0])
+                    ]
+                    for entry in stale:
+                        warm.remove(entry)
+                        self._discard(entry[0])
+                    if not warm:  # Taken or gone stale; the pair stops counting against the cap
+                        del self._warm[key]
+        finally:
+            self._sweeper = None
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+live_sessions = LiveSessionPool()
@@ -0,0 +1,137 @@
+"""Voice activity detection that keeps silence off the Gemini uplink.
+
+``VoiceGate`` looks at every int16 microphone frame before it is queued and
+passes only speech, plus a short pre-roll so word onsets are not clipped and
+a hangover so pauses between words still go through. When the hangover runs
+out, ``END_OF_SPEECH`` follows the last frame so the handler can tell Gemini
+the audio stream has paused (see ``voice_sessions.AUDIO_STREAM_END``)
+instead of leaving the end of the turn to the server's own silence
+detection. Everything else is dropped.
+
+Speech is detected per 10 ms window from energy against a running noise
+floor, with the zero-crossing rate used to reject hiss. The floor follows
+windows judged silent, and after a long unbroken stretch of "speech" it also
+climbs towards the quietest recent window, so steady loud background noise
+cannot hold the gate open. If ``webrtcvad`` is
+installed, ``VOICE_VAD=webrtc`` uses it instead; ``VOICE_VAD=off`` forwards
+every frame.
+"""
+
+import collections
+import os
+
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:  # Optional; the energy detector needs nothing beyond numpy
+    webrtcvad = None
+
+VAD_BACKEND = os.getenv("VOICE_VAD", "energy")  # energy, webrtc or off
+VAD_HANGOVER_MS = int(os.getenv("VOICE_VAD_HANGOVER_MS", "500"))
+VAD_PREROLL_MS = int(os.getenv("VOICE_VAD_PREROLL_MS", "100"))
+VAD_WEBRTC_MODE = 2  # webrtcvad aggressiveness, 0 (least) to 3 (most)
+WINDOW_MS = 10
+MIN_SPEECH_ENERGY = 100.0**2  # Mean square of a window at about -50 dBFS; anything quieter is silence
+SPEECH_TO_NOISE = 8.0  # Energy over the noise floor that counts as speech (about 9 dB)
+NOISY_ZCR = 0.35  # Zero crossings per sample above which a window sounds like hiss rather than voice
+NOISY_MARGIN = 4.0  # Hiss-like windows must be this much louder again to count
+FLOOR_ADAPTATION = 0.05  # How quickly the noise floor follows non-speech energy
+FLOOR_RISE_AFTER_MS = 2000  # Unbroken speech after which the floor starts climbing; real speech pauses sooner
+FLOOR_RISE_WINDOW_MS = 1000  # The floor climbs towards the quietest window over this much recent audio
+
+END_OF_SPEECH = object()  # Queued after the last frame of an utterance
+
+
+def window_features(samples: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Mean-square energy and zero-crossing rate of each whole ``window`` in ``samples``."""
+    count = samples.size // window
+    windows = samples.reshape(-1)[: count * window].reshape(count, window)
+    as_float = windows.astype(np.float32)
+    energy = np.einsum("ij,ij->i", as_float, as_float) / window
+    signs = np.signbit(windows)
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / window
+    return energy, crossings
+
+
+class VoiceGate:
+    """Per-session speech gate in front of the uplink queue."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        backend: str = VAD_BACKEND,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        preroll_ms: int = VAD_PREROLL_MS,
+    ) -> None:
+        if backend == "webrtc" and webrtcvad is None:
+            raise ImportError("VOICE_VAD=webrtc needs the webrtcvad package")
+        self.sample_rate = sample_rate
+        self.backend = backend
+        self.window = sample_rate * WINDOW_MS // 1000
+        self.hangover = sample_rate * hangover_ms // 1000
+        self.preroll = sample_rate * preroll_ms // 1000
+        self.noise_floor = MIN_SPEECH_ENERGY / SPEECH_TO_NOISE
+        self.passed = 0
+        self.dropped = 0
+        self._vad = webrtcvad.Vad(VAD_WEBRTC_MODE) if backend == "webrtc" else None
+        self._held = collections.deque()
+        self._held_samples = 0
+        self._open_for = 0  # Samples left before the gate closes again
+        self._speech_run = 0  # Samples of unbroken speech windows
+        self._recent_energy = collections.deque(maxlen=FLOOR_RISE_WINDOW_MS // WINDOW_MS)
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        if self._vad is not None:
+            flat = samples.reshape(-1)
+            return any(
+                self._vad.is_speech(flat[start : start + self.window].tobytes(), self.sample_rate)
+                for start in range(0, flat.size - self.window + 1, self.window)
+            )
+        energy, crossings = window_features(samples, self.window)
+        if not energy.size:
+            return False
+        threshold = np.maximum(self.noise_floor * SPEECH_TO_NOISE, MIN_SPEECH_ENERGY)
+        threshold = np.where(crossings > NOISY_ZCR, threshold * NOISY_MARGIN, threshold)
+        speech = bool((energy > threshold).any())
+        if not speech:
+            self.noise_floor += FLOOR_ADAPTATION * (float(energy.mean()) - self.noise_floor)
+            self._speech_run = 0
+            self._recent_energy.clear()
+            return False
+        self._speech_run += samples.size
+        self._recent_energy.extend(energy.tolist())
+        if self._speech_run > self.sample_rate * FLOOR_RISE_AFTER_MS // 1000:
+            quietest = min(self._recent_energy)
+            if quietest > self.noise_floor:
+                self.noise_floor += FLOOR_ADAPTATION * (quietest - self.noise_floor)
+        return True
+
+    def admit(self, frame: np.ndarray) -> list:
+        """The frames to send for ``frame``: none, the frame, or the held pre-roll followed by it.
+
+        The frame that ends the hangover is followed by ``END_OF_SPEECH``.
+        """
+        if self.backend == "off":
+            self.passed += 1
+            return [frame]
+        if self.is_speech(frame):
+            opening = not self._open_for
+            self._open_for = self.hangover + frame.size
+            if opening and self._held:
+                frames = [*self._held, frame]
+                self.passed += len(frames)
+                self._held.clear()
+                self._held_samples = 0
+                return frames
+        if self._open_for:
+            self._open_for = max(self._open_for - frame.size, 0)
+            self.passed += 1
+            return [frame] if self._open_for else [frame, END_OF_SPEECH]
+        # Closed: keep the last few frames as pre-roll and drop the oldest
+        self._held.append(frame)
+        self._held_samples += frame.size
+        while self._held and self._held_samples - self._held[0].size >= self.preroll:
+            self._held_samples -= self._held.popleft().size
+            self.dropped += 1
+        return []